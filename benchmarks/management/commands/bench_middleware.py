@@ -0,0 +1,49 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import path
+
+
+def ping(request):
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+# the view does no work, so timings are the middleware stack plus a test client baseline
+urlpatterns = [path('api/v1/ping/', ping)]
+
+
+class Command(BaseCommand):
+    help = 'Per-request middleware overhead of a token-authenticated API call, full stack vs lean path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with override_settings(ROOT_URLCONF=sys.modules[__name__]):
+                bare = self.measure(options['iterations'], MIDDLEWARE=[])
+                full = self.measure(options['iterations'], LEAN_API_MIDDLEWARE=False)
+                lean = self.measure(options['iterations'], LEAN_API_MIDDLEWARE=True)
+        finally:
+            teardown_test_environment()
+
+        self.stdout.write(f"{'stack':<12} {'us/request':>11} {'middleware us':>14}")
+        for label, seconds in (('none', bare), ('full', full), ('lean', lean)):
+            self.stdout.write(f"{label:<12} {seconds * 1e6:>11.1f} {(seconds - bare) * 1e6:>14.1f}")
+
+    def measure(self, iterations, **overrides):
+        with override_settings(**overrides):
+            # a session cookie as sent by clients that also logged in through dj-rest-auth
+            client = Client(HTTP_AUTHORIZATION='Token bench', HTTP_ACCEPT='application/json')
+            client.cookies['sessionid'] = 'bench-session'
+            for _ in range(min(iterations, 500)):
+                client.get('/api/v1/ping/')
+            start = time.perf_counter()
+            for _ in range(iterations):
+                client.get('/api/v1/ping/')
+            return (time.perf_counter() - start) / iterations
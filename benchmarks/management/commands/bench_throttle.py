@@ -0,0 +1,57 @@
+import random
+import time
+from types import SimpleNamespace
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from rest_framework import throttling
+
+from users import throttling as window_throttling
+from users.models import User
+
+# high enough that no request is refused, so every call does the full update
+RATE = '10000000/day'
+
+
+class HistoryThrottle(throttling.UserRateThrottle):
+    rate = RATE
+
+
+class WindowThrottle(window_throttling.UserRateThrottle):
+    rate = RATE
+
+
+class Command(BaseCommand):
+    help = "Per-request cost of DRF's history-list throttle vs the sliding-window counters, on the default cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000)
+        parser.add_argument('--sample', type=int, default=500,
+                            help='Requests averaged at the start and the end of each run')
+
+    def handle(self, *args, **options):
+        iterations, sample = options['iterations'], min(options['sample'], options['iterations'])
+        self.stdout.write(f"cache: {type(caches['default']).__name__}, {iterations} requests from one user")
+        self.stdout.write(f"{'throttle':<16} {'us/request':>11} {'first us':>9} {'last us':>9}")
+        for label, throttle_class in (('drf history', HistoryThrottle), ('sliding window', WindowThrottle)):
+            timings = self.measure(throttle_class, iterations)
+            self.stdout.write(
+                f"{label:<16} {sum(timings) / len(timings) * 1e6:>11.1f} "
+                f"{sum(timings[:sample]) / sample * 1e6:>9.1f} {sum(timings[-sample:]) / sample * 1e6:>9.1f}"
+            )
+
+    def measure(self, throttle_class, iterations):
+        # a fresh identity per run, so nothing left in a shared cache is reused
+        request = SimpleNamespace(user=User(pk=random.randrange(10 ** 12, 10 ** 13)), META={})
+        throttle = throttle_class()
+        timings = []
+        try:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                throttle.allow_request(request, None)
+                timings.append(time.perf_counter() - start)
+        finally:
+            key = throttle.get_cache_key(request, None)
+            window = int(time.time() // throttle.duration)
+            caches['default'].delete_many([key] + [f'{key}:{window - n}' for n in range(3)])
+        return timings
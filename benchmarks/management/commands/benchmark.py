@@ -0,0 +1,153 @@
+import itertools
+import statistics
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+from knox.models import AuthToken
+from rest_framework.test import APIClient
+
+from benchmarks.scenarios import PASSWORD, SCENARIOS, search_radius
+from benchmarks.seed import SIZES, seed
+from coldrooms.models import ColdRoom, ColdRoomVerification
+from users.models import User
+from users.throttling import SlidingWindowRateThrottle
+
+
+class Context:
+    """Clients and fixtures shared by the scenarios of one seeded size."""
+
+    def __init__(self):
+        self.anon = APIClient()
+
+        owner = User.objects.filter(user_type=User.UserType.COLD_ROOM_OWNER).order_by('pk').first()
+        self.owner_email = owner.email
+        self.owner = self.token_client(owner)
+        self.rooms = itertools.cycle(ColdRoom.objects.filter(owner=owner).values_list('pk', flat=True))
+        self.created = []
+
+        admin = User.objects.create_superuser(email='admin@bench.invalid', password=PASSWORD,
+                                              phone='+254600000001', first_name='Bench',
+                                              last_name='Admin', user_type=User.UserType.FARMER)
+        self.admin = self.token_client(admin)
+        self.verifications = itertools.cycle(
+            ColdRoomVerification.objects.order_by('pk').values_list('pk', flat=True)[:100]
+        )
+
+        # validator of the "search revalidate" scenario, taken before any scenario runs
+        self.search_etag = search_radius(self)['ETag']
+
+        self.login_email = User.objects.create_user(
+            email='farmer@bench.invalid', password=PASSWORD, phone='+254600000002',
+            first_name='Bench', last_name='Farmer', user_type=User.UserType.FARMER,
+        ).email
+
+    @staticmethod
+    def token_client(user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {AuthToken.objects.create(user)[1]}')
+        return client
+
+    def next_room(self):
+        return next(self.rooms)
+
+    def next_verification(self):
+        return next(self.verifications)
+
+
+class Command(BaseCommand):
+    help = ('Seed a test PostGIS database at several sizes and enforce per-endpoint '
+            'query-count and p95 latency budgets')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1k,100k,1m',
+                            help=f"Comma separated, from {', '.join(SIZES)}")
+        parser.add_argument('--iterations', type=int, default=50,
+                            help='Measured requests per scenario, unless the scenario caps it')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--latency-scale', type=float, default=1.0,
+                            help='Multiply latency budgets, e.g. 2 on slow CI machines')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the test database')
+
+    def handle(self, *args, **options):
+        sizes = [size.strip() for size in options['sizes'].split(',') if size.strip()]
+        unknown = set(sizes) - set(SIZES)
+        if unknown:
+            raise CommandError(f"Unknown size(s): {', '.join(sorted(unknown))}")
+
+        runner = DiscoverRunner(interactive=False, keepdb=options['keepdb'], verbosity=0)
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        failures = []
+        try:
+            # measure the database path: no response cache, no throttling
+            with override_settings(COLDROOM_RESPONSE_CACHE_TIMEOUT=0, COLDROOM_TILE_CACHE_TIMEOUT=0,
+                                   COLDROOM_SEARCH_ENGINE='postgis'), \
+                    mock.patch.object(SlidingWindowRateThrottle, 'allow_request', return_value=True):
+                for size in sizes:
+                    failures += self.run_size(size, options)
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+        if failures:
+            raise CommandError('Budget exceeded:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All endpoints within budget.'))
+
+    def run_size(self, size, options):
+        start = time.perf_counter()
+        seed(SIZES[size])
+        self.stdout.write(f"\n{size}: seeded {SIZES[size]} rooms in {time.perf_counter() - start:.1f}s")
+        self.stdout.write(f"{'endpoint':<22} {'n':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                          f"{'queries':>8} {'budget':>14}")
+
+        ctx = Context()
+        failures = []
+        for scenario in SCENARIOS:
+            budget_ms = scenario.p95_ms.get(size)
+            if budget_ms is None:
+                self.stdout.write(f"{scenario.name:<22} skipped at {size}")
+                continue
+            budget_ms *= options['latency_scale']
+            iterations = min(options['iterations'], scenario.iterations or options['iterations'])
+
+            for _ in range(options['warmup']):
+                scenario.run(ctx)
+
+            timings, queries, bad_status = [], 0, None
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as captured:
+                    began = time.perf_counter()
+                    response = scenario.run(ctx)
+                    timings.append((time.perf_counter() - began) * 1000)
+                queries = max(queries, len(captured))
+                if response.status_code != scenario.status:
+                    bad_status = response.status_code
+
+            p50, p95, p99 = self.percentiles(timings)
+            row = (f"{scenario.name:<22} {iterations:>4} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} "
+                   f"{queries:>8} {f'{scenario.queries}q/{budget_ms:.0f}ms':>14}")
+            problems = []
+            if bad_status is not None:
+                problems.append(f"status {bad_status}, expected {scenario.status}")
+            if queries > scenario.queries:
+                problems.append(f"{queries} queries, budget {scenario.queries}")
+            if p95 > budget_ms:
+                problems.append(f"p95 {p95:.1f}ms, budget {budget_ms:.0f}ms")
+
+            if problems:
+                failures.append(f"{size} {scenario.name}: {'; '.join(problems)}")
+                self.stdout.write(self.style.ERROR(row))
+            else:
+                self.stdout.write(row)
+        return failures
+
+    @staticmethod
+    def percentiles(timings):
+        if len(timings) < 2:
+            return timings * 3 if timings else [0.0] * 3
+        cuts = statistics.quantiles(timings, n=100, method='inclusive')
+        return cuts[49], cuts[94], cuts[98]
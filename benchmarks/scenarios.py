@@ -0,0 +1,231 @@
+"""
+Endpoint scenarios and their budgets.
+
+Each scenario issues one request per call. Query budgets are exact upper
+bounds for the steady state (token digests cached, response cache off).
+Latency budgets are p95 milliseconds per seeded size; ``None`` skips the
+scenario at that size. When a change legitimately moves a number, update
+the budget here in the same commit.
+"""
+import itertools
+from datetime import timedelta
+
+from django.utils import timezone
+
+from coldrooms.tiles import tile_for
+
+NAIROBI = (-1.2921, 36.8219)
+PASSWORD = 'Bench-pass-1!'
+BULK_SIZE = 50  # rooms per bulk create/update request
+TELEMETRY_BATCH = 1000  # in-range readings per ingest request
+
+_serial = itertools.count(1)
+
+
+class Scenario:
+    def __init__(self, name, run, status, queries, p95_ms, iterations=None):
+        self.name = name
+        self.run = run
+        self.status = status
+        self.queries = queries
+        self.p95_ms = p95_ms
+        self.iterations = iterations
+
+
+def register(ctx):
+    n = next(_serial)
+    return ctx.anon.post('/api/v1/auth/register/', {
+        'email': f'farmer{n}@bench.invalid',
+        'first_name': 'Bench',
+        'last_name': 'Farmer',
+        'user_type': 'FARMER',
+        'phone': f'+2541{n:08d}',
+        'password': PASSWORD,
+    }, format='json')
+
+
+def login(ctx):
+    return ctx.anon.post('/api/v1/auth/login/', {
+        'email': ctx.login_email, 'password': PASSWORD,
+    }, format='json')
+
+
+def cold_room_list(ctx):
+    return ctx.anon.get('/api/v1/cold-rooms-list/')
+
+
+def search_radius(ctx):
+    lat, lon = NAIROBI
+    return ctx.anon.get('/api/v1/search/', {'lat': lat, 'lon': lon, 'radius': 25})
+
+
+def search_revalidate(ctx):
+    lat, lon = NAIROBI
+    return ctx.anon.get('/api/v1/search/', {'lat': lat, 'lon': lon, 'radius': 25},
+                        HTTP_IF_NONE_MATCH=ctx.search_etag)
+
+
+def search_requirements(ctx):
+    lat, lon = NAIROBI
+    return ctx.anon.get('/api/v1/search/', {'lat': lat, 'lon': lon, 'radius': 25,
+                                            'required_temp': '2,4', 'min_capacity': 100})
+
+
+def search_ranked(ctx):
+    lat, lon = NAIROBI
+    return ctx.anon.get('/api/v1/search/', {'lat': lat, 'lon': lon, 'radius': 25, 'rank': 10,
+                                            'quantity': 50, 'target_temp': 2})
+
+
+def search_nearest(ctx):
+    lat, lon = NAIROBI
+    return ctx.anon.get('/api/v1/search/', {'lat': lat, 'lon': lon, 'nearest': 10})
+
+
+def search_cursor(ctx):
+    lat, lon = NAIROBI
+    return ctx.anon.get('/api/v1/search/', {'lat': lat, 'lon': lon, 'radius': 100, 'page_size': 20})
+
+
+def clusters_city(ctx):
+    lat, lon = NAIROBI
+    return ctx.anon.get('/api/v1/cold-rooms-list/clusters/', {
+        'bbox': f'{lon - 0.5},{lat - 0.5},{lon + 0.5},{lat + 0.5}', 'zoom': 10,
+    })
+
+
+def clusters_street(ctx):
+    lat, lon = NAIROBI
+    return ctx.anon.get('/api/v1/cold-rooms-list/clusters/', {
+        'bbox': f'{lon - 0.05},{lat - 0.03},{lon + 0.05},{lat + 0.03}', 'zoom': 15,
+    })
+
+
+def vector_tile(ctx):
+    lat, lon = NAIROBI
+    x, y = tile_for(lon, lat, 12)
+    return ctx.anon.get(f'/api/v1/tiles/12/{x}/{y}.pbf')
+
+
+def owner_list(ctx):
+    return ctx.owner.get('/api/v1/cold-rooms/')
+
+
+def owner_create(ctx):
+    lat, lon = NAIROBI
+    response = ctx.owner.post('/api/v1/cold-rooms/', {
+        'name': f'Bench create {next(_serial)}',
+        'latitude': lat,
+        'longitude': lon,
+        'capacity': 120,
+        'temp_min': '2.00',
+        'temp_max': '8.00',
+        'temp_unit': 'C',
+        'owner_email': ctx.owner_email,
+    }, format='json')
+    if response.status_code == 201:
+        ctx.created.append(response.data['id'])
+    return response
+
+
+def owner_bulk_create(ctx):
+    lat, lon = NAIROBI
+    return ctx.owner.post('/api/v1/cold-rooms/bulk/', [{
+        'name': f'Bench bulk {next(_serial)}',
+        'latitude': lat,
+        'longitude': lon,
+        'capacity': 120,
+        'temp_min': '2.00',
+        'temp_max': '8.00',
+        'temp_unit': 'C',
+        'owner_email': ctx.owner_email,
+    } for _ in range(BULK_SIZE)], format='json')
+
+
+def owner_bulk_update(ctx):
+    return ctx.owner.patch('/api/v1/cold-rooms/bulk/', [{
+        'id': ctx.next_room(), 'capacity': 100 + next(_serial) % 900,
+    } for _ in range(BULK_SIZE)], format='json')
+
+
+def owner_retrieve(ctx):
+    return ctx.owner.get(f'/api/v1/cold-rooms/{ctx.next_room()}/')
+
+
+def owner_update(ctx):
+    return ctx.owner.patch(f'/api/v1/cold-rooms/{ctx.next_room()}/', {
+        'capacity': 100 + next(_serial) % 900,
+    }, format='json')
+
+
+def owner_delete(ctx):
+    return ctx.owner.delete(f'/api/v1/cold-rooms/{ctx.created.pop()}/')
+
+
+def telemetry_ingest(ctx):
+    room, now = ctx.next_room(), timezone.now()
+    return ctx.owner.post('/api/v1/telemetry/readings/', [{
+        'cold_room': room,
+        'recorded_at': (now - timedelta(seconds=5 * n)).isoformat(),
+        'temperature': 4.0,
+    } for n in range(TELEMETRY_BATCH)], format='json')
+
+
+def verification_retrieve(ctx):
+    return ctx.admin.get(f'/api/v1/verifications/{ctx.next_verification()}/')
+
+
+def verification_update(ctx):
+    return ctx.admin.patch(f'/api/v1/verifications/{ctx.next_verification()}/', {
+        'status': 'APPROVED', 'verification_notes': 'Benchmark review',
+    }, format='json')
+
+
+def verification_bulk_review(ctx):
+    return ctx.admin.post('/api/v1/verifications/review/', {
+        'ids': [ctx.next_verification() for _ in range(BULK_SIZE)], 'status': 'APPROVED',
+    }, format='json')
+
+
+def verification_queue(ctx):
+    return ctx.admin.get('/api/v1/verifications/', {'status': 'PENDING', 'limit': 50})
+
+
+# password hashing dominates register/login, so their budgets do not scale with size
+SCENARIOS = [
+    Scenario('register', register, 201, 5, {'1k': 800, '100k': 800, '1m': 800}, iterations=20),
+    Scenario('login', login, 200, 2, {'1k': 800, '100k': 800, '1m': 800}, iterations=20),
+    # unpaginated: the whole verified catalogue in one response
+    Scenario('list', cold_room_list, 200, 1, {'1k': 150, '100k': 8000, '1m': None}, iterations=5),
+    Scenario('search radius', search_radius, 200, 3, {'1k': 60, '100k': 250, '1m': 1500}),
+    # unchanged catalogue: answered from the version counter, no SQL at all
+    Scenario('search revalidate', search_revalidate, 304, 0, {'1k': 10, '100k': 10, '1m': 10}),
+    Scenario('search requirements', search_requirements, 200, 3, {'1k': 60, '100k': 250, '1m': 1500}),
+    # scored, sorted and cut to the top 10 in one statement
+    Scenario('search ranked', search_ranked, 200, 1, {'1k': 60, '100k': 150, '1m': 600}),
+    # KNN probe for the distance bound, then the exact nearest within it
+    Scenario('search nearest', search_nearest, 200, 2, {'1k': 40, '100k': 50, '1m': 80}),
+    Scenario('search cursor', search_cursor, 200, 1, {'1k': 50, '100k': 120, '1m': 600}),
+    Scenario('clusters city', clusters_city, 200, 1, {'1k': 40, '100k': 150, '1m': 800}),
+    # second query fetches the rooms that sit alone in their cell
+    Scenario('clusters street', clusters_street, 200, 2, {'1k': 40, '100k': 60, '1m': 120}),
+    Scenario('vector tile', vector_tile, 200, 1, {'1k': 40, '100k': 80, '1m': 200}),
+    Scenario('owner list', owner_list, 200, 2, {'1k': 60, '100k': 60, '1m': 60}),
+    Scenario('owner create', owner_create, 201, 4, {'1k': 60, '100k': 60, '1m': 80}),
+    # query counts do not grow with BULK_SIZE
+    Scenario('owner bulk create', owner_bulk_create, 201, 3, {'1k': 150, '100k': 150, '1m': 200}),
+    Scenario('owner bulk update', owner_bulk_update, 200, 3, {'1k': 100, '100k': 100, '1m': 120}),
+    Scenario('owner retrieve', owner_retrieve, 200, 3, {'1k': 40, '100k': 40, '1m': 50}),
+    Scenario('owner update', owner_update, 200, 4, {'1k': 50, '100k': 50, '1m': 60}),
+    # removes the rooms created by "owner create", so it must not run more often;
+    # includes one DELETE per telemetry table
+    Scenario('owner delete', owner_delete, 204, 12, {'1k': 60, '100k': 60, '1m': 80}),
+    # COPY bypasses the query counter; in-range readings, so no excursion queries
+    Scenario('telemetry ingest', telemetry_ingest, 201, 6, {'1k': 150, '100k': 150, '1m': 150}),
+    Scenario('verification retrieve', verification_retrieve, 200, 2, {'1k': 40, '100k': 40, '1m': 50}),
+    # the approval also syncs ColdRoom.is_verified
+    Scenario('verification update', verification_update, 200, 4, {'1k': 50, '100k': 50, '1m': 60}),
+    Scenario('verification bulk review', verification_bulk_review, 200, 4, {'1k': 80, '100k': 80, '1m': 100}),
+    # count + page, both on the (status, submitted_at) index
+    Scenario('verification queue', verification_queue, 200, 3, {'1k': 50, '100k': 80, '1m': 150}),
+]
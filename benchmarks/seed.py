@@ -0,0 +1,72 @@
+"""
+Seed the benchmark database with synthetic owners, cold rooms and verifications.
+
+Everything is generated inside PostgreSQL with ``generate_series`` so a
+million rooms take about as long as the index builds. Rooms cluster around
+Kenyan towns (60%) with the rest spread uniformly over the country's
+bounding box; 80% are verified.
+"""
+from django.core.cache import cache
+from django.db import connection
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+ROOMS_PER_OWNER = 50
+
+# Nairobi, Mombasa, Kisumu, Nakuru, Eldoret, Thika, Malindi, Kitale, Garissa, Nyeri
+TOWN_LONS = [36.8219, 39.6682, 34.7617, 36.0800, 35.2698, 37.0693, 40.1169, 35.0062, 39.6461, 36.9476]
+TOWN_LATS = [-1.2921, -4.0435, -0.0917, -0.3031, 0.5143, -1.0333, -3.2192, 1.0157, -0.4532, -0.4201]
+
+TRUNCATE_SQL = "TRUNCATE TABLE users_user, coldrooms_coldroom RESTART IDENTITY CASCADE"
+
+OWNERS_SQL = """
+    INSERT INTO users_user (password, is_superuser, username, first_name, last_name, email,
+                            is_staff, is_active, date_joined, user_type, phone, created_at, updated_at)
+    SELECT '!', false, 'bench_owner_' || i, 'Owner', i::text, 'owner' || i || '@bench.invalid',
+           false, true, now(), 'COLD_ROOM_OWNER', '+2547' || lpad(i::text, 8, '0'), now(), now()
+    FROM generate_series(1, %(owners)s) AS i
+"""
+
+ROOMS_SQL = """
+    INSERT INTO coldrooms_coldroom (owner_id, name, location, capacity, temp_min, temp_max,
+                                    temp_unit, availability_schedule, is_verified, created_at, updated_at)
+    SELECT 1 + i %% %(owners)s, 'Bench room ' || i,
+           ST_SetSRID(ST_MakePoint(
+               CASE WHEN pick < 0.6 THEN (%(town_lons)s::float8[])[town] + 0.3 * r * cos(theta)
+                    ELSE 33.9 + u1 * 8.0 END,
+               CASE WHEN pick < 0.6 THEN (%(town_lats)s::float8[])[town] + 0.3 * r * sin(theta)
+                    ELSE -4.7 + u2 * 9.7 END
+           ), 4326),
+           50 + floor(random() * 950)::int,
+           temp_min, temp_min + 2 + floor(random() * 8), 'C', '{}'::jsonb,
+           random() < 0.8, now(), now()
+    FROM (
+        SELECT i, random() AS pick, u1, u2,
+               1 + floor(random() * 10)::int AS town,
+               sqrt(-2 * ln(greatest(u1, 1e-12))) AS r, 2 * pi() * u2 AS theta,
+               -20 + floor(random() * 25) AS temp_min
+        FROM (SELECT i, random() AS u1, random() AS u2 FROM generate_series(1, %(rooms)s) AS i) AS u
+    ) AS s
+"""
+
+VERIFICATIONS_SQL = """
+    INSERT INTO coldrooms_coldroomverification (cold_room_id, status, submitted_at, reviewed_at,
+                                                "Verification_notes")
+    SELECT id, CASE WHEN is_verified THEN 'APPROVED' ELSE 'PENDING' END, created_at, created_at, ''
+    FROM coldrooms_coldroom
+"""
+
+
+def seed(rooms, seed_value=0.42):
+    """Replace all users and rooms with ``rooms`` synthetic rooms; returns the owner count."""
+    owners = max(1, rooms // ROOMS_PER_OWNER)
+    params = {'owners': owners, 'rooms': rooms, 'town_lons': TOWN_LONS, 'town_lats': TOWN_LATS}
+    with connection.cursor() as cursor:
+        cursor.execute(TRUNCATE_SQL)
+        cursor.execute("SELECT setseed(%s)", [seed_value])
+        cursor.execute(OWNERS_SQL, params)
+        cursor.execute(ROOMS_SQL, params)
+        cursor.execute(VERIFICATIONS_SQL)
+        cursor.execute("ANALYZE users_user, coldrooms_coldroom, coldrooms_coldroomverification")
+    # catalogue versions, cached responses and token digests refer to the old rows
+    cache.clear()
+    return owners
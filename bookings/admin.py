@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import Booking, RoomDayCapacity
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('cold_room', 'farmer', 'quantity', 'start_date', 'end_date', 'status')
+    list_filter = ('status',)
+    search_fields = ('cold_room__name', 'farmer__email')
+    # capacity counters are only changed through Booking.objects.reserve()/cancel()
+    readonly_fields = ('cold_room', 'farmer', 'quantity', 'start_date', 'end_date', 'status')
+
+@admin.register(RoomDayCapacity)
+class RoomDayCapacityAdmin(admin.ModelAdmin):
+    list_display = ('cold_room', 'day', 'reserved')
+    list_filter = ('day',)
+    readonly_fields = ('cold_room', 'day', 'reserved')
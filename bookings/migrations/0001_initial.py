@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('coldrooms', '0003_availabilityslot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Reserved Units')),
+                ('start_date', models.DateField(verbose_name='Start Date')),
+                ('end_date', models.DateField(help_text='First day after the booking', verbose_name='End Date')),
+                ('status', models.CharField(choices=[('CONFIRMED', 'Confirmed'), ('CANCELLED', 'Cancelled')], default='CONFIRMED', max_length=10, verbose_name='Booking Status')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cold_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='coldrooms.coldroom')),
+                ('farmer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Booking',
+                'verbose_name_plural': 'Bookings',
+                'indexes': [models.Index(fields=['cold_room', 'start_date'], name='booking_room_start_idx'), models.Index(fields=['farmer', 'start_date'], name='booking_farmer_start_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('end_date__gt', models.F('start_date'))), name='booking_end_after_start'), models.CheckConstraint(condition=models.Q(('quantity__gt', 0)), name='booking_quantity_positive')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RoomDayCapacity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('reserved', models.PositiveIntegerField(default=0, verbose_name='Reserved Units')),
+                ('cold_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_capacity', to='coldrooms.coldroom')),
+            ],
+            options={
+                'verbose_name': 'Room Day Capacity',
+                'verbose_name_plural': 'Room Day Capacities',
+                'constraints': [models.UniqueConstraint(fields=('cold_room', 'day'), name='room_day_capacity_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils.translation import gettext_lazy as _
+from coldrooms.models import ColdRoom
+from users.models import User
+
+
+class CapacityUnavailable(Exception):
+    pass
+
+
+class RoomDayCapacity(models.Model):
+    """Units already reserved in a cold room on one day."""
+    cold_room = models.ForeignKey(ColdRoom, on_delete=models.CASCADE, related_name='day_capacity')
+    day = models.DateField(_('Day'))
+    reserved = models.PositiveIntegerField(_('Reserved Units'), default=0)
+
+    class Meta:
+        verbose_name = _('Room Day Capacity')
+        verbose_name_plural = _('Room Day Capacities')
+        constraints = [
+            models.UniqueConstraint(fields=['cold_room', 'day'], name='room_day_capacity_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.cold_room.name} on {self.day}: {self.reserved} reserved"
+
+
+def _booking_days(start_date, end_date):
+    return [start_date + timedelta(days=n) for n in range((end_date - start_date).days)]
+
+
+def _lock_days(cold_room_id, start_date, end_date):
+    """
+    Row-lock a room's day counters in day order.
+
+    Every writer takes the locks in the same order, so bookings with
+    overlapping date ranges queue up instead of deadlocking.
+    """
+    days = RoomDayCapacity.objects.filter(cold_room_id=cold_room_id,
+                                          day__gte=start_date, day__lt=end_date)
+    list(days.select_for_update().order_by('day').values_list('pk', flat=True))
+    return days
+
+
+class BookingManager(models.Manager):
+    def reserve(self, cold_room, farmer, start_date, end_date, quantity):
+        """
+        Book ``quantity`` units for every day in ``[start_date, end_date)``.
+
+        Raises ``CapacityUnavailable`` if any of those days lacks room; in that
+        case nothing is reserved.
+        """
+        days = _booking_days(start_date, end_date)
+        with transaction.atomic():
+            RoomDayCapacity.objects.bulk_create(
+                [RoomDayCapacity(cold_room_id=cold_room.pk, day=day) for day in days],
+                ignore_conflicts=True,
+            )
+            day_rows = _lock_days(cold_room.pk, start_date, end_date)
+            capacity = ColdRoom.objects.values_list('capacity', flat=True).get(pk=cold_room.pk)
+
+            # conditional increment: a day that would go over capacity is simply
+            # not updated, and the short count rolls the whole booking back
+            updated = day_rows.filter(reserved__lte=capacity - quantity).update(
+                reserved=F('reserved') + quantity
+            )
+            if updated != len(days):
+                raise CapacityUnavailable(
+                    f"Only part of the requested period has {quantity} free units in {cold_room.name}."
+                )
+            return self.create(cold_room=cold_room, farmer=farmer, quantity=quantity,
+                               start_date=start_date, end_date=end_date)
+
+    def remaining_capacity(self, cold_room, start_date, end_date):
+        """Return ``{day: free_units}`` for ``[start_date, end_date)``."""
+        reserved = dict(RoomDayCapacity.objects.filter(
+            cold_room=cold_room, day__gte=start_date, day__lt=end_date
+        ).values_list('day', 'reserved'))
+        return {day: max(cold_room.capacity - reserved.get(day, 0), 0)
+                for day in _booking_days(start_date, end_date)}
+
+
+class Booking(models.Model):
+    class BookingStatus(models.TextChoices):
+        CONFIRMED = 'CONFIRMED', _('Confirmed')
+        CANCELLED = 'CANCELLED', _('Cancelled')
+
+    cold_room = models.ForeignKey(ColdRoom, on_delete=models.CASCADE, related_name='bookings')
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
+    quantity = models.PositiveIntegerField(_('Reserved Units'))
+    start_date = models.DateField(_('Start Date'))
+    end_date = models.DateField(_('End Date'), help_text=_('First day after the booking'))
+    status = models.CharField(_('Booking Status'), max_length=10,
+                              choices=BookingStatus.choices, default=BookingStatus.CONFIRMED)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookingManager()
+
+    class Meta:
+        verbose_name = _('Booking')
+        verbose_name_plural = _('Bookings')
+        indexes = [
+            models.Index(fields=['cold_room', 'start_date'], name='booking_room_start_idx'),
+            models.Index(fields=['farmer', 'start_date'], name='booking_farmer_start_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=Q(end_date__gt=F('start_date')),
+                                   name='booking_end_after_start'),
+            models.CheckConstraint(condition=Q(quantity__gt=0), name='booking_quantity_positive'),
+        ]
+
+    def cancel(self):
+        """Cancel the booking and hand its units back. Returns False if already cancelled."""
+        with transaction.atomic():
+            cancelled = Booking.objects.filter(
+                pk=self.pk, status=self.BookingStatus.CONFIRMED
+            ).update(status=self.BookingStatus.CANCELLED)
+            if not cancelled:
+                return False
+            _lock_days(self.cold_room_id, self.start_date, self.end_date).update(
+                reserved=F('reserved') - self.quantity
+            )
+        self.status = self.BookingStatus.CANCELLED
+        return True
+
+    def __str__(self):
+        return f"{self.quantity} units in {self.cold_room.name} ({self.start_date} - {self.end_date})"
@@ -0,0 +1,45 @@
+from django.conf import settings
+from rest_framework import serializers
+from coldrooms.models import ColdRoom
+from .models import Booking
+
+
+class BookingSerializer(serializers.ModelSerializer):
+    cold_room = serializers.PrimaryKeyRelatedField(queryset=ColdRoom.objects.filter(is_verified=True))
+
+    class Meta:
+        model = Booking
+        fields = ['id', 'cold_room', 'quantity', 'start_date', 'end_date',
+                  'status', 'created_at', 'updated_at']
+        read_only_fields = ['status', 'created_at', 'updated_at']
+        # the model field only implies min_value=0; booking_quantity_positive needs 1
+        extra_kwargs = {'quantity': {'min_value': 1}}
+
+    def validate(self, attrs):
+        start_date, end_date = attrs['start_date'], attrs['end_date']
+        if end_date <= start_date:
+            raise serializers.ValidationError({'end_date': 'End date must be after the start date.'})
+        if (end_date - start_date).days > settings.BOOKING_MAX_DAYS:
+            raise serializers.ValidationError(
+                {'end_date': f"Bookings cannot be longer than {settings.BOOKING_MAX_DAYS} days."}
+            )
+        if attrs['quantity'] > attrs['cold_room'].capacity:
+            raise serializers.ValidationError({'quantity': 'Quantity exceeds the cold room capacity.'})
+        return attrs
+
+    def create(self, validated_data):
+        return Booking.objects.reserve(farmer=self.context['request'].user, **validated_data)
+
+
+class CapacityQuerySerializer(serializers.Serializer):
+    cold_room = serializers.PrimaryKeyRelatedField(queryset=ColdRoom.objects.filter(is_verified=True))
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        days = (attrs['end_date'] - attrs['start_date']).days
+        if not 0 < days <= settings.BOOKING_MAX_DAYS:
+            raise serializers.ValidationError(
+                f"The period must cover between 1 and {settings.BOOKING_MAX_DAYS} days."
+            )
+        return attrs
@@ -0,0 +1,194 @@
+import threading
+from datetime import date
+
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+from coldrooms.models import ColdRoom
+from users.models import User
+from .models import Booking, CapacityUnavailable, RoomDayCapacity
+
+
+class ReservationConcurrencyTests(TransactionTestCase):
+    """Hammer one room from many threads; capacity must never be oversold."""
+
+    workers = 24
+
+    def setUp(self):
+        owner = User.objects.create_user(
+            email='owner@example.com', password='Secret123!', phone='+254700000001',
+            user_type=User.UserType.COLD_ROOM_OWNER,
+        )
+        self.farmer = User.objects.create_user(
+            email='farmer@example.com', password='Secret123!', phone='+254700000002',
+            user_type=User.UserType.FARMER,
+        )
+        self.room = ColdRoom.objects.create(
+            owner=owner, name='Harvest Hub', location=Point(36.8219, -1.2921, srid=4326),
+            capacity=10, temp_min=0, temp_max=4, is_verified=True,
+        )
+
+    def run_concurrently(self, bookings):
+        barrier = threading.Barrier(len(bookings))
+        outcomes, errors = [], []
+
+        def book(start_date, end_date, quantity):
+            try:
+                barrier.wait()
+                Booking.objects.reserve(self.room, self.farmer, start_date, end_date, quantity)
+                outcomes.append(True)
+            except CapacityUnavailable:
+                outcomes.append(False)
+            except Exception as exc:
+                # deadlocks and other database errors must fail the test, not vanish with the thread
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=args) for args in bookings]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(outcomes), len(bookings))
+        return outcomes
+
+    def test_single_day_is_never_overbooked(self):
+        outcomes = self.run_concurrently([(date(2025, 6, 1), date(2025, 6, 2), 1)] * self.workers)
+
+        self.assertEqual(outcomes.count(True), 10)
+        self.assertEqual(RoomDayCapacity.objects.get(cold_room=self.room).reserved, 10)
+        self.assertEqual(Booking.objects.count(), 10)
+
+    def test_overlapping_ranges_stay_within_capacity(self):
+        # staggered multi-day bookings contend for shared days in different orders
+        bookings = [(date(2025, 6, 1 + n % 5), date(2025, 6, 4 + n % 5), 3) for n in range(self.workers)]
+        outcomes = self.run_concurrently(bookings)
+        self.assertEqual(outcomes.count(True), Booking.objects.count())
+
+        for counter in RoomDayCapacity.objects.filter(cold_room=self.room):
+            booked = sum(b.quantity for b in Booking.objects.filter(
+                start_date__lte=counter.day, end_date__gt=counter.day))
+            self.assertEqual(counter.reserved, booked)
+            self.assertLessEqual(counter.reserved, self.room.capacity)
+
+    def test_cancel_returns_capacity_once(self):
+        booking = Booking.objects.reserve(self.room, self.farmer, date(2025, 6, 1), date(2025, 6, 3), 4)
+        self.assertTrue(booking.cancel())
+        self.assertFalse(booking.cancel())
+        self.assertEqual(
+            list(RoomDayCapacity.objects.filter(cold_room=self.room).values_list('reserved', flat=True)),
+            [0, 0],
+        )
+
+
+class BookingAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='Secret123!', phone='+254700000001',
+            user_type=User.UserType.COLD_ROOM_OWNER,
+        )
+        cls.farmer = User.objects.create_user(
+            email='farmer@example.com', password='Secret123!', phone='+254700000002',
+            user_type=User.UserType.FARMER,
+        )
+        cls.room = ColdRoom.objects.create(
+            owner=cls.owner, name='Harvest Hub', location=Point(36.8219, -1.2921, srid=4326),
+            capacity=10, temp_min=0, temp_max=4, is_verified=True,
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def book(self, user=None, **fields):
+        data = {'cold_room': self.room.pk, 'quantity': 2, 'start_date': '2025-06-01', 'end_date': '2025-06-03'}
+        data.update(fields)
+        return self.client_for(user or self.farmer).post('/api/v1/bookings/', data, format='json')
+
+    def test_quantity_must_be_positive(self):
+        for quantity in (0, -1):
+            with self.subTest(quantity=quantity):
+                response = self.book(quantity=quantity)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('quantity', response.data)
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(RoomDayCapacity.objects.exists())
+
+    def test_create_reserves_every_day(self):
+        response = self.book()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], Booking.BookingStatus.CONFIRMED)
+        self.assertEqual(Booking.objects.get().farmer, self.farmer)
+        self.assertEqual(
+            list(RoomDayCapacity.objects.order_by('day').values_list('day', 'reserved')),
+            [(date(2025, 6, 1), 2), (date(2025, 6, 2), 2)],
+        )
+
+    def test_rejects_invalid_bookings(self):
+        hidden = ColdRoom.objects.create(
+            owner=self.owner, name='Unverified', location=Point(36.82, -1.29, srid=4326),
+            capacity=10, temp_min=0, temp_max=4,
+        )
+        for fields, field in (({'end_date': '2025-06-01'}, 'end_date'),
+                              ({'end_date': '2026-06-03'}, 'end_date'),
+                              ({'quantity': 11}, 'quantity'),
+                              ({'cold_room': hidden.pk}, 'cold_room')):
+            with self.subTest(**fields):
+                response = self.book(**fields)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.data)
+        self.assertEqual(APIClient().post('/api/v1/bookings/', {}, format='json').status_code, 401)
+
+    def test_full_days_are_a_conflict(self):
+        self.assertEqual(self.book(quantity=8).status_code, 201)
+        response = self.book(quantity=3, start_date='2025-06-02', end_date='2025-06-05')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertFalse(RoomDayCapacity.objects.filter(day=date(2025, 6, 3)).exclude(reserved=0).exists())
+
+    def test_bookings_are_visible_to_the_farmer_and_the_room_owner(self):
+        booking_id = self.book().data['id']
+        stranger = User.objects.create_user(
+            email='stranger@example.com', password='Secret123!', phone='+254700000003',
+            user_type=User.UserType.FARMER,
+        )
+        for user, visible in ((self.farmer, True), (self.owner, True), (stranger, False)):
+            with self.subTest(user=user.email):
+                client = self.client_for(user)
+                ids = [booking['id'] for booking in client.get('/api/v1/bookings/').data]
+                self.assertEqual(ids, [booking_id] if visible else [])
+                self.assertEqual(client.get(f'/api/v1/bookings/{booking_id}/').status_code,
+                                 200 if visible else 404)
+
+    def test_cancel_hands_units_back_once(self):
+        booking_id = self.book(quantity=4).data['id']
+        client = self.client_for(self.farmer)
+        response = client.post(f'/api/v1/bookings/{booking_id}/cancel/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], Booking.BookingStatus.CANCELLED)
+        self.assertEqual(client.post(f'/api/v1/bookings/{booking_id}/cancel/').status_code, 400)
+        self.assertEqual(set(RoomDayCapacity.objects.values_list('reserved', flat=True)), {0})
+
+    def test_capacity_lists_free_units_per_day(self):
+        self.book(quantity=4, start_date='2025-06-02', end_date='2025-06-03')
+        response = APIClient().get('/api/v1/bookings/capacity/', {
+            'cold_room': self.room.pk, 'start_date': '2025-06-01', 'end_date': '2025-06-04',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['capacity'], 10)
+        self.assertEqual([(day['day'], day['available']) for day in response.data['days']],
+                         [(date(2025, 6, 1), 10), (date(2025, 6, 2), 6), (date(2025, 6, 3), 10)])
+
+    def test_capacity_rejects_bad_periods(self):
+        for start_date, end_date in (('2025-06-03', '2025-06-03'), ('2025-06-03', '2025-06-01'),
+                                     ('2025-06-01', '2026-06-03'), ('2025-06-01', 'soon')):
+            with self.subTest(start_date=start_date, end_date=end_date):
+                response = APIClient().get('/api/v1/bookings/capacity/', {
+                    'cold_room': self.room.pk, 'start_date': start_date, 'end_date': end_date,
+                })
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,59 @@
+from django.db.models import Q
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from .models import Booking, CapacityUnavailable
+from .serializers import BookingSerializer, CapacityQuerySerializer
+
+
+class CapacityConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The cold room does not have enough free capacity for this period.'
+    default_code = 'capacity_unavailable'
+
+
+class IsBookingParty(permissions.BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return request.user in (obj.farmer, obj.cold_room.owner)
+
+
+class BookingViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
+                     mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    serializer_class = BookingSerializer
+    permission_classes = [permissions.IsAuthenticated, IsBookingParty]
+
+    def get_queryset(self):
+        # farmers see their bookings, owners see bookings on their rooms
+        user = self.request.user
+        return Booking.objects.filter(
+            Q(farmer=user) | Q(cold_room__owner=user)
+        ).select_related('cold_room__owner', 'farmer').order_by('-created_at')
+
+    def perform_create(self, serializer):
+        try:
+            serializer.save()
+        except CapacityUnavailable as exc:
+            raise CapacityConflict(str(exc))
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        booking = self.get_object()
+        if not booking.cancel():
+            return Response({'detail': 'Booking is already cancelled.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(booking).data)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
+    def capacity(self, request):
+        """Free units per day for a cold room, e.g. ?cold_room=1&start_date=2025-06-01&end_date=2025-06-08"""
+        query = CapacityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        cold_room = query.validated_data['cold_room']
+        remaining = Booking.objects.remaining_capacity(
+            cold_room, query.validated_data['start_date'], query.validated_data['end_date']
+        )
+        return Response({
+            'cold_room': cold_room.pk,
+            'capacity': cold_room.capacity,
+            'days': [{'day': day, 'available': free} for day, free in remaining.items()],
+        })
@@ -0,0 +1,47 @@
+"""
+Native async entry points for the public, read-heavy cold room endpoints.
+
+DRF 3.15 views are synchronous, so under ASGI each request would otherwise
+hold a thread from start to finish. These views run DRF's authentication,
+permission and throttle checks in one ``sync_to_async`` hop, then query
+through Django's async ORM and render without leaving the event loop.
+Requests the async path does not cover (browsable API, memory search
+engine, page-number pagination) are handed to the regular DRF view.
+"""
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+
+from .views import ColdRoomListViewSet, ColdRoomSearchViewSet
+
+
+def async_view(viewset_class, action):
+    sync_view = viewset_class.as_view({'get': action})
+
+    async def view(request, *args, **kwargs):
+        self = viewset_class(action_map={'get': action}, args=args, kwargs=kwargs)
+        self.request = request
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.format_kwarg = self.get_format_suffix(**kwargs)
+            renderer, _ = self.perform_content_negotiation(request)
+            if request.method != 'GET' or renderer.format != 'json' or not self.async_capable():
+                return await sync_to_async(sync_view)(request._request, *args, **kwargs)
+
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, 'a' + action)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        return response.render()
+
+    view.cls = viewset_class
+    return csrf_exempt(view)
+
+
+cold_room_list = async_view(ColdRoomListViewSet, 'list')
+cold_room_detail = async_view(ColdRoomListViewSet, 'retrieve')
+cold_room_search = async_view(ColdRoomSearchViewSet, 'list')
@@ -0,0 +1,222 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+# Bumped whenever a cold room or its verification changes, so anything derived
+# from the verified catalogue can tell it is stale without scanning keys.
+CATALOGUE_VERSION_KEY = 'coldrooms:catalogue-version'
+# when the version was last bumped, served as Last-Modified
+CATALOGUE_MODIFIED_KEY = 'coldrooms:catalogue-modified'
+RESPONSE_CACHE_HITS_KEY = 'coldrooms:response-cache:hits'
+RESPONSE_CACHE_MISSES_KEY = 'coldrooms:response-cache:misses'
+
+
+def _version_seed():
+    # timeout=None does not stop an LRU cache evicting the key. Restarting at
+    # a fixed value would make response entries and ETags of an earlier
+    # catalogue with the same version valid again, so restart from the clock.
+    return time.time_ns()
+
+
+def get_catalogue_version():
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        seed = _version_seed()
+        cache.add(CATALOGUE_VERSION_KEY, seed, timeout=None)
+        version = cache.get(CATALOGUE_VERSION_KEY, seed)
+    return version
+
+
+async def aget_catalogue_version():
+    version = await cache.aget(CATALOGUE_VERSION_KEY)
+    if version is None:
+        seed = _version_seed()
+        await cache.aadd(CATALOGUE_VERSION_KEY, seed, timeout=None)
+        version = await cache.aget(CATALOGUE_VERSION_KEY, seed)
+    return version
+
+
+def bump_catalogue_version():
+    # incr is atomic on Redis and LocMem, add() covers an empty/evicted cache
+    cache.add(CATALOGUE_VERSION_KEY, _version_seed(), timeout=None)
+    version = cache.incr(CATALOGUE_VERSION_KEY)
+    # Last-Modified has one-second resolution: two bumps within the same
+    # second must still give clients revalidating by date a newer value
+    previous = cache.get(CATALOGUE_MODIFIED_KEY, 0)
+    cache.set(CATALOGUE_MODIFIED_KEY, max(previous + 1, int(time.time())), timeout=None)
+    return version
+
+
+def get_catalogue_modified():
+    # an evicted timestamp restarts at "now", which only costs clients a refetch
+    modified = cache.get(CATALOGUE_MODIFIED_KEY)
+    if modified is None:
+        cache.add(CATALOGUE_MODIFIED_KEY, int(time.time()), timeout=None)
+        modified = cache.get(CATALOGUE_MODIFIED_KEY, int(time.time()))
+    return modified
+
+
+async def aget_catalogue_modified():
+    modified = await cache.aget(CATALOGUE_MODIFIED_KEY)
+    if modified is None:
+        await cache.aadd(CATALOGUE_MODIFIED_KEY, int(time.time()), timeout=None)
+        modified = await cache.aget(CATALOGUE_MODIFIED_KEY, int(time.time()))
+    return modified
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+async def _acount(key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 1, timeout=None)
+
+
+def response_cache_stats():
+    hits = cache.get(RESPONSE_CACHE_HITS_KEY, 0)
+    misses = cache.get(RESPONSE_CACHE_MISSES_KEY, 0)
+    return {'hits': hits, 'misses': misses}
+
+
+def response_fingerprint(request, version, media_type=None):
+    # parameter order and repeated keys must not produce different entries
+    params = request.query_params if hasattr(request, 'query_params') else request.GET
+    query = urlencode(sorted((key, value) for key, values in params.lists() for value in values))
+    media_type = media_type or request.accepted_media_type
+    raw = f"{version}|{request.build_absolute_uri(request.path)}?{query}|{media_type}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def response_cache_key(request, version):
+    return f"coldrooms:response:{version}:{response_fingerprint(request, version)}"
+
+
+def conditional_response(request, etag, modified):
+    """
+    Return a 304 (or 412) ``Response`` when the request's validators match, else ``None``.
+
+    Evaluated before anything is queried or serialized.
+    """
+    django_request = getattr(request, '_request', request)
+    conditional = get_conditional_response(django_request, etag=etag, last_modified=modified)
+    if conditional is None:
+        return None
+    return Response(status=conditional.status_code)
+
+
+def set_validators(response, etag, modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    # without this, heuristic freshness lets clients reuse a response unasked
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Serve ``list``/``retrieve`` from the cache while the catalogue version is unchanged.
+
+    Keys embed the catalogue version, so a room or verification change makes
+    every cached response unreachable at once and old entries simply expire.
+    The same version makes the ETag, and its bump time the Last-Modified, so
+    a client revalidating an unchanged result gets a 304 for two cache reads.
+    """
+    cached_statuses = (200, 404)
+    validated_statuses = (200, 304)
+
+    def cacheable(self, request):
+        return request.method == 'GET'
+
+    def cached(self, request, render):
+        if not self.cacheable(request):
+            return render()
+
+        version = get_catalogue_version()
+        etag = quote_etag(response_fingerprint(request, version))
+        modified = get_catalogue_modified()
+        response = conditional_response(request, etag, modified)
+        if response is None:
+            response = self.cached_render(request, render, version)
+        if response.status_code in self.validated_statuses:
+            set_validators(response, etag, modified)
+        return response
+
+    def cached_render(self, request, render, version):
+        timeout = settings.COLDROOM_RESPONSE_CACHE_TIMEOUT
+        if not timeout:
+            return render()
+
+        key = response_cache_key(request, version)
+        entry = cache.get(key)
+        if entry is not None:
+            _count(RESPONSE_CACHE_HITS_KEY)
+            data, status = entry
+            return Response(data, status=status)
+
+        _count(RESPONSE_CACHE_MISSES_KEY)
+        response = render()
+        if response.status_code in self.cached_statuses:
+            cache.set(key, (response.data, response.status_code), timeout)
+        return response
+
+    # views with custom listing logic override uncached_list() instead of list()
+    def list(self, request, *args, **kwargs):
+        return self.cached(request, lambda: self.uncached_list(request, *args, **kwargs))
+
+    def uncached_list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(request, lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs))
+
+    # async counterparts used by coldrooms.async_views; entries are shared
+    # with the sync path since the key only depends on the request
+    async def acached(self, request, render):
+        if not self.cacheable(request):
+            return await render()
+
+        version = await aget_catalogue_version()
+        etag = quote_etag(response_fingerprint(request, version))
+        modified = await aget_catalogue_modified()
+        response = conditional_response(request, etag, modified)
+        if response is None:
+            response = await self.acached_render(request, render, version)
+        if response.status_code in self.validated_statuses:
+            set_validators(response, etag, modified)
+        return response
+
+    async def acached_render(self, request, render, version):
+        timeout = settings.COLDROOM_RESPONSE_CACHE_TIMEOUT
+        if not timeout:
+            return await render()
+
+        key = response_cache_key(request, version)
+        entry = await cache.aget(key)
+        if entry is not None:
+            await _acount(RESPONSE_CACHE_HITS_KEY)
+            data, status = entry
+            return Response(data, status=status)
+
+        await _acount(RESPONSE_CACHE_MISSES_KEY)
+        response = await render()
+        if response.status_code in self.cached_statuses:
+            await cache.aset(key, (response.data, response.status_code), timeout)
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached(request, lambda: self.auncached_list(request, *args, **kwargs))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached(request, lambda: self.auncached_retrieve(request, *args, **kwargs))
@@ -0,0 +1,108 @@
+"""
+Map clusters for the verified catalogue.
+
+Rooms inside the requested bounding box are grouped in SQL by
+``ST_SnapToGrid`` with a cell of ``COLDROOM_CLUSTER_CELL_PX`` screen pixels
+at the requested zoom, so a response holds at most one feature per cell on
+screen however many rooms the box covers. The ``&&`` filter is answered by
+the GiST index on ``location``. From ``COLDROOM_CLUSTER_MAX_ZOOM`` on, cells
+holding a single room are returned as that room's full feature.
+
+Cells are square in degrees, which matches web mercator tiles closely at
+the latitudes the catalogue covers.
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Avg, Count, Min, Sum
+from rest_framework.exceptions import ValidationError
+
+from . import geojson
+from .geo import SnapToGrid, X, Y, envelope
+
+TILE_SIZE = 256  # pixels per web map tile
+MAX_ZOOM = 22
+
+
+def parse_bbox(value):
+    """Parse ``xmin,ymin,xmax,ymax`` in degrees."""
+    try:
+        extent = tuple(float(part) for part in (value or '').split(','))
+    except ValueError:
+        extent = ()
+    if len(extent) != 4 or not all(math.isfinite(part) for part in extent):
+        raise ValidationError({'detail': 'bbox must be xmin,ymin,xmax,ymax in degrees'})
+    xmin, ymin, xmax, ymax = extent
+    if not (-180 <= xmin < xmax <= 180 and -90 <= ymin < ymax <= 90):
+        raise ValidationError({'detail': 'bbox must lie within -180,-90,180,90 with min < max'})
+    return extent
+
+
+def parse_zoom(value):
+    try:
+        zoom = int(value)
+    except (TypeError, ValueError):
+        zoom = -1
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValidationError({'detail': f'zoom must be an integer between 0 and {MAX_ZOOM}'})
+    return zoom
+
+
+def cell_size(zoom):
+    """Return the grid cell size in degrees at ``zoom``."""
+    return 360.0 / (TILE_SIZE * 2 ** zoom) * settings.COLDROOM_CLUSTER_CELL_PX
+
+
+def cell_count(extent, size):
+    # ST_SnapToGrid rounds to the nearest grid point, one cell per point in the box
+    xmin, ymin, xmax, ymax = extent
+    columns = round(xmax / size) - round(xmin / size) + 1
+    rows = round(ymax / size) - round(ymin / size) + 1
+    return columns * rows
+
+
+def cluster_rows(queryset, extent, size):
+    """Return ``(count, lon, lat, capacity, first room id)`` per occupied cell."""
+    return (
+        queryset.filter(location__bboverlaps=envelope(extent))
+        .annotate(cell=SnapToGrid('location', size))
+        .values('cell')
+        .annotate(rooms=Count('pk'), lon=Avg(X('location')), lat=Avg(Y('location')),
+                  total_capacity=Sum('capacity'), first_room=Min('pk'))
+        .order_by('first_room')
+        .values_list('rooms', 'lon', 'lat', 'total_capacity', 'first_room')
+    )
+
+
+def cluster_feature(row, precision=None):
+    rooms, lon, lat, capacity, _ = row
+    if precision is not None:
+        lon, lat = round(lon, precision), round(lat, precision)
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+        'properties': {'cluster': True, 'count': rooms, 'capacity': capacity},
+    }
+
+
+def cluster_collection(queryset, extent, zoom, precision=None):
+    size = cell_size(zoom)
+    max_cells = settings.COLDROOM_CLUSTER_MAX_CELLS
+    if cell_count(extent, size) > max_cells:
+        raise ValidationError({
+            'detail': f'bbox spans more than {max_cells} cells at zoom {zoom}, zoom in or shrink it'
+        })
+
+    rows = list(cluster_rows(queryset, extent, size))
+    singles = []
+    if zoom >= settings.COLDROOM_CLUSTER_MAX_ZOOM:
+        singles = [row[4] for row in rows if row[0] == 1]
+        rows = [row for row in rows if row[0] > 1]
+
+    features = [cluster_feature(row, precision) for row in rows]
+    if singles:
+        for row in geojson.feature_rows(queryset.filter(pk__in=singles).order_by('pk')):
+            feature = geojson.feature(row, precision)
+            feature['properties']['cluster'] = False
+            features.append(feature)
+    return {'type': 'FeatureCollection', 'zoom': zoom, 'cell_size': size, 'features': features}
@@ -0,0 +1,139 @@
+"""
+Streaming export of the verified catalogue.
+
+Rows come from a server-side cursor (``iterator(chunk_size=...)``) and are
+encoded and optionally gzipped piece by piece, so memory use does not
+depend on the size of the catalogue. Used by ``export_view`` and
+``manage.py export_coldrooms``.
+"""
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import APIView
+
+from . import geojson
+from .cache import get_catalogue_modified, get_catalogue_version, response_fingerprint, set_validators
+from .models import ColdRoom
+from .renderers import dumps
+
+FORMATS = {
+    'geojson': ('application/geo+json', 'geojson'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# features are buffered into writes of about this many bytes
+WRITE_SIZE = 64 * 1024
+
+
+def catalogue_rows(chunk_size=None):
+    queryset = ColdRoom.objects.filter(is_verified=True).order_by('pk')
+    return geojson.feature_rows(queryset).iterator(
+        chunk_size=chunk_size or settings.COLDROOM_EXPORT_CHUNK_SIZE
+    )
+
+
+def encode(rows, output='geojson', precision=None):
+    """Yield the catalogue as NDJSON lines or one GeoJSON FeatureCollection, in ~64 KB pieces."""
+    ndjson = output == 'ndjson'
+    separator = b'\n' if ndjson else b','
+    buffer = bytearray() if ndjson else bytearray(b'{"type":"FeatureCollection","features":[')
+    first = True
+    for row in rows:
+        if not (first or ndjson):
+            buffer += separator
+        buffer += dumps(geojson.feature(row, precision))
+        if ndjson:
+            buffer += separator
+        first = False
+        if len(buffer) >= WRITE_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if not ndjson:
+        buffer += b']}'
+    if buffer:
+        yield bytes(buffer)
+
+
+def gzipped(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def aiterate(chunks):
+    """
+    Drive a sync chunk generator from the event loop one piece at a time.
+
+    Under ASGI, Django would otherwise ``list()`` a sync iterator, i.e.
+    hold the whole export in memory before sending the first byte.
+    """
+    step = sync_to_async(next, thread_sensitive=True)
+    iterator, done = iter(chunks), object()
+    while (chunk := await step(iterator, done)) is not done:
+        yield chunk
+
+
+def accepts_gzip(request):
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+
+class ExportView(APIView):
+    """
+    ``GET /api/v1/cold-rooms-list/export/?output=ndjson|geojson&precision=N``
+
+    Authenticated and throttled like the rest of the API, but the body is a
+    ``StreamingHttpResponse`` built here rather than a rendered
+    ``Response``. Compressed when the client sends ``Accept-Encoding: gzip``.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def perform_content_negotiation(self, request, force=False):
+        # ``output`` picks the format; renderers only format error responses
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        output = request.query_params.get('output', 'geojson')
+        if output not in FORMATS:
+            raise ValidationError({'detail': f"output must be one of: {', '.join(FORMATS)}"})
+        try:
+            precision = max(0, min(int(request.query_params['precision']), 15))
+        except (KeyError, ValueError):
+            precision = settings.COLDROOM_GEOJSON_PRECISION
+
+        content_type, extension = FORMATS[output]
+        compress = accepts_gzip(request)
+        # nightly partner pulls of an unchanged catalogue end here
+        version, modified = get_catalogue_version(), get_catalogue_modified()
+        etag = quote_etag(response_fingerprint(request, version, f"{content_type}|gzip={compress}"))
+        not_modified = get_conditional_response(request, etag=etag, last_modified=modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, modified)
+
+        chunks = encode(catalogue_rows(), output, precision)
+        if compress:
+            chunks = gzipped(chunks)
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiterate(chunks)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        set_validators(response, etag, modified)
+        response['Content-Disposition'] = (
+            f'attachment; filename="coldrooms-{timezone.now():%Y%m%d}.{extension}"'
+        )
+        return response
+
+
+export_view = ExportView.as_view()
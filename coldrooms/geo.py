@@ -0,0 +1,78 @@
+import math
+
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.geos import Polygon
+from django.db.models import FloatField, Func, Value
+
+KM_PER_DEGREE = 111.32
+# mean Earth radius, the sphere ST_DistanceSphere and haversine_km measure on
+EARTH_RADIUS_KM = 6371.0088
+
+
+class X(Func):
+    function = 'ST_X'
+    output_field = FloatField()
+
+
+class Y(Func):
+    function = 'ST_Y'
+    output_field = FloatField()
+
+
+class SnapToGrid(Func):
+    function = 'ST_SnapToGrid'
+    output_field = PointField(srid=4326)
+
+
+class SphereDistanceKm(Func):
+    """Great-circle distance in km, a plain float that combines with other expressions."""
+    function = 'ST_DistanceSphere'
+    template = '(%(function)s(%(expressions)s) / 1000.0)'
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        super().__init__(expression, Value(point, output_field=PointField(srid=4326)), **extra)
+
+
+class KNNDistance(Func):
+    """PostGIS ``<->`` operator, lets the GiST index drive ``ORDER BY ... LIMIT``."""
+    arg_joiner = ' <-> '
+    template = '(%(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        super().__init__(expression, Value(point, output_field=PointField(srid=4326)), **extra)
+
+
+def bbox_extent(lat, lon, radius_km):
+    """
+    Return ``(xmin, ymin, xmax, ymax)`` in degrees enclosing ``radius_km`` around a point.
+
+    Exact on the distance sphere: latitude reaches the angular radius, and
+    longitude the circle's widest point, which lies poleward of the centre.
+    A circle over a pole covers every longitude.
+    """
+    # 10 cm per 100 km wider, so neither rounding nor the few centimetres
+    # between PostGIS's radius and this one drop a room on the radius
+    angle = radius_km / EARTH_RADIUS_KM * (1 + 1e-6)
+    dlat = math.degrees(angle)
+    phi = math.radians(lat)
+    if angle >= math.pi / 2 - abs(phi):
+        return -180.0, max(lat - dlat, -90.0), 180.0, min(lat + dlat, 90.0)
+    dlon = math.degrees(math.asin(math.sin(angle) / math.cos(phi)))
+    return (
+        max(lon - dlon, -180.0), max(lat - dlat, -90.0),
+        min(lon + dlon, 180.0), min(lat + dlat, 90.0),
+    )
+
+
+def envelope(extent):
+    """Return ``(xmin, ymin, xmax, ymax)`` as an SRID 4326 polygon."""
+    box = Polygon.from_bbox(extent)
+    box.srid = 4326
+    return box
+
+
+def bounding_box(lat, lon, radius_km):
+    """Return an SRID 4326 polygon enclosing every point within ``radius_km``."""
+    return envelope(bbox_extent(lat, lon, radius_km))
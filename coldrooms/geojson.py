@@ -0,0 +1,65 @@
+"""
+Read-only GeoJSON emitter for cold room listings.
+
+Builds the same FeatureCollection as ``ColdRoomsListSerializer`` straight
+from ``values_list()`` tuples, skipping model instances, GEOS geometries
+and per-field serializer dispatch.
+"""
+from django.utils import timezone
+
+from .geo import X, Y
+
+# column order of the tuples consumed by ``feature()``
+LIST_COLUMNS = ('id', 'name', 'lon', 'lat', 'capacity', 'temp_min', 'temp_max',
+                'temp_unit', 'availability_schedule', 'is_verified', 'created_at')
+
+
+def feature_rows(queryset):
+    return queryset.annotate(lon=X('location'), lat=Y('location')).values_list(*LIST_COLUMNS)
+
+
+def _datetime(value):
+    # mirrors rest_framework.fields.DateTimeField with the ISO 8601 default
+    if not value:
+        return None
+    value = timezone.localtime(value) if timezone.is_aware(value) else value
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _decimal(value):
+    return None if value is None else f"{value:.2f}"
+
+
+def feature(row, precision=None):
+    (pk, name, lon, lat, capacity, temp_min, temp_max,
+     temp_unit, schedule, is_verified, created_at) = row
+    if precision is not None:
+        lon, lat = round(lon, precision), round(lat, precision)
+    return {
+        'id': pk,
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+        'properties': {
+            'name': name,
+            'latitude': lat,
+            'longitude': lon,
+            'capacity': capacity,
+            'temp_min': _decimal(temp_min),
+            'temp_max': _decimal(temp_max),
+            'temp_unit': temp_unit,
+            'availability_schedule': schedule,
+            'is_verified': is_verified,
+            'created_at': _datetime(created_at),
+        },
+    }
+
+
+def feature_collection(rows, precision=None):
+    return {
+        'type': 'FeatureCollection',
+        'features': [feature(row, precision) for row in rows],
+    }
+
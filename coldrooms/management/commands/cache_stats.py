@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from coldrooms.cache import get_catalogue_version, response_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the catalogue version and response cache hit/miss counters'
+
+    def handle(self, *args, **options):
+        stats = response_cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(f"catalogue version: {get_catalogue_version()}")
+        self.stdout.write(f"hits: {stats['hits']}  misses: {stats['misses']}  hit ratio: {ratio:.1%}")
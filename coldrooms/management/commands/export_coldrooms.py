@@ -0,0 +1,41 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from coldrooms.export import FORMATS, catalogue_rows, encode, gzipped
+
+
+class Command(BaseCommand):
+    help = 'Stream the verified cold room catalogue as GeoJSON or NDJSON, optionally gzipped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='-',
+                            help='File to write, "-" for stdout; a .gz suffix implies --gzip')
+        parser.add_argument('--format', choices=list(FORMATS), default='ndjson')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--precision', type=int, default=None)
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Rows per cursor fetch (default: COLDROOM_EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        path = options['output']
+        precision = options['precision']
+        if precision is None:
+            precision = settings.COLDROOM_GEOJSON_PRECISION
+
+        chunks = encode(catalogue_rows(options['chunk_size']), options['format'], precision)
+        if options['gzip'] or path.endswith('.gz'):
+            chunks = gzipped(chunks)
+
+        out = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        written = 0
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        if path != '-':
+            self.stderr.write(f"Wrote {written} bytes to {path}")
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.gis.db.models import Extent
+from django.core.management.base import BaseCommand, CommandError
+
+from coldrooms.cache import get_catalogue_modified, get_catalogue_version
+from coldrooms.models import ColdRoom
+from coldrooms.tiles import MAX_ZOOM, render_tile, static_tile_dir, tile_for
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate low-zoom vector tiles of the verified catalogue for the current catalogue version'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-zoom', type=int, default=None,
+                            help='Highest zoom to write (default: COLDROOM_TILE_STATIC_MAX_ZOOM)')
+
+    def handle(self, *args, **options):
+        max_zoom = options['max_zoom']
+        if max_zoom is None:
+            max_zoom = settings.COLDROOM_TILE_STATIC_MAX_ZOOM
+        if not 0 <= max_zoom <= MAX_ZOOM:
+            raise CommandError(f'--max-zoom must be between 0 and {MAX_ZOOM}.')
+        if max_zoom > settings.COLDROOM_TILE_STATIC_MAX_ZOOM:
+            self.stderr.write('Tiles above COLDROOM_TILE_STATIC_MAX_ZOOM are written but not served.')
+
+        # read before querying: if a room changes meanwhile, the set is
+        # labelled with a version that is already stale and never served
+        version, modified = get_catalogue_version(), get_catalogue_modified()
+        root = settings.COLDROOM_TILE_DIR
+        target = static_tile_dir(version, modified)
+        if os.path.isdir(target):
+            self.stdout.write(f"Tiles for catalogue version {version} already exist")
+            return
+
+        os.makedirs(root, exist_ok=True)
+        extent = ColdRoom.objects.filter(is_verified=True).aggregate(extent=Extent('location'))['extent']
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=root)
+        written = 0
+        try:
+            # tiles away from the catalogue's extent are empty and not written;
+            # one extra ring covers rooms drawn into a neighbour's buffer
+            for z in range(max_zoom + 1) if extent else ():
+                xmin, ymax = tile_for(extent[0], extent[1], z)
+                xmax, ymin = tile_for(extent[2], extent[3], z)
+                last = 2 ** z - 1
+                for x in range(max(xmin - 1, 0), min(xmax + 1, last) + 1):
+                    for y in range(max(ymin - 1, 0), min(ymax + 1, last) + 1):
+                        data = render_tile(z, x, y)
+                        if not data:
+                            continue
+                        os.makedirs(os.path.join(staging, str(z), str(x)), exist_ok=True)
+                        with open(os.path.join(staging, str(z), str(x), f'{y}.pbf'), 'wb') as tile:
+                            tile.write(data)
+                        written += 1
+            os.chmod(staging, 0o755)
+            # the directory only appears once complete, see tiles.static_tile()
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.stdout.write(f"Wrote {written} tiles up to zoom {max_zoom} for catalogue version {version}")
+
+        # older sets can never match the current version again
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if path != target and not name.startswith('.') and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,106 @@
+import asyncio
+import ssl
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = [
+    '/api/v1/cold-rooms-list/',
+    '/api/v1/search/?lat=-1.2921&lon=36.8219&radius=25',
+    '/api/v1/search/?lat=-1.2921&lon=36.8219&nearest=10',
+]
+
+
+async def fetch(url, read_rate):
+    """GET ``url`` over a fresh connection, reading at most ``read_rate`` bytes/s."""
+    parts = urlsplit(url)
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+    )
+    try:
+        target = parts.path + (f"?{parts.query}" if parts.query else '')
+        writer.write(
+            f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            f"Accept: application/json\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        # a slow mobile client drains the response a chunk at a time
+        while chunk := await reader.read(4096):
+            if read_rate:
+                await asyncio.sleep(len(chunk) / read_rate)
+        return status
+    finally:
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = ('Compare read endpoint throughput of running servers (e.g. gunicorn WSGI '
+            'against uvicorn ASGI workers) with many concurrent slow clients')
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, metavar='NAME=URL',
+                            help='Server to load, e.g. wsgi=http://127.0.0.1:8000 (repeatable)')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Request path, cycled by every client (repeatable)')
+        parser.add_argument('--concurrency', type=int, default=200)
+        parser.add_argument('--duration', type=float, default=30, help='Seconds per target')
+        parser.add_argument('--read-rate', type=int, default=16 * 1024,
+                            help='Bytes/s each client reads, 0 for full speed')
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep or not url.startswith(('http://', 'https://')):
+                raise CommandError(f"--target must look like NAME=http://host:port, got {target!r}")
+            targets.append((name, url.rstrip('/')))
+        paths = options['paths'] or DEFAULT_PATHS
+
+        self.stdout.write(f"{options['concurrency']} clients, {options['duration']:.0f}s per target, "
+                          f"{options['read_rate'] or 'unlimited'} B/s per client")
+        self.stdout.write(f"{'target':<10} {'requests':>9} {'req/s':>8} {'errors':>7} "
+                          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, base_url in targets:
+            latencies, errors = asyncio.run(self.run_target(base_url, paths, options))
+            self.report(name, latencies, errors, options['duration'])
+
+    async def run_target(self, base_url, paths, options):
+        latencies, errors = [], 0
+        deadline = time.monotonic() + options['duration']
+
+        async def client(offset):
+            nonlocal errors
+            n = offset
+            while time.monotonic() < deadline:
+                url = base_url + paths[n % len(paths)]
+                n += 1
+                start = time.monotonic()
+                try:
+                    status = await asyncio.wait_for(fetch(url, options['read_rate']), options['timeout'])
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                    errors += 1
+                    continue
+                # 404 is a valid "nothing nearby" search answer
+                if status >= 500 or status == 429:
+                    errors += 1
+                else:
+                    latencies.append(time.monotonic() - start)
+
+        await asyncio.gather(*(client(i) for i in range(options['concurrency'])))
+        return latencies, errors
+
+    def report(self, name, latencies, errors, duration):
+        if len(latencies) >= 2:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p95, p99 = (cuts[i] * 1000 for i in (49, 94, 98))
+        else:
+            p50 = p95 = p99 = float('nan')
+        self.stdout.write(f"{name:<10} {len(latencies):>9} {len(latencies) / duration:>8.1f} "
+                          f"{errors:>7} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f}")
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:29
+
+import datetime
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.operations
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def backfill_slots(apps, schema_editor):
+    ColdRoom = apps.get_model('coldrooms', 'ColdRoom')
+    AvailabilitySlot = apps.get_model('coldrooms', 'AvailabilitySlot')
+
+    slots = []
+    for room_id, schedule in ColdRoom.objects.values_list('id', 'availability_schedule').iterator():
+        periods = []
+        for slot in (schedule or {}).get('slots', []) if isinstance(schedule, dict) else []:
+            try:
+                start, end = parse_datetime(slot['start']), parse_datetime(slot['end'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if start is None or end is None or start >= end:
+                continue
+            if timezone.is_naive(start):
+                start = timezone.make_aware(start, datetime.timezone.utc)
+            if timezone.is_naive(end):
+                end = timezone.make_aware(end, datetime.timezone.utc)
+            # free-form legacy data may overlap, keep the first of any clash
+            if all(end <= lower or start >= upper for lower, upper in periods):
+                periods.append((start, end))
+        slots.extend(AvailabilitySlot(cold_room_id=room_id, period=DateTimeTZRange(start, end))
+                     for start, end in periods)
+    AvailabilitySlot.objects.bulk_create(slots, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coldrooms', '0002_coldroomverification'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.CreateModel(
+            name='AvailabilitySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', django.contrib.postgres.fields.ranges.DateTimeRangeField(verbose_name='Available Period')),
+                ('cold_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_slots', to='coldrooms.coldroom')),
+            ],
+            options={
+                'verbose_name': 'Availability Slot',
+                'verbose_name_plural': 'Availability Slots',
+                'indexes': [django.contrib.postgres.indexes.GistIndex(fields=['period'], name='availability_period_gist')],
+                'constraints': [django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('cold_room', '='), ('period', '&&')], name='availability_no_overlap')],
+            },
+        ),
+        migrations.RunPython(backfill_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def sync_approved_rooms(apps, schema_editor):
+    # approvals used to leave is_verified alone; only ever turn it on here
+    ColdRoom = apps.get_model('coldrooms', 'ColdRoom')
+    ColdRoom.objects.filter(verification__status='APPROVED', is_verified=False).update(is_verified=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coldrooms', '0003_availabilityslot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coldroomverification',
+            index=models.Index(fields=['status', 'submitted_at'], name='verification_status_queue_idx'),
+        ),
+        migrations.RunPython(sync_approved_rooms, migrations.RunPython.noop),
+    ]
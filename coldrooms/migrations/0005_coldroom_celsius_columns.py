@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:56
+
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coldrooms', '0004_verification_status_queue_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coldroom',
+            name='temp_max_c',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(temp_unit='F', then=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('temp_max'), '-', models.Value(32)), '*', models.Value(5)), '/', models.Value(9))), default=models.F('temp_max')), output_field=models.DecimalField(decimal_places=2, max_digits=5)),
+        ),
+        migrations.AddField(
+            model_name='coldroom',
+            name='temp_min_c',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(temp_unit='F', then=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('temp_min'), '-', models.Value(32)), '*', models.Value(5)), '/', models.Value(9))), default=models.F('temp_min')), output_field=models.DecimalField(decimal_places=2, max_digits=5)),
+        ),
+        migrations.AddIndex(
+            model_name='coldroom',
+            index=models.Index(fields=['is_verified', 'temp_min_c', 'temp_max_c', 'capacity'], name='coldroom_verified_temp_c_idx'),
+        ),
+    ]
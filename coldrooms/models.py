@@ -1,9 +1,21 @@
 from django.contrib.gis.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
 from django.contrib.postgres.indexes import GistIndex
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.db.models import JSONField
 from users.models import User
 
+def _celsius(field):
+    return Case(
+        When(temp_unit='F', then=(F(field) - Value(32)) * Value(5) / Value(9)),
+        default=F(field),
+    )
+
+
 class ColdRoom(models.Model):
     class TemperatureUnit(models.TextChoices):
         CELSIUS = 'C', _('Celsius')
@@ -26,6 +38,13 @@ class ColdRoom(models.Model):
     is_verified = models.BooleanField(_('Verified Status'), default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # temp_min/temp_max in Celsius whatever temp_unit says, computed by PostgreSQL
+    temp_min_c = models.GeneratedField(expression=_celsius('temp_min'),
+                                       output_field=models.DecimalField(max_digits=5, decimal_places=2),
+                                       db_persist=True)
+    temp_max_c = models.GeneratedField(expression=_celsius('temp_max'),
+                                       output_field=models.DecimalField(max_digits=5, decimal_places=2),
+                                       db_persist=True)
 
     class Meta:
         verbose_name = _('Cold Room')
@@ -41,12 +60,46 @@ class ColdRoom(models.Model):
                 fields=['location'],
                 name='coldroom_location_gist'
             ),
-            
+            # temperature requirement filters (required_temp, min_capacity)
+            models.Index(
+                fields=['is_verified', 'temp_min_c', 'temp_max_c', 'capacity'],
+                name='coldroom_verified_temp_c_idx'
+            ),
         ]
 
     def __str__(self):
         return f"{self.name} - ({self.owner.get_full_name()})"
     
+class ColdRoomVerificationQuerySet(models.QuerySet):
+    def review(self, status, reviewer, notes=None):
+        """
+        Give every verification in this queryset ``status`` and sync ``ColdRoom.is_verified``.
+
+        Both tables change through set-based UPDATEs in one transaction, so
+        model signals do not fire; the catalogue version is bumped once on
+        commit instead. Returns the ids of the reviewed verifications.
+        """
+        from .cache import bump_catalogue_version
+
+        now = timezone.now()
+        changes = {'status': status, 'reviewed_by': reviewer, 'reviewed_at': now}
+        if notes is not None:
+            changes['Verification_notes'] = notes
+        with transaction.atomic(using=self.db):
+            rows = list(self.select_for_update(of=('self',)).order_by('pk')
+                        .values_list('pk', 'cold_room_id'))
+            if not rows:
+                return []
+            ids = [pk for pk, _ in rows]
+            ColdRoomVerification.objects.filter(pk__in=ids).update(**changes)
+            ColdRoom.objects.filter(pk__in=[room_id for _, room_id in rows]).update(
+                is_verified=status == ColdRoomVerification.ColdRoomVerificationStatus.APPROVED,
+                updated_at=now,
+            )
+            transaction.on_commit(bump_catalogue_version, using=self.db)
+        return ids
+
+
 class ColdRoomVerification(models.Model):
     class ColdRoomVerificationStatus(models.TextChoices):
         PENDING = 'PENDING', _('Pending')
@@ -64,10 +117,46 @@ class ColdRoomVerification(models.Model):
     Verification_notes = models.TextField(_('Admin Notes'), blank=True)
     documentation = models.FileField(_('Verification Documents'), upload_to='coldroom/verifications/',
                                      blank=True, null=True)
-    
+
+    objects = ColdRoomVerificationQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Cold Room Verification')
         verbose_name_plural = _('Cold Room Verifications')
+        indexes = [
+            # review queue: filter on status, oldest submissions first
+            models.Index(fields=['status', 'submitted_at'], name='verification_status_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Verification for {self.cold_room.name}- {self.status}"
+
+class AvailabilitySlot(models.Model):
+    """
+    Normalized copy of the slots in ``ColdRoom.availability_schedule``.
+
+    Kept in sync by ``ColdRoomSerializer`` so availability searches run as
+    indexed range queries instead of parsing JSON in Python.
+    """
+    cold_room = models.ForeignKey(ColdRoom, on_delete=models.CASCADE, related_name='availability_slots')
+    period = DateTimeRangeField(_('Available Period'))
+
+    class Meta:
+        verbose_name = _('Availability Slot')
+        verbose_name_plural = _('Availability Slots')
+        indexes = [
+            # answers "which rooms are free for this whole range" (period @> range)
+            GistIndex(fields=['period'], name='availability_period_gist'),
+        ]
+        constraints = [
+            ExclusionConstraint(
+                name='availability_no_overlap',
+                expressions=[
+                    ('cold_room', RangeOperators.EQUAL),
+                    ('period', RangeOperators.OVERLAPS),
+                ],
+            ),
+        ]
 
     def __str__(self):
-        return f"Verification for {self.cold_room.name}- {self.status}"
\ No newline at end of file
+        return f"{self.cold_room.name}: {self.period.lower} - {self.period.upper}"
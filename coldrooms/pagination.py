@@ -0,0 +1,116 @@
+import base64
+import bisect
+import binascii
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class DistanceCursorPagination(BasePagination):
+    """
+    Keyset pagination over search results ordered by ``(distance, id)``.
+
+    Each page is a single query for ``page_size + 1`` rows starting after the
+    last ``(distance, id)`` seen, so rooms added between requests never shift
+    or repeat what the client has already received.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return cls.cursor_query_param in params or cls.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            distance, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return float(distance), int(pk)
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, distance, pk):
+        return base64.urlsafe_b64encode(json.dumps([distance, pk]).encode()).decode('ascii')
+
+    def page_queryset(self, queryset, request):
+        """Return the ``page_size + 1`` row slice following the request's cursor."""
+        self.request = request
+        self.position = self.decode_cursor(request)
+        self.current_page_size = self.get_page_size(request)
+
+        if self.position is not None:
+            distance, pk = self.position
+            queryset = queryset.filter(
+                Q(distance__gt=distance) | Q(distance=distance, pk__gt=pk)
+            )
+        return queryset.order_by('distance', 'pk')[:self.current_page_size + 1]
+
+    def take_page(self, rows):
+        self.has_next = len(rows) > self.current_page_size
+        page = rows[:self.current_page_size]
+        if page:
+            last = page[-1]
+            self.last_position = (last.distance.m, last.pk)
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.take_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.take_page([row async for row in self.page_queryset(queryset, request)])
+
+    def paginate_hits(self, hits, request):
+        """Same as ``paginate_queryset`` for ``(room_id, distance_km)`` lists."""
+        self.request = request
+        self.position = self.decode_cursor(request)
+        page_size = self.get_page_size(request)
+
+        if self.position is not None:
+            start = bisect.bisect_right(hits, self.position, key=lambda hit: (hit[1] * 1000, hit[0]))
+            hits = hits[start:]
+        self.has_next = len(hits) > page_size
+        page = hits[:page_size]
+        if page:
+            room_id, distance = page[-1]
+            self.last_position = (distance * 1000, room_id)
+        return page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(*self.last_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
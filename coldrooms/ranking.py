@@ -0,0 +1,91 @@
+"""
+Relevance-ranked search.
+
+Each room within the radius gets a score in ``[0, 1]`` combining three
+penalties, each in ``[0, 1]`` and weighted by ``COLDROOM_RANK_WEIGHTS``:
+
+- distance: ``distance / radius``
+- capacity: the share of the requested quantity the room cannot take,
+  from its capacity minus the units already booked on the requested days
+- temperature: how far the room's range falls short of the target, in
+  units of ``COLDROOM_RANK_TEMP_TOLERANCE`` degrees, capped at 1
+
+Scoring, ordering and the top-K cut all happen in one SQL query over the
+candidates the GiST index returns for the search's bounding box.
+"""
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db.models import F, FloatField, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, Least
+
+from bookings.models import RoomDayCapacity
+
+from . import geojson
+from .geo import SphereDistanceKm, X, Y, bounding_box
+
+RANK_COLUMNS = geojson.LIST_COLUMNS + ('distance_km', 'remaining_capacity', 'score')
+
+
+def _float(value):
+    return Value(float(value), output_field=FloatField())
+
+
+def reserved_units(first_day, last_day):
+    """Peak units already booked in the outer room on any day of ``[first_day, last_day]``."""
+    return Subquery(
+        RoomDayCapacity.objects.filter(cold_room=OuterRef('pk'), day__gte=first_day, day__lte=last_day)
+        .order_by()
+        .values('cold_room')
+        .annotate(peak=Max('reserved'))
+        .values('peak')
+    )
+
+
+def ranked_rooms(queryset, lat, lon, radius, limit, days, quantity=None, temperature=None):
+    """
+    Return the ``limit`` best rooms of ``queryset`` as ``RANK_COLUMNS`` tuples.
+
+    ``days`` is the ``(first, last)`` date range remaining capacity is
+    checked over, ``temperature`` a ``(low, high)`` target in Celsius.
+    """
+    weights = settings.COLDROOM_RANK_WEIGHTS
+    radius = max(radius, 1e-3)
+    origin = Point(lon, lat, srid=4326)
+
+    queryset = queryset.filter(location__contained=bounding_box(lat, lon, radius)).annotate(
+        distance_km=SphereDistanceKm('location', origin),
+        remaining_capacity=Greatest(
+            F('capacity') - Coalesce(reserved_units(*days), 0, output_field=IntegerField()),
+            0, output_field=IntegerField(),
+        ),
+    ).filter(distance_km__lte=radius)
+
+    penalty = weights['distance'] * F('distance_km') / _float(radius)
+    total = weights['distance']
+    if quantity:
+        shortfall = 1 - Cast('remaining_capacity', FloatField()) / _float(quantity)
+        penalty += weights['capacity'] * Greatest(shortfall, _float(0))
+        total += weights['capacity']
+    if temperature:
+        low, high = temperature
+        gap = (Greatest(Cast('temp_min_c', FloatField()) - _float(low), _float(0))
+               + Greatest(_float(high) - Cast('temp_max_c', FloatField()), _float(0)))
+        tolerance = _float(settings.COLDROOM_RANK_TEMP_TOLERANCE)
+        penalty += weights['temperature'] * Least(gap / tolerance, _float(1))
+        total += weights['temperature']
+
+    return queryset.annotate(
+        score=1 - penalty / _float(total),
+        lon=X('location'), lat=Y('location'),
+    ).order_by('-score', 'distance_km', 'pk').values_list(*RANK_COLUMNS)[:limit]
+
+
+def ranked_feature(row, precision=None):
+    *room, distance_km, remaining_capacity, score = row
+    feature = geojson.feature(room, precision)
+    feature['properties'].update({
+        'distance_km': round(distance_km, 3),
+        'remaining_capacity': remaining_capacity,
+        'score': round(score, 4),
+    })
+    return feature
@@ -0,0 +1,26 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional dependency, falls back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # DRF's encoder still handles Decimal, lazy strings and friends
+        return orjson.dumps(data, default=JSONEncoder().default)
+
+
+def dumps(data):
+    """Compact JSON bytes, through orjson when it is installed."""
+    if orjson is None:
+        return json.dumps(data, cls=JSONEncoder, separators=(',', ':')).encode()
+    return orjson.dumps(data, default=JSONEncoder().default)
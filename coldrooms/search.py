@@ -0,0 +1,268 @@
+import math
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from .cache import get_catalogue_version
+from .geo import EARTH_RADIUS_KM, KM_PER_DEGREE, X, Y, bbox_extent
+from .models import ColdRoom
+
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+# cell keys pack (column, row) into one int64 so every column of a bounding
+# box is a single contiguous slice of the sorted key array
+_CELL_SPAN = 1 << 24
+_CELL_OFFSET = 1 << 23
+
+# above this many pending upserts/removals the arrays are rebuilt in memory
+_COMPACT_THRESHOLD = 256
+# bounding boxes wider than this many columns are cheaper to scan in full
+_MAX_COLUMNS = 512
+
+
+def fetch_verified_rows(**filters):
+    """Return (id, lon, lat, capacity, temp_min_c, temp_max_c) tuples for verified rooms."""
+    rows = ColdRoom.objects.filter(is_verified=True, **filters).annotate(
+        lon=X('location'), lat=Y('location')
+    ).values_list('id', 'lon', 'lat', 'capacity', 'temp_min_c', 'temp_max_c')
+    return [
+        (pk, lon, lat, capacity, float(temp_min), float(temp_max))
+        for pk, lon, lat, capacity, temp_min, temp_max in rows
+    ]
+
+
+def haversine_km(lat, lon, lats, lons):
+    lat, lon = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (np.sin((lats - lat) / 2) ** 2
+         + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class SpatialGridIndex:
+    """
+    Compact in-memory grid index of verified cold rooms.
+
+    Rooms live in parallel numpy arrays sorted by grid cell. Changes made
+    after the arrays were built are kept in a small overlay and folded back
+    in once it grows past ``_COMPACT_THRESHOLD``.
+    """
+
+    def __init__(self, rows, cell_size):
+        self.cell_size = cell_size
+        self._lock = threading.Lock()
+        self._build(rows)
+
+    def _build(self, rows):
+        data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        keys = self._cell_keys(data[:, 1], data[:, 2])
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.ids = data[order, 0].astype(np.int64)
+        self.lons = data[order, 1]
+        self.lats = data[order, 2]
+        self.capacity = data[order, 3]
+        self.temp_min = data[order, 4]
+        self.temp_max = data[order, 5]
+        self._upserts = {}
+        self._removed = set()
+
+    def __len__(self):
+        removed = np.isin(self.ids, list(self._removed)).sum() if self._removed else 0
+        return len(self.ids) - int(removed) + len(self._upserts)
+
+    def _cell_keys(self, lons, lats):
+        cols = np.floor(np.asarray(lons) / self.cell_size).astype(np.int64) + _CELL_OFFSET
+        cells = np.floor(np.asarray(lats) / self.cell_size).astype(np.int64) + _CELL_OFFSET
+        return cols * _CELL_SPAN + cells
+
+    def rows(self):
+        removed = self._removed
+        base = [
+            row for row in zip(self.ids.tolist(), self.lons.tolist(), self.lats.tolist(),
+                               self.capacity.tolist(), self.temp_min.tolist(),
+                               self.temp_max.tolist())
+            if row[0] not in removed
+        ]
+        return base + list(self._upserts.values())
+
+    def upsert(self, row):
+        with self._lock:
+            self._removed.add(row[0])
+            self._upserts[row[0]] = row
+            self._maybe_compact()
+
+    def remove(self, room_id):
+        with self._lock:
+            self._removed.add(room_id)
+            self._upserts.pop(room_id, None)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if len(self._upserts) + len(self._removed) > _COMPACT_THRESHOLD:
+            self._build(self.rows())
+
+    def _candidates(self, lat, lon, radius_km):
+        if radius_km >= MAX_DISTANCE_KM:
+            return np.arange(len(self.ids))
+        # the same box as the PostGIS prefilter, so both engines find the same rooms
+        xmin, ymin, xmax, ymax = bbox_extent(lat, lon, radius_km)
+        col_lo, col_hi = (int(math.floor(v / self.cell_size)) for v in (xmin, xmax))
+        row_lo, row_hi = (int(math.floor(v / self.cell_size)) for v in (ymin, ymax))
+        if col_hi - col_lo > _MAX_COLUMNS:
+            return np.arange(len(self.ids))
+
+        cols = np.arange(col_lo, col_hi + 1, dtype=np.int64) + _CELL_OFFSET
+        starts = np.searchsorted(self.keys, cols * _CELL_SPAN + row_lo + _CELL_OFFSET, 'left')
+        ends = np.searchsorted(self.keys, cols * _CELL_SPAN + row_hi + _CELL_OFFSET, 'right')
+        ranges = [np.arange(s, e) for s, e in zip(starts, ends) if e > s]
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(ranges)
+
+    def radius(self, lat, lon, radius_km, allowed=None):
+        """
+        Return ``[(room_id, distance_km), ...]`` within radius, nearest first.
+
+        ``allowed`` optionally restricts the result to a set of room ids.
+        """
+        with self._lock:
+            idx = self._candidates(lat, lon, radius_km)
+            ids = self.ids[idx]
+            dist = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+            keep = dist <= radius_km
+            if self._removed:
+                keep &= ~np.isin(ids, list(self._removed))
+            ids, dist = ids[keep], dist[keep]
+
+            if self._upserts:
+                extra = np.array(list(self._upserts.values()), dtype=np.float64)
+                extra_dist = haversine_km(lat, lon, extra[:, 2], extra[:, 1])
+                near = extra_dist <= radius_km
+                ids = np.concatenate([ids, extra[near, 0].astype(np.int64)])
+                dist = np.concatenate([dist, extra_dist[near]])
+
+        if allowed is not None:
+            keep = np.isin(ids, np.fromiter(allowed, dtype=np.int64, count=len(allowed)))
+            ids, dist = ids[keep], dist[keep]
+
+        order = np.lexsort((ids, dist))
+        return list(zip(ids[order].tolist(), dist[order].tolist()))
+
+    def nearest(self, lat, lon, limit, max_km=None, allowed=None):
+        """Return the ``limit`` closest rooms, optionally capped at ``max_km``."""
+        ceiling = min(max_km or MAX_DISTANCE_KM, MAX_DISTANCE_KM)
+        radius_km = min(self.cell_size * KM_PER_DEGREE * 2, ceiling)
+        while True:
+            hits = self.radius(lat, lon, radius_km, allowed)
+            # every room closer than the limit-th hit is inside the radius already
+            if len(hits) >= limit or radius_km >= ceiling:
+                return hits[:limit]
+            radius_km = min(radius_km * 4, ceiling)
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return this worker's grid index, rebuilding it if the catalogue moved on."""
+    global _index, _index_version
+    version = get_catalogue_version()
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                _index = SpatialGridIndex(fetch_verified_rows(),
+                                          settings.COLDROOM_SEARCH_GRID_SIZE)
+                _index_version = version
+    return _index
+
+
+def apply_room_change(room_id, version):
+    """
+    Fold a single room change into the loaded index.
+
+    ``version`` is the catalogue version the change produced. If another
+    worker bumped the version in between, the index is left stale and the
+    next ``get_index()`` call rebuilds it.
+    """
+    global _index_version
+    if _index is None or _index_version != version - 1:
+        return
+    rows = fetch_verified_rows(pk=room_id)
+    if rows:
+        _index.upsert(rows[0])
+    else:
+        _index.remove(room_id)
+    _index_version = version
+
+
+# One statement for every origin: each origin's bounding box hits the GiST
+# index (&&), the lateral subquery keeps the exact distance filter, ordering
+# and per-origin limit local to that origin.
+BATCH_SEARCH_SQL = """
+    WITH origins AS (
+        SELECT *
+        FROM unnest(%s::int[], %s::float8[], %s::float8[], %s::float8[],
+                    %s::float8[], %s::float8[], %s::float8[], %s::float8[])
+             AS o(idx, lat, lon, radius_m, xmin, ymin, xmax, ymax)
+    )
+    SELECT o.idx, r.id, r.name, ST_X(r.location), ST_Y(r.location), r.capacity,
+           r.temp_min, r.temp_max, r.temp_unit, r.distance
+    FROM origins o
+    CROSS JOIN LATERAL (
+        SELECT c.*, ST_DistanceSphere(c.location, ST_SetSRID(ST_MakePoint(o.lon, o.lat), 4326)) AS distance
+        FROM {table} c
+        WHERE c.is_verified
+          AND c.location && ST_MakeEnvelope(o.xmin, o.ymin, o.xmax, o.ymax, 4326)
+          AND ST_DistanceSphere(c.location, ST_SetSRID(ST_MakePoint(o.lon, o.lat), 4326)) <= o.radius_m
+        ORDER BY distance, c.id
+        LIMIT %s
+    ) r
+    ORDER BY o.idx, r.distance, r.id
+"""
+
+
+def batch_radius_search(origins, limit):
+    """
+    Resolve many ``(lat, lon, radius_km)`` origins at once.
+
+    Returns one list per origin of ``(id, name, lon, lat, capacity, temp_min,
+    temp_max, temp_unit, distance_km)`` tuples, nearest first.
+    """
+    results = [[] for _ in origins]
+    if not origins:
+        return results
+
+    if settings.COLDROOM_SEARCH_ENGINE == 'memory':
+        index = get_index()
+        hits = [index.radius(lat, lon, radius)[:limit] for lat, lon, radius in origins]
+        room_ids = {room_id for origin_hits in hits for room_id, _ in origin_hits}
+        rooms = {
+            row[0]: row for row in ColdRoom.objects.filter(pk__in=room_ids).annotate(
+                lon=X('location'), lat=Y('location')
+            ).values_list('id', 'name', 'lon', 'lat', 'capacity', 'temp_min', 'temp_max', 'temp_unit')
+        }
+        for idx, origin_hits in enumerate(hits):
+            results[idx] = [rooms[room_id] + (distance,)
+                            for room_id, distance in origin_hits if room_id in rooms]
+        return results
+
+    extents = [bbox_extent(lat, lon, radius) for lat, lon, radius in origins]
+    params = [
+        list(range(len(origins))),
+        [lat for lat, _, _ in origins],
+        [lon for _, lon, _ in origins],
+        [radius * 1000 for _, _, radius in origins],
+        *([extent[i] for extent in extents] for i in range(4)),
+        limit,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(BATCH_SEARCH_SQL.format(table=ColdRoom._meta.db_table), params)
+        for idx, *row in cursor.fetchall():
+            row[-1] = row[-1] / 1000
+            results[idx].append(tuple(row))
+    return results
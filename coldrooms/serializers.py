@@ -1,7 +1,59 @@
+from django.conf import settings
 from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from rest_framework import serializers
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
-from .models import ColdRoom, ColdRoomVerification
+from .models import AvailabilitySlot, ColdRoom, ColdRoomVerification
+
+
+def parse_availability_slots(schedule):
+    """
+    Return sorted ``(start, end)`` pairs from ``{"slots": [{"start": ..., "end": ...}]}``.
+
+    Other keys in the schedule are left alone; slots must not overlap.
+    """
+    if not isinstance(schedule, dict):
+        raise serializers.ValidationError("Availability schedule must be a JSON object.")
+    slots = schedule.get('slots', [])
+    if not isinstance(slots, list):
+        raise serializers.ValidationError("'slots' must be a list of {start, end} objects.")
+
+    field = serializers.DateTimeField()
+    periods = []
+    for slot in slots:
+        if not isinstance(slot, dict) or not {'start', 'end'} <= slot.keys():
+            raise serializers.ValidationError("Each slot needs a 'start' and an 'end'.")
+        start = field.to_internal_value(slot['start'])
+        end = field.to_internal_value(slot['end'])
+        if start >= end:
+            raise serializers.ValidationError("A slot must end after it starts.")
+        periods.append((start, end))
+
+    periods.sort()
+    for (_, previous_end), (start, _) in zip(periods, periods[1:]):
+        if start < previous_end:
+            raise serializers.ValidationError("Availability slots must not overlap.")
+    return periods
+
+
+def availability_slots(cold_room):
+    return [
+        AvailabilitySlot(cold_room=cold_room, period=DateTimeTZRange(start, end))
+        for start, end in parse_availability_slots(cold_room.availability_schedule)
+    ]
+
+
+def sync_availability_slots(cold_room):
+    cold_room.availability_slots.all().delete()
+    AvailabilitySlot.objects.bulk_create(availability_slots(cold_room))
+
+
+def pop_location(validated_data):
+    # GeoJSON and PostGIS points are (x, y), i.e. (longitude, latitude)
+    latitude = validated_data.pop('latitude')
+    longitude = validated_data.pop('longitude')
+    return Point(longitude, latitude, srid=4326)
 
 
 class ColdRoomSerializer(GeoFeatureModelSerializer):
@@ -17,24 +69,78 @@ class ColdRoomSerializer(GeoFeatureModelSerializer):
                   'availability_schedule', 'is_verified', 'owner_email',
                   'created_at', 'updated_at']
         read_only_fields = ['is_verified', 'creatd_at', 'updated_at']
+        # set from latitude/longitude on write
+        extra_kwargs = {'location': {'read_only': True}}
+
+    def validate_availability_schedule(self, value):
+        parse_availability_slots(value)
+        return value
 
+    def build_instance(self, validated_data):
+        """Return an unsaved ``ColdRoom`` for the request user, as ``create()`` would save it."""
+        validated_data = dict(validated_data)
+        validated_data.pop('owner', None)
+        return ColdRoom(owner=self.context['request'].user,
+                        location=pop_location(validated_data), **validated_data)
+
+    @transaction.atomic
     def create(self, validated_data):
         # extract coordinates and convert them to point
-        latitude = validated_data.pop('latitude')
-        longitude = validated_data.pop('longitude')
-        validated_data['location'] = Point(latitude, longitude, srid=4326)
+        validated_data['location'] = pop_location(validated_data)
 
         # set owner for request user
         validated_data['owner'] = self.context['request'].user
-        return super().create(validated_data)
+        cold_room = super().create(validated_data)
+        sync_availability_slots(cold_room)
+        return cold_room
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        if 'latitude' in validated_data and 'longitude' in validated_data:
+            validated_data['location'] = pop_location(validated_data)
+        cold_room = super().update(instance, validated_data)
+        if 'availability_schedule' in validated_data:
+            sync_availability_slots(cold_room)
+        return cold_room
     
+class BulkColdRoomUpdateSerializer(serializers.Serializer):
+    """One item of a bulk partial update: the room id plus the fields to change."""
+    fields_to_update = ('capacity', 'temp_min', 'temp_max', 'temp_unit')
+
+    id = serializers.IntegerField()
+    capacity = serializers.IntegerField(min_value=0, required=False)
+    temp_min = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    temp_max = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    temp_unit = serializers.ChoiceField(choices=ColdRoom.TemperatureUnit.choices, required=False)
+
+    def validate(self, attrs):
+        if not attrs.keys() & self.fields_to_update:
+            raise serializers.ValidationError(
+                f"Provide at least one of: {', '.join(self.fields_to_update)}.")
+        return attrs
+
 class ColdRoomVerificationSerializer(serializers.ModelSerializer):
+    verification_notes = serializers.CharField(source='Verification_notes', required=False,
+                                               allow_blank=True)
+
     class Meta:
         model = ColdRoomVerification
         fields = ['id', 'cold_room', 'status', 'submitted_at',
                   'reviewed_at', 'reviewed_by', 'submitted_at', 'verification_notes', 'documentation']
         read_only_fields = ['reviewed_at', 'submitted_at', 'reviewed_by']
 
+class BulkVerificationReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=ColdRoomVerification.ColdRoomVerificationStatus.choices)
+    verification_notes = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_ids(self, value):
+        value = list(dict.fromkeys(value))
+        max_items = settings.COLDROOM_BULK_REVIEW_MAX_ITEMS
+        if len(value) > max_items:
+            raise serializers.ValidationError(f"At most {max_items} verifications are allowed per request.")
+        return value
+
 class ColdRoomsListSerializer(GeoFeatureModelSerializer):
     latitude = serializers.FloatField(source='location.y', read_only=True)
     longitude = serializers.FloatField(source='location.x', read_only=True)
@@ -53,3 +159,20 @@ class ColdRoomsListSerializer(GeoFeatureModelSerializer):
         }
 
 
+class SearchOriginSerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(min_value=0, default=5)
+
+class BatchSearchSerializer(serializers.Serializer):
+    origins = SearchOriginSerializer(many=True, allow_empty=False)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_origins(self, value):
+        max_origins = settings.COLDROOM_BATCH_SEARCH_MAX_ORIGINS
+        if len(value) > max_origins:
+            raise serializers.ValidationError(f"At most {max_origins} origins are allowed per request.")
+        return value
+
+    def validate_limit(self, value):
+        return min(value, settings.COLDROOM_BATCH_SEARCH_MAX_RESULTS)
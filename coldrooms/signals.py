@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .cache import bump_catalogue_version
+from .models import ColdRoom, ColdRoomVerification
+
+
+def _catalogue_changed(room_id):
+    def on_commit():
+        version = bump_catalogue_version()
+        if settings.COLDROOM_SEARCH_ENGINE == 'memory':
+            search.apply_room_change(room_id, version)
+    transaction.on_commit(on_commit)
+
+
+@receiver([post_save, post_delete], sender=ColdRoom)
+def cold_room_changed(sender, instance, **kwargs):
+    _catalogue_changed(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ColdRoomVerification)
+def verification_changed(sender, instance, **kwargs):
+    _catalogue_changed(instance.cold_room_id)
@@ -1,3 +1,844 @@
-from django.test import TestCase
+import gzip
+import json
+import math
+import os
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.http import Http404
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from . import async_views, clusters, export, geojson, ranking, search, serializers, tiles
+from .geo import EARTH_RADIUS_KM, bbox_extent
+from .cache import (
+    CATALOGUE_VERSION_KEY, CachedResponseMixin, bump_catalogue_version, get_catalogue_modified, response_cache_stats,
+)
+from .models import ColdRoom
+from .pagination import DistanceCursorPagination
+from .renderers import FastJSONRenderer
+from .search import SpatialGridIndex, haversine_km
+from users.models import User
+from users.throttling import AnonRateThrottle
+
+from .serializers import BulkVerificationReviewSerializer, ColdRoomSerializer, ColdRoomsListSerializer
+from .views import ColdRoomListViewSet, ColdRoomSearchViewSet, ColdRoomVerificationViewset, ColdRoomViewSet
+
+NAIROBI = (-1.2921, 36.8219)
+
+
+def destination(lat, lon, bearing, km):
+    """The point ``km`` away from ``(lat, lon)`` on the initial ``bearing`` (degrees), as ``(lat, lon)``."""
+    angle, phi, theta = km / EARTH_RADIUS_KM, math.radians(lat), math.radians(bearing)
+    lat2 = math.asin(math.sin(phi) * math.cos(angle) + math.cos(phi) * math.sin(angle) * math.cos(theta))
+    dlon = math.atan2(math.sin(theta) * math.sin(angle) * math.cos(phi),
+                      math.cos(angle) - math.sin(phi) * math.sin(lat2))
+    return math.degrees(lat2), lon + math.degrees(dlon)
+
+
+class BoundingBoxTests(SimpleTestCase):
+    def test_reach_matches_the_distance_sphere(self):
+        self.assertAlmostEqual(bbox_extent(0, 0, 100)[3], 0.89932, places=5)
+        self.assertAlmostEqual(bbox_extent(60, 0, 1000)[2], 18.2181, places=4)
+
+    def test_encloses_points_just_inside_the_radius(self):
+        for lat, radius in ((0, 100), (-1.29, 5), (45, 100), (60, 1000), (-70, 250), (80, 500)):
+            xmin, ymin, xmax, ymax = bbox_extent(lat, 10.0, radius)
+            for bearing in range(0, 360, 5):
+                with self.subTest(lat=lat, radius=radius, bearing=bearing):
+                    point_lat, point_lon = destination(lat, 10.0, bearing, radius * 0.9999)
+                    self.assertTrue(xmin <= point_lon <= xmax and ymin <= point_lat <= ymax)
+
+    def test_circles_over_a_pole_cover_every_longitude(self):
+        xmin, ymin, xmax, ymax = bbox_extent(85, 10, 1000)
+        self.assertEqual((xmin, xmax, ymax), (-180.0, 180.0, 90.0))
+        self.assertAlmostEqual(ymin, 85 - 1000 / EARTH_RADIUS_KM * 180 / math.pi, places=4)
+
+
+class SpatialGridIndexTests(SimpleTestCase):
+    def setUp(self):
+        # (id, lon, lat, capacity, temp_min_c, temp_max_c)
+        self.rows = [
+            (1, 36.8219, -1.2921, 100, 0, 4),    # Nairobi centre
+            (2, 36.8500, -1.3000, 50, 2, 8),     # ~3 km east
+            (3, 37.0700, -1.0300, 80, -5, 0),    # Thika, ~40 km
+            (4, 39.6682, -4.0435, 200, 0, 10),   # Mombasa, ~440 km
+        ]
+        self.index = SpatialGridIndex(self.rows, cell_size=0.05)
+
+    def brute_force(self, lat, lon, radius_km):
+        hits = []
+        for row in self.rows:
+            distance = float(haversine_km(lat, lon, [row[2]], [row[1]])[0])
+            if distance <= radius_km:
+                hits.append((row[0], distance))
+        return sorted(hits, key=lambda hit: (hit[1], hit[0]))
+
+    def test_radius_matches_brute_force(self):
+        for radius in (1, 5, 50, 500, 5000):
+            hits = self.index.radius(*NAIROBI, radius)
+            expected = self.brute_force(*NAIROBI, radius)
+            self.assertEqual([h[0] for h in hits], [e[0] for e in expected])
+            for (_, got), (_, want) in zip(hits, expected):
+                self.assertAlmostEqual(got, want, places=6)
+
+    def test_rooms_on_the_edge_of_the_radius_are_found(self):
+        for lat, lon in (NAIROBI, (60.0, 10.0)):
+            for radius in (5, 50, 500):
+                for bearing in (0, 90, 180):
+                    with self.subTest(lat=lat, radius=radius, bearing=bearing):
+                        edge_lat, edge_lon = destination(lat, lon, bearing, radius * 0.999)
+                        index = SpatialGridIndex([(9, edge_lon, edge_lat, 10, 0, 4)], cell_size=0.05)
+                        self.assertEqual([hit[0] for hit in index.radius(lat, lon, radius)], [9])
+
+    def test_nearest_expands_until_enough_rooms(self):
+        self.assertEqual([h[0] for h in self.index.nearest(*NAIROBI, 3)], [1, 2, 3])
+        self.assertEqual([h[0] for h in self.index.nearest(*NAIROBI, 3, max_km=10)], [1, 2])
+
+    def test_incremental_updates(self):
+        self.index.remove(2)
+        self.index.upsert((5, 36.8300, -1.2950, 10, 0, 4))
+        self.index.upsert((3, 36.8219, -1.2930, 80, -5, 0))  # moved into town
+        self.assertEqual([h[0] for h in self.index.radius(*NAIROBI, 5)], [1, 3, 5])
+        self.assertEqual(len(self.index), 4)
+
+
+class DistanceCursorPaginationTests(SimpleTestCase):
+    factory = APIRequestFactory()
+
+    def paginate(self, hits, **params):
+        paginator = DistanceCursorPagination()
+        request = Request(self.factory.get('/api/v1/search/', params))
+        return paginator, paginator.paginate_hits(hits, request)
+
+    def test_walks_pages_without_gaps_or_repeats(self):
+        hits = [(room_id, 1.5) for room_id in range(1, 6)] + [(6, 2.0), (7, 3.25)]
+        seen, cursor = [], ''
+        while True:
+            paginator, page = self.paginate(hits, cursor=cursor, page_size=3)
+            seen.extend(room_id for room_id, _ in page)
+            if not paginator.has_next:
+                break
+            cursor = paginator.encode_cursor(*paginator.last_position)
+        self.assertEqual(seen, [1, 2, 3, 4, 5, 6, 7])
+
+    def test_rooms_added_before_cursor_do_not_shift_pages(self):
+        hits = [(1, 1.0), (2, 2.0), (3, 3.0), (4, 4.0)]
+        paginator, page = self.paginate(hits, page_size=2)
+        cursor = paginator.encode_cursor(*paginator.last_position)
+
+        hits = sorted(hits + [(9, 0.5)], key=lambda hit: (hit[1], hit[0]))
+        _, page = self.paginate(hits, cursor=cursor, page_size=2)
+        self.assertEqual(page, [(3, 3.0), (4, 4.0)])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self.paginate([], cursor='not-a-cursor')
+
+
+class CatalogueResponseCacheTests(SimpleTestCase):
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def render(self):
+        self.calls += 1
+        return Response({'results': [self.calls]})
+
+    def request(self, path):
+        request = Request(self.factory.get(path))
+        request.accepted_media_type = 'application/json'
+        return request
+
+    def test_hits_until_catalogue_version_changes(self):
+        view = CachedResponseMixin()
+        first = view.cached(self.request('/api/v1/cold-rooms-list/?b=2&a=1'), self.render)
+        again = view.cached(self.request('/api/v1/cold-rooms-list/?a=1&b=2'), self.render)
+        self.assertEqual(first.data, again.data)
+        self.assertEqual(self.calls, 1)
+
+        bump_catalogue_version()
+        view.cached(self.request('/api/v1/cold-rooms-list/?a=1&b=2'), self.render)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(response_cache_stats(), {'hits': 1, 'misses': 2})
+
+    def conditional(self, path, **headers):
+        request = Request(self.factory.get(path, **headers))
+        request.accepted_media_type = 'application/json'
+        return CachedResponseMixin().cached(request, self.render)
+
+    @override_settings(COLDROOM_RESPONSE_CACHE_TIMEOUT=0)
+    def test_unchanged_catalogue_revalidates_without_rendering(self):
+        first = self.conditional('/api/v1/search/?lat=1&lon=2')
+        self.assertEqual(first['Cache-Control'], 'no-cache')
+        etag, modified = first['ETag'], first['Last-Modified']
+
+        response = self.conditional('/api/v1/search/?lon=2&lat=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.data), (304, None))
+        self.assertEqual(response['ETag'], etag)
+        response = self.conditional('/api/v1/search/?lat=1&lon=2', HTTP_IF_MODIFIED_SINCE=modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.calls, 1)
+
+        # other parameters or a newer catalogue get a fresh body
+        self.assertEqual(self.conditional('/api/v1/search/?lat=1&lon=3', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        bump_catalogue_version()
+        response = self.conditional('/api/v1/search/?lat=1&lon=2', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        # even within the second the first response was dated
+        response = self.conditional('/api/v1/search/?lat=1&lon=2', HTTP_IF_MODIFIED_SINCE=modified)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(COLDROOM_RESPONSE_CACHE_TIMEOUT=300)
+    def test_evicted_version_does_not_revive_old_responses(self):
+        first = self.conditional('/api/v1/search/?lat=1&lon=2')
+        bump_catalogue_version()
+        # the version key is evicted; the next read must not restart at an old version
+        cache.delete(CATALOGUE_VERSION_KEY)
+
+        response = self.conditional('/api/v1/search/?lat=1&lon=2', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(self.calls, 2)
+
+    def test_modified_time_increases_with_every_bump(self):
+        times = [get_catalogue_modified()]
+        for _ in range(3):
+            bump_catalogue_version()
+            times.append(get_catalogue_modified())
+        self.assertEqual(times, sorted(set(times)))
+
+
+class AsyncReadViewTests(SimpleTestCase):
+    factory = AsyncRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_list_renders_json_and_shares_response_cache(self):
+        collection = {'type': 'FeatureCollection', 'features': []}
+        with mock.patch.object(ColdRoomListViewSet, 'auncached_list',
+                               mock.AsyncMock(return_value=Response(collection))) as render:
+            for _ in range(2):
+                response = await async_views.cold_room_list(self.factory.get('/api/v1/cold-rooms-list/'))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.content), collection)
+        render.assert_awaited_once()
+
+    async def test_errors_go_through_drf_exception_handler(self):
+        missing = Http404('No ColdRoom matches the given query.')
+        with mock.patch.object(ColdRoomListViewSet, 'auncached_retrieve',
+                               mock.AsyncMock(side_effect=missing)):
+            response = await async_views.cold_room_detail(
+                self.factory.get('/api/v1/cold-rooms-list/7/'), pk=7
+            )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {'detail': 'No ColdRoom matches the given query.'})
+
+
+class ColdRoomBulkTests(SimpleTestCase):
+    factory = APIRequestFactory()
+    view = staticmethod(ColdRoomViewSet.as_view({'post': 'bulk', 'patch': 'bulk_update'}))
+
+    def setUp(self):
+        self.owner = User(pk=1, email='owner@example.com', user_type=User.UserType.COLD_ROOM_OWNER)
+
+    def room(self, **fields):
+        lat, lon = NAIROBI
+        return {'name': 'Harvest Hub', 'latitude': lat, 'longitude': lon, 'capacity': 120,
+                'temp_min': '2.00', 'temp_max': '8.00', 'owner_email': self.owner.email, **fields}
+
+    def post(self, items, path='/api/v1/cold-rooms/bulk/'):
+        request = self.factory.post(path, items, format='json')
+        force_authenticate(request, user=self.owner)
+        return self.view(request)
+
+    def test_invalid_item_rejects_the_whole_list(self):
+        response = self.post([self.room(), self.room(capacity=-1), 'not a room'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual([item['index'] for item in response.data['results']], [1, 2])
+        self.assertIn('capacity', response.data['results'][0]['errors'])
+
+    def test_partial_request_without_valid_items(self):
+        response = self.post([self.room(name='')], path='/api/v1/cold-rooms/bulk/?allow_partial=true')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['failed'], 1)
+
+    @override_settings(COLDROOM_BULK_MAX_ITEMS=2)
+    def test_list_size_is_capped(self):
+        self.assertEqual(self.post([self.room()] * 3).status_code, 400)
+        self.assertEqual(self.post({'rooms': []}).status_code, 400)
+
+    def test_built_rooms_store_longitude_as_x(self):
+        request = self.factory.post('/api/v1/cold-rooms/bulk/')
+        request.user = self.owner
+        serializer = ColdRoomSerializer(context={'request': request})
+        room = serializer.build_instance(serializer.run_validation(self.room()))
+        self.assertEqual((room.location.x, room.location.y), NAIROBI[::-1])
+        self.assertEqual(room.owner, self.owner)
+
+
+class RoomRequirementsTests(SimpleTestCase):
+    def requirements(self, **params):
+        view = ColdRoomListViewSet(action='list')
+        view.request = Request(APIRequestFactory().get('/api/v1/cold-rooms-list/', params))
+        return view.get_requirements()
+
+    def test_parses_temperature_and_capacity(self):
+        self.assertEqual(self.requirements(required_temp='4,2', min_capacity='50'), {
+            'temp_min_c__lte': 2.0, 'temp_max_c__gte': 4.0, 'capacity__gte': 50,
+        })
+        self.assertEqual(self.requirements(required_temp='-18'),
+                         {'temp_min_c__lte': -18.0, 'temp_max_c__gte': -18.0})
+        self.assertEqual(self.requirements(), {})
+
+    def test_rejects_malformed_values(self):
+        for params in ({'required_temp': 'cold'}, {'required_temp': '1,2,3'},
+                       {'required_temp': 'nan'}, {'min_capacity': 'lots'}):
+            with self.subTest(**params), self.assertRaises(ValidationError):
+                self.requirements(**params)
+
+
+class VerificationReviewTests(SimpleTestCase):
+    factory = APIRequestFactory()
+
+    def get_queue(self, **params):
+        request = self.factory.get('/api/v1/verifications/', params)
+        force_authenticate(request, user=User(pk=1, is_staff=True))
+        return ColdRoomVerificationViewset.as_view({'get': 'list'})(request)
+
+    def test_queue_rejects_bad_filters(self):
+        self.assertIn('status', self.get_queue(status='DONE').data)
+        self.assertIn('submitted_after', self.get_queue(submitted_after='yesterday').data)
+
+    @override_settings(COLDROOM_BULK_REVIEW_MAX_ITEMS=3)
+    def test_review_ids_are_deduplicated_and_capped(self):
+        serializer = BulkVerificationReviewSerializer(data={'ids': [3, 1, 3, 1], 'status': 'APPROVED'})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['ids'], [3, 1])
+        serializer = BulkVerificationReviewSerializer(data={'ids': [1, 2, 3, 4], 'status': 'APPROVED'})
+        self.assertFalse(serializer.is_valid())
+
+    def test_single_review_touches_the_room_like_bulk_review(self):
+        view = ColdRoomVerificationViewset(request=SimpleNamespace(user=User(pk=1, is_staff=True)))
+        serializer = mock.Mock(validated_data={'status': 'APPROVED'})
+        serializer.save.return_value = SimpleNamespace(cold_room_id=5, status='APPROVED')
+        with mock.patch.object(ColdRoom.objects, 'filter') as rooms:
+            # without the transaction.atomic wrapper, which would need a database
+            ColdRoomVerificationViewset.save_review.__wrapped__(view, serializer)
+        rooms.assert_called_once_with(pk=5)
+        changes = rooms.return_value.update.call_args.kwargs
+        self.assertEqual(changes['is_verified'], True)
+        self.assertEqual(changes['updated_at'], serializer.save.call_args.kwargs['reviewed_at'])
+
+
+class GeoJSONEmitterParityTests(SimpleTestCase):
+    def make_room(self, pk, lon, lat, **kwargs):
+        fields = dict(
+            id=pk, name=f'Room {pk}', location=Point(lon, lat, srid=4326), capacity=120,
+            temp_min=Decimal('-2.50'), temp_max=Decimal('4.00'), temp_unit='C',
+            availability_schedule={'mon': ['08:00', '17:00']}, is_verified=True,
+            created_at=datetime(2025, 5, 12, 15, 18, 3, 123456, tzinfo=dt_timezone.utc),
+        )
+        fields.update(kwargs)
+        return ColdRoom(**fields)
+
+    def as_row(self, room):
+        return (room.id, room.name, room.location.x, room.location.y, room.capacity,
+                room.temp_min, room.temp_max, room.temp_unit, room.availability_schedule,
+                room.is_verified, room.created_at)
+
+    def assertSameCollection(self, fast, slow):
+        fast, slow = json.loads(json.dumps(fast)), json.loads(json.dumps(slow))
+        self.assertEqual(len(fast['features']), len(slow['features']))
+        for fast_feature, slow_feature in zip(fast['features'], slow['features']):
+            # GDAL's GeoJSON writer may differ from the raw double in the last digit
+            for got, want in zip(fast_feature['geometry'].pop('coordinates'),
+                                 slow_feature['geometry'].pop('coordinates')):
+                self.assertAlmostEqual(got, want, places=12)
+        self.assertEqual(fast, slow)
+
+    def test_matches_list_serializer(self):
+        rooms = [
+            self.make_room(1, 36.8219, -1.2921),
+            self.make_room(2, 39.668206, -4.043477, temp_unit='F', temp_min=Decimal('28.40'),
+                           temp_max=Decimal('39.20'), availability_schedule={}, is_verified=False),
+            self.make_room(3, 34.7617, -0.0917, created_at=datetime(2025, 1, 1, tzinfo=dt_timezone.utc)),
+        ]
+        slow = ColdRoomsListSerializer(rooms, many=True).data
+        fast = geojson.feature_collection([self.as_row(room) for room in rooms])
+        self.assertSameCollection(fast, slow)
+        self.assertEqual(list(fast['features'][0]), ['id', 'type', 'geometry', 'properties'])
+        self.assertEqual(list(fast['features'][0]['properties']), list(slow['features'][0]['properties']))
+
+    def test_precision_rounds_coordinates(self):
+        row = self.as_row(self.make_room(1, 36.82191234, -1.29214567))
+        feature = geojson.feature(row, precision=4)
+        self.assertEqual(feature['geometry']['coordinates'], [36.8219, -1.2921])
+        self.assertEqual(feature['properties']['latitude'], -1.2921)
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = geojson.feature_collection([self.as_row(self.make_room(1, 36.8219, -1.2921))])
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)),
+                         json.loads(JSONRenderer().render(data)))
+
+
+class CatalogueExportTests(SimpleTestCase):
+    def rows(self, count):
+        return [(pk, f'Room {pk}', 36.8 + pk / 1000, -1.29, 120, Decimal('2.00'), Decimal('8.00'), 'C',
+                 {}, True, datetime(2025, 5, 12, tzinfo=dt_timezone.utc)) for pk in range(1, count + 1)]
+
+    def test_geojson_matches_feature_collection(self):
+        rows = self.rows(3)
+        with mock.patch.object(export, 'WRITE_SIZE', 100):
+            chunks = list(export.encode(iter(rows), 'geojson'))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(json.loads(b''.join(chunks)),
+                         json.loads(json.dumps(geojson.feature_collection(rows))))
+        self.assertEqual(json.loads(b''.join(export.encode(iter([]), 'geojson'))),
+                         {'type': 'FeatureCollection', 'features': []})
+
+    def test_ndjson_is_one_feature_per_line(self):
+        lines = b''.join(export.encode(iter(self.rows(3)), 'ndjson')).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [1, 2, 3])
+
+    def test_view_streams_gzip_when_accepted(self):
+        request = RequestFactory().get('/api/v1/cold-rooms-list/export/', {'output': 'ndjson'},
+                                       HTTP_ACCEPT='application/x-ndjson', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        with mock.patch.object(export, 'catalogue_rows', return_value=iter(self.rows(2))):
+            response = export.export_view(request)
+            body = b''.join(response.streaming_content)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(gzip.decompress(body).splitlines()), 2)
+
+    def test_view_answers_revalidation_with_304(self):
+        factory = RequestFactory()
+        with mock.patch.object(export, 'catalogue_rows', return_value=iter(self.rows(1))) as rows:
+            etag = export.export_view(factory.get('/api/v1/cold-rooms-list/export/'))['ETag']
+            response = export.export_view(factory.get('/api/v1/cold-rooms-list/export/',
+                                                      HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(rows.call_count, 1)
+
+    def test_view_rejects_unknown_output(self):
+        request = RequestFactory().get('/api/v1/cold-rooms-list/export/', {'output': 'csv'})
+        self.assertEqual(export.export_view(request).status_code, 400)
+
+    def test_view_is_throttled(self):
+        request = RequestFactory().get('/api/v1/cold-rooms-list/export/')
+        with mock.patch.object(AnonRateThrottle, 'allow_request', return_value=False), \
+                mock.patch.object(AnonRateThrottle, 'wait', return_value=60), \
+                mock.patch.object(export, 'catalogue_rows') as rows:
+            response = export.export_view(request)
+        self.assertEqual(response.status_code, 429)
+        rows.assert_not_called()
+
+    async def test_asgi_requests_stream_without_buffering(self):
+        request = AsyncRequestFactory().get('/api/v1/cold-rooms-list/export/')
+        with mock.patch.object(export, 'catalogue_rows', return_value=iter(self.rows(2))):
+            response = export.export_view(request)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(json.loads(body)['features']), 2)
+
+
+class ClusterTests(SimpleTestCase):
+    factory = APIRequestFactory()
+
+    def get_clusters(self, **params):
+        request = self.factory.get('/api/v1/cold-rooms-list/clusters/', params)
+        return ColdRoomListViewSet.as_view({'get': 'clusters'})(request)
+
+    def test_rejects_malformed_bbox_and_zoom(self):
+        for params in ({'zoom': 10}, {'bbox': '36,-2,37', 'zoom': 10}, {'bbox': '37,-2,36,-1', 'zoom': 10},
+                       {'bbox': '36,-2,37,nan', 'zoom': 10}, {'bbox': '36,-2,37,-1', 'zoom': 30},
+                       {'bbox': '36,-2,37,-1'}):
+            with self.subTest(**params):
+                self.assertEqual(self.get_clusters(**params).status_code, 400)
+
+    @override_settings(COLDROOM_CLUSTER_CELL_PX=64, COLDROOM_CLUSTER_MAX_CELLS=4096)
+    def test_cells_follow_zoom_not_rooms(self):
+        self.assertEqual(clusters.cell_size(0), 90.0)
+        self.assertEqual(clusters.cell_count((-180, -90, 180, 90), clusters.cell_size(0)), 15)
+        # the same box is too many cells once zoomed in, before any query runs
+        response = self.get_clusters(bbox='-180,-90,180,90', zoom=8)
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(COLDROOM_CLUSTER_MAX_ZOOM=15)
+    def test_single_room_cells_become_rooms_at_high_zoom(self):
+        rows = [(3, 36.8123456, -1.29, 300, 1), (1, 36.9, -1.3, 80, 7)]
+        room = (7, 'Room 7', 36.9, -1.3, 80, Decimal('2.00'), Decimal('8.00'), 'C', {}, True,
+                datetime(2025, 5, 12, tzinfo=dt_timezone.utc))
+        queryset = mock.MagicMock()
+        with mock.patch.object(clusters, 'cluster_rows', return_value=rows), \
+                mock.patch.object(geojson, 'feature_rows', return_value=[room]) as feature_rows:
+            low = clusters.cluster_collection(queryset, (36, -2, 37, -1), 10, precision=3)
+            feature_rows.assert_not_called()
+            high = clusters.cluster_collection(queryset, (36.8, -1.31, 36.95, -1.28), 15)
+
+        self.assertEqual([feature['properties'] for feature in low['features']], [
+            {'cluster': True, 'count': 3, 'capacity': 300},
+            {'cluster': True, 'count': 1, 'capacity': 80},
+        ])
+        self.assertEqual(low['features'][0]['geometry']['coordinates'], [36.812, -1.29])
+        self.assertEqual([feature['properties']['cluster'] for feature in high['features']], [True, False])
+        self.assertEqual(high['features'][1]['id'], 7)
+        queryset.filter.assert_called_once_with(pk__in=[7])
+
+
+class VectorTileTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def get_tile(self, z, x, y, **headers):
+        return tiles.tile_view(self.factory.get(f'/api/v1/tiles/{z}/{x}/{y}.pbf', **headers), z=z, x=x, y=y)
+
+    def test_tile_math(self):
+        self.assertEqual(tiles.tile_for(0, 0, 1), (1, 1))
+        self.assertEqual(tiles.tile_for(-180, 89, 3), (0, 0))
+        self.assertEqual(tiles.tile_for(180, -89, 3), (7, 7))
+        self.assertEqual(tiles.tile_for(36.8219, -1.2921, 12), (2466, 2062))
+        self.assertFalse(tiles.tile_exists(2, 4, 0))
+        self.assertEqual(self.get_tile(1, 0, 2).status_code, 404)
+
+    def test_rendered_tiles_are_cached_per_catalogue_version(self):
+        with mock.patch.object(tiles, 'render_tile', return_value=b'\x1a\x02mvt') as render:
+            first = self.get_tile(12, 2466, 2062)
+            self.assertEqual((first.status_code, first.content), (200, b'\x1a\x02mvt'))
+            self.assertEqual(first['Content-Type'], tiles.CONTENT_TYPE)
+            self.get_tile(12, 2466, 2062)
+            self.assertEqual(self.get_tile(12, 2466, 2062, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+            self.assertEqual(render.call_count, 1)
+
+            bump_catalogue_version()
+            render.return_value = b''
+            self.assertEqual(self.get_tile(12, 2466, 2062).status_code, 204)
+            self.assertEqual(render.call_count, 2)
+
+    def test_view_is_throttled(self):
+        with mock.patch.object(AnonRateThrottle, 'allow_request', return_value=False), \
+                mock.patch.object(AnonRateThrottle, 'wait', return_value=60), \
+                mock.patch.object(tiles, 'get_tile') as get_tile:
+            response = self.get_tile(12, 2466, 2062, HTTP_ACCEPT='application/x-protobuf')
+        self.assertEqual(response.status_code, 429)
+        get_tile.assert_not_called()
+
+    def test_pregenerated_tiles_skip_the_database(self):
+        with tempfile.TemporaryDirectory() as root, \
+                override_settings(COLDROOM_TILE_DIR=root, COLDROOM_TILE_STATIC_MAX_ZOOM=6), \
+                mock.patch.object(tiles, 'render_tile', side_effect=AssertionError('queried')) as render:
+            directory = tiles.static_tile_dir(tiles.get_catalogue_version(), tiles.get_catalogue_modified())
+            os.makedirs(os.path.join(directory, '6', '38'))
+            with open(os.path.join(directory, '6', '38', '32.pbf'), 'wb') as tile:
+                tile.write(b'\x1a\x02mvt')
+
+            self.assertEqual(self.get_tile(6, 38, 32).content, b'\x1a\x02mvt')
+            self.assertEqual(self.get_tile(6, 0, 0).status_code, 204)
+            render.side_effect, render.return_value = None, b'fresh'
+            # a newer catalogue no longer matches the generated set
+            bump_catalogue_version()
+            self.assertEqual(self.get_tile(6, 38, 32).content, b'fresh')
+
+
+class RankedSearchTests(SimpleTestCase):
+    factory = APIRequestFactory()
+    row = (4, 'Room 4', 36.81, -1.3, 120, Decimal('2.00'), Decimal('8.00'), 'C', {}, True,
+           datetime(2025, 5, 12, tzinfo=dt_timezone.utc), 3.14159, 70, 0.87654321)
+
+    def search(self, **params):
+        request = self.factory.get('/api/v1/search/', params)
+        return ColdRoomSearchViewSet.as_view({'get': 'list'})(request)
+
+    def test_rejects_bad_rank_parameters(self):
+        for params in ({'rank': 0}, {'rank': 'top'}, {'rank': 500}, {'rank': 5, 'quantity': 0},
+                       {'rank': 5, 'target_temp': 'cold'}):
+            with self.subTest(**params):
+                self.assertEqual(self.search(lat=-1.29, lon=36.82, **params).status_code, 400)
+
+    def test_scores_over_requested_period_without_caching(self):
+        with mock.patch.object(ranking, 'ranked_rooms', return_value=[self.row]) as ranked_rooms:
+            for _ in range(2):
+                response = self.search(lat=-1.29, lon=36.82, radius=25, rank=5, quantity=50, target_temp='2',
+                                       available_from='2026-03-01T00:00:00Z', available_to='2026-03-04T00:00:00Z')
+        self.assertEqual(ranked_rooms.call_count, 2)
+        args = ranked_rooms.call_args.args
+        self.assertEqual(args[1:], (-1.29, 36.82, 25.0, 5, (date(2026, 3, 1), date(2026, 3, 4)), 50, (2.0, 2.0)))
+        self.assertNotIn('ETag', response)
+
+        feature = response.data['results']['features'][0]
+        self.assertEqual(feature['id'], 4)
+        self.assertEqual({key: feature['properties'][key] for key in ('distance_km', 'remaining_capacity', 'score')},
+                         {'distance_km': 3.142, 'remaining_capacity': 70, 'score': 0.8765})
+
+
+class RankedSearchQueryTests(TestCase):
+    ORIGIN = (60.0, 10.0)
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(email='ranked@example.com', password='Secret123!',
+                                         phone='+254700000023', user_type=User.UserType.COLD_ROOM_OWNER)
+        cls.rooms = {}
+        for name, bearing, km in (('near', 90, 5), ('edge', 0, 99.95), ('outside', 0, 100.5)):
+            lat, lon = destination(*cls.ORIGIN, bearing, km)
+            cls.rooms[name] = ColdRoom.objects.create(
+                owner=owner, name=name, location=Point(lon, lat, srid=4326), capacity=100,
+                temp_min=Decimal('2.00'), temp_max=Decimal('8.00'), is_verified=True,
+            ).pk
+
+    def test_rooms_on_the_edge_of_the_radius_are_ranked(self):
+        today = date(2026, 3, 1)
+        rows = ranking.ranked_rooms(ColdRoom.objects.filter(is_verified=True), *self.ORIGIN,
+                                    100, 10, (today, today))
+        self.assertEqual([row[0] for row in rows], [self.rooms['near'], self.rooms['edge']])
+        self.assertAlmostEqual(rows[1][-3], 99.95, places=2)
+
+
+@override_settings(COLDROOM_RESPONSE_CACHE_TIMEOUT=0, COLDROOM_SEARCH_ENGINE='postgis')
+class NearestSearchTests(TestCase):
+    # at 60N a degree of longitude is half a degree of latitude, so planar
+    # degree order and true distance order disagree
+    ORIGIN = (60.0, 10.0)
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(email='owner@example.com', password='Secret123!',
+                                         phone='+254700000020', user_type=User.UserType.COLD_ROOM_OWNER)
+        cls.rooms = {}
+        for name, lat, lon, capacity in (('east', 60.0, 10.9, 100),     # ~50 km, 0.9 degrees
+                                         ('north', 60.5, 10.0, 200),    # ~56 km, 0.5 degrees
+                                         ('far', 61.5, 10.0, 300)):     # ~167 km
+            cls.rooms[name] = ColdRoom.objects.create(
+                owner=owner, name=name, location=Point(lon, lat, srid=4326), capacity=capacity,
+                temp_min=Decimal('2.00'), temp_max=Decimal('8.00'), is_verified=True,
+            ).pk
+
+    def nearest(self, **params):
+        lat, lon = self.ORIGIN
+        return APIClient().get('/api/v1/search/', {'lat': lat, 'lon': lon, **params})
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [feature['id'] for feature in response.data['results']['features']]
+
+    def test_returns_true_nearest_rooms(self):
+        self.assertEqual(self.ids(self.nearest(nearest=1)), [self.rooms['east']])
+        self.assertEqual(self.ids(self.nearest(nearest=2)), [self.rooms['east'], self.rooms['north']])
+        self.assertEqual(len(self.ids(self.nearest(nearest=10))), 3)
+
+    def test_max_distance_filters(self):
+        self.assertEqual(self.ids(self.nearest(nearest=3, max_distance=52)), [self.rooms['east']])
+        self.assertEqual(self.ids(self.nearest(nearest=3, max_distance=100)),
+                         [self.rooms['east'], self.rooms['north']])
+
+    def test_rooms_on_the_edge_of_max_distance_are_kept(self):
+        lat, lon = destination(*self.ORIGIN, 0, 99.95)
+        edge = ColdRoom.objects.create(
+            owner=User.objects.get(email='owner@example.com'), name='edge', location=Point(lon, lat, srid=4326),
+            capacity=100, temp_min=Decimal('2.00'), temp_max=Decimal('8.00'), is_verified=True,
+        ).pk
+        self.assertEqual(self.ids(self.nearest(nearest=5, max_distance=100)),
+                         [self.rooms['east'], self.rooms['north'], edge])
+
+    @override_settings(COLDROOM_SEARCH_MAX_RESULTS=2)
+    def test_radius_search_returns_the_nearest_rooms_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.nearest(radius=200)
+        self.assertEqual(self.ids(response), [self.rooms['east'], self.rooms['north']])
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(self.nearest(radius=10).status_code, 404)
+
+    def test_empty_results(self):
+        response = self.nearest(nearest=3, max_distance=10)
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('10.0 km', response.data['detail'])
+        response = self.nearest(nearest=3, min_capacity=1000)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn(' km ', response.data['detail'])
+
+    @override_settings(COLDROOM_NEAREST_MAX=100)
+    def test_rejects_out_of_range_parameters(self):
+        for params in ({'nearest': 0}, {'nearest': 101}, {'nearest': 'five'},
+                       {'nearest': 3, 'max_distance': 'far'}):
+            with self.subTest(**params):
+                self.assertEqual(self.nearest(**params).status_code, 400)
+
+
+class BatchSearchTests(SimpleTestCase):
+    factory = APIRequestFactory()
+    room = (5, 'Room 5', 36.82, -1.29, 120, Decimal('2.00'), Decimal('8.00'), 'C', 1.23456)
+
+    def batch(self, data):
+        request = self.factory.post('/api/v1/search/batch/', data, format='json')
+        return ColdRoomSearchViewSet.as_view({'post': 'batch'}, **ColdRoomSearchViewSet.batch.kwargs)(request)
+
+    @override_settings(COLDROOM_BATCH_SEARCH_MAX_ORIGINS=2)
+    def test_rejects_too_many_origins(self):
+        origins = [{'lat': -1.29, 'lon': 36.82}] * 3
+        response = self.batch({'origins': origins})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('origins', response.data)
+
+    def test_rejects_bad_origins(self):
+        for origin in ({'lat': 91, 'lon': 36.82}, {'lat': -1.29, 'lon': 181}, {'lat': -1.29},
+                       {'lat': -1.29, 'lon': 36.82, 'radius': -1}, {'lat': 'x', 'lon': 36.82}):
+            with self.subTest(**origin):
+                self.assertEqual(self.batch({'origins': [origin]}).status_code, 400)
+        self.assertEqual(self.batch({'origins': []}).status_code, 400)
+
+    @override_settings(COLDROOM_BATCH_SEARCH_MAX_RESULTS=20)
+    def test_limit_is_clamped_and_results_follow_origins(self):
+        with mock.patch.object(search, 'batch_radius_search', return_value=[[self.room], []]) as batch:
+            response = self.batch({'origins': [{'lat': -1.29, 'lon': 36.82, 'radius': 10},
+                                               {'lat': 0.5, 'lon': 35.2}], 'limit': 500})
+        self.assertEqual(response.status_code, 200)
+        batch.assert_called_once_with([(-1.29, 36.82, 10.0), (0.5, 35.2, 5.0)], 20)
+        first, second = response.data['results']
+        self.assertEqual((first['origin']['radius_km'], first['count']), (10.0, 1))
+        self.assertEqual(first['rooms'][0]['id'], 5)
+        self.assertEqual(first['rooms'][0]['distance_km'], 1.235)
+        self.assertEqual((second['origin']['latitude'], second['count'], second['rooms']), (0.5, 0, []))
+
+
+@override_settings(COLDROOM_SEARCH_ENGINE='postgis')
+class BatchSearchQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(email='batch@example.com', password='Secret123!',
+                                         phone='+254700000021', user_type=User.UserType.COLD_ROOM_OWNER)
+        cls.rooms = [
+            ColdRoom.objects.create(owner=owner, name=name, location=Point(lon, lat, srid=4326),
+                                    capacity=100, temp_min=Decimal('2.00'), temp_max=Decimal('8.00'),
+                                    is_verified=True).pk
+            for name, lat, lon in (('nairobi-a', -1.29, 36.82), ('nairobi-b', -1.30, 36.83),
+                                   ('kisumu', -0.09, 34.77))
+        ]
+
+    def test_rooms_are_grouped_by_origin_nearest_first(self):
+        results = search.batch_radius_search([(-1.295, 36.825, 5), (-0.1, 34.76, 5), (0.0, 0.0, 5)], 10)
+        self.assertEqual([[row[0] for row in rooms] for rooms in results],
+                         [[self.rooms[0], self.rooms[1]], [self.rooms[2]], []])
+        distances = [row[-1] for row in results[0]]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_rooms_on_the_edge_of_the_radius_are_found(self):
+        lat, lon = destination(-1.29, 36.82, 0, 99.95)
+        owner = User.objects.get(email='batch@example.com')
+        edge = ColdRoom.objects.create(owner=owner, name='edge', location=Point(lon, lat, srid=4326),
+                                       capacity=100, temp_min=Decimal('2.00'), temp_max=Decimal('8.00'),
+                                       is_verified=True).pk
+        rows = search.batch_radius_search([(-1.29, 36.82, 100)], 10)[0]
+        self.assertEqual(rows[-1][0], edge)
+        self.assertAlmostEqual(rows[-1][-1], 99.95, places=2)
+
+    def test_limit_applies_per_origin(self):
+        results = search.batch_radius_search([(-1.29, 36.82, 5), (-1.30, 36.83, 5)], 1)
+        self.assertEqual([[row[0] for row in rooms] for rooms in results], [[self.rooms[0]], [self.rooms[1]]])
+
+
+class AvailabilityScheduleTests(SimpleTestCase):
+    def test_parses_and_sorts_slots(self):
+        slots = serializers.parse_availability_slots({'slots': [
+            {'start': '2025-03-10T00:00:00Z', 'end': '2025-03-12T00:00:00Z'},
+            {'start': '2025-03-01T00:00:00Z', 'end': '2025-03-05T00:00:00Z'},
+        ], 'notes': 'weekdays only'})
+        self.assertEqual(slots, [
+            (datetime(2025, 3, 1, tzinfo=dt_timezone.utc), datetime(2025, 3, 5, tzinfo=dt_timezone.utc)),
+            (datetime(2025, 3, 10, tzinfo=dt_timezone.utc), datetime(2025, 3, 12, tzinfo=dt_timezone.utc)),
+        ])
+        self.assertEqual(serializers.parse_availability_slots({}), [])
+
+    def test_rejects_invalid_schedules(self):
+        for schedule in ([], {'slots': {}}, {'slots': [{'start': '2025-03-01T00:00:00Z'}]},
+                         {'slots': [{'start': 'soon', 'end': '2025-03-05T00:00:00Z'}]},
+                         {'slots': [{'start': '2025-03-05T00:00:00Z', 'end': '2025-03-01T00:00:00Z'}]},
+                         {'slots': [{'start': '2025-03-01T00:00:00Z', 'end': '2025-03-01T00:00:00Z'}]}):
+            with self.subTest(schedule=schedule):
+                with self.assertRaises(ValidationError):
+                    serializers.parse_availability_slots(schedule)
+
+    def test_serializer_rejects_overlapping_slots(self):
+        serializer = ColdRoomSerializer(data={
+            'name': 'Overlap', 'latitude': -1.29, 'longitude': 36.82, 'capacity': 10,
+            'temp_min': '2.00', 'temp_max': '8.00', 'owner_email': 'owner@example.com',
+            'availability_schedule': {'slots': [
+                {'start': '2025-03-01T00:00:00Z', 'end': '2025-03-05T00:00:00Z'},
+                {'start': '2025-03-04T00:00:00Z', 'end': '2025-03-08T00:00:00Z'},
+            ]},
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['availability_schedule'], ['Availability slots must not overlap.'])
+
+    @override_settings(COLDROOM_RESPONSE_CACHE_TIMEOUT=0, COLDROOM_SEARCH_ENGINE='postgis')
+    def test_search_rejects_bad_availability_range(self):
+        view = ColdRoomSearchViewSet.as_view({'get': 'list'})
+        for params in ({'available_from': '2025-03-01T00:00:00Z'},
+                       {'available_to': '2025-03-05T00:00:00Z'},
+                       {'available_from': '2025-03-05T00:00:00Z', 'available_to': '2025-03-01T00:00:00Z'},
+                       {'available_from': '2025-03-01T00:00:00Z', 'available_to': '2025-03-01T00:00:00Z'},
+                       {'available_from': 'soon', 'available_to': '2025-03-05T00:00:00Z'}):
+            with self.subTest(**params):
+                request = APIRequestFactory().get('/api/v1/search/', {'lat': -1.29, 'lon': 36.82, **params})
+                response = view(request)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.data)
+
+
+@override_settings(COLDROOM_RESPONSE_CACHE_TIMEOUT=0, COLDROOM_SEARCH_ENGINE='postgis')
+class AvailabilitySearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(email='slots@example.com', password='Secret123!',
+                                         phone='+254700000022', user_type=User.UserType.COLD_ROOM_OWNER)
+        cls.rooms = {}
+        for name, slots in (('march', [('2025-03-01T00:00:00Z', '2025-04-01T00:00:00Z')]),
+                            ('split', [('2025-03-01T00:00:00Z', '2025-03-10T00:00:00Z'),
+                                       ('2025-03-12T00:00:00Z', '2025-04-01T00:00:00Z')]),
+                            ('none', [])):
+            room = ColdRoom.objects.create(
+                owner=owner, name=name, location=Point(36.82, -1.29, srid=4326), capacity=100,
+                temp_min=Decimal('2.00'), temp_max=Decimal('8.00'), is_verified=True,
+                availability_schedule={'slots': [{'start': start, 'end': end} for start, end in slots]},
+            )
+            serializers.sync_availability_slots(room)
+            cls.rooms[name] = room.pk
+
+    def search(self, available_from, available_to):
+        response = APIClient().get('/api/v1/search/', {
+            'lat': -1.29, 'lon': 36.82, 'available_from': available_from, 'available_to': available_to,
+        })
+        if response.status_code == 404:
+            return set()
+        self.assertEqual(response.status_code, 200)
+        return {feature['id'] for feature in response.data['results']['features']}
+
+    def test_rooms_must_cover_the_whole_range(self):
+        self.assertEqual(self.search('2025-03-02T00:00:00Z', '2025-03-05T00:00:00Z'),
+                         {self.rooms['march'], self.rooms['split']})
+        # crosses the gap between the split room's slots
+        self.assertEqual(self.search('2025-03-08T00:00:00Z', '2025-03-14T00:00:00Z'), {self.rooms['march']})
+        self.assertEqual(self.search('2025-03-20T00:00:00Z', '2025-04-02T00:00:00Z'), set())
+
+    def test_slots_follow_schedule_changes(self):
+        room = ColdRoom.objects.get(pk=self.rooms['none'])
+        room.availability_schedule = {'slots': [{'start': '2025-03-20T00:00:00Z', 'end': '2025-04-10T00:00:00Z'}]}
+        room.save()
+        serializers.sync_availability_slots(room)
+        self.assertEqual(self.search('2025-03-20T00:00:00Z', '2025-04-02T00:00:00Z'), {self.rooms['none']})
@@ -0,0 +1,143 @@
+"""
+Mapbox Vector Tiles of the verified catalogue.
+
+Tiles are encoded by PostGIS (``ST_AsMVT``) and cached under the catalogue
+version, so a room or verification change retires every cached tile at
+once. Zooms up to ``COLDROOM_TILE_STATIC_MAX_ZOOM`` can be written ahead of
+time with ``manage.py generate_tiles``; while the catalogue version they
+were built for is current, those tiles are read from disk and the database
+is not touched. Tile sets are named after the version and its bump time,
+so a version counter restarted by a cache flush cannot match an old set.
+"""
+import math
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from .cache import get_catalogue_modified, get_catalogue_version, set_validators
+from .models import ColdRoom
+
+CONTENT_TYPE = 'application/vnd.mapbox-vector-tile'
+LAYER = 'coldrooms'
+EXTENT = 4096  # tile coordinate space, the MVT default
+BUFFER = 64  # points this close outside the tile are kept so edge icons are not cut
+MAX_ZOOM = 22
+# web mercator stops here, tiles cover latitudes -85.05..85.05
+MAX_LATITUDE = 85.0511287798
+
+TILE_SQL = f"""
+    WITH rooms AS (
+        SELECT room.id, room.capacity,
+               room.temp_min_c::float8 AS temp_min_c, room.temp_max_c::float8 AS temp_max_c,
+               ST_AsMVTGeom(ST_Transform(room.location, 3857), ST_TileEnvelope(%(z)s, %(x)s, %(y)s),
+                            {EXTENT}, {BUFFER}, true) AS geom
+        FROM {ColdRoom._meta.db_table} room
+        WHERE room.is_verified
+          AND room.location && ST_Transform(
+              ST_TileEnvelope(%(z)s, %(x)s, %(y)s, margin => {BUFFER / EXTENT}), 4326)
+    )
+    SELECT ST_AsMVT(rooms, '{LAYER}', {EXTENT}, 'geom', 'id') FROM rooms
+"""
+
+
+def tile_exists(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_for(lon, lat, z):
+    """Return the ``(x, y)`` of the tile containing a point at zoom ``z``."""
+    lat = max(-MAX_LATITUDE, min(lat, MAX_LATITUDE))
+    n = 2 ** z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def render_tile(z, x, y):
+    """Encode one tile from the database; empty tiles are ``b''``."""
+    with connection.cursor() as cursor:
+        cursor.execute(TILE_SQL, {'z': z, 'x': x, 'y': y})
+        data = cursor.fetchone()[0]
+    return bytes(data) if data else b''
+
+
+def static_tile_dir(version, modified):
+    return os.path.join(settings.COLDROOM_TILE_DIR, f'{version}-{modified}')
+
+
+def static_tile(version, modified, z, x, y):
+    """
+    Return the pre-generated tile, ``b''`` for an empty one, or ``None``.
+
+    ``generate_tiles`` moves a version's directory into place only once it
+    is complete and writes non-empty tiles only, so a missing file inside an
+    existing directory is an empty tile.
+    """
+    directory = static_tile_dir(version, modified)
+    if z > settings.COLDROOM_TILE_STATIC_MAX_ZOOM or not os.path.isdir(directory):
+        return None
+    try:
+        with open(os.path.join(directory, str(z), str(x), f'{y}.pbf'), 'rb') as tile:
+            return tile.read()
+    except FileNotFoundError:
+        return b''
+
+
+def get_tile(version, modified, z, x, y):
+    data = static_tile(version, modified, z, x, y)
+    if data is not None:
+        return data
+
+    timeout = settings.COLDROOM_TILE_CACHE_TIMEOUT
+    key = f"coldrooms:tile:{version}:{z}/{x}/{y}"
+    if timeout:
+        data = cache.get(key)
+        if data is not None:
+            return data
+    data = render_tile(z, x, y)
+    if timeout:
+        cache.set(key, data, timeout)
+    return data
+
+
+class TileView(APIView):
+    """
+    ``GET /api/v1/tiles/{z}/{x}/{y}.pbf``
+
+    One ``coldrooms`` layer of verified room points: the room id is the
+    feature id, ``capacity`` and the Celsius ``temp_min_c``/``temp_max_c``
+    range are attributes. Empty tiles are a 204, which map clients treat as
+    a tile without features.
+
+    Authenticated and throttled like the rest of the API. The tile itself
+    is an ``HttpResponse`` of encoded bytes; renderers only format errors.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def perform_content_negotiation(self, request, force=False):
+        # map clients ask for protobuf, which no renderer produces
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, z, x, y):
+        if not tile_exists(z, x, y):
+            raise Http404("No such tile.")
+
+        version, modified = get_catalogue_version(), get_catalogue_modified()
+        etag = quote_etag(f"{version}-{z}-{x}-{y}")
+        not_modified = get_conditional_response(request, etag=etag, last_modified=modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, modified)
+
+        data = get_tile(version, modified, z, x, y)
+        response = HttpResponse(data, content_type=CONTENT_TYPE, status=200 if data else 204)
+        return set_validators(response, etag, modified)
+
+
+tile_view = TileView.as_view()
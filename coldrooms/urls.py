@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .export import export_view
+from .tiles import tile_view
 from .views import ColdRoomViewSet, ColdRoomVerificationViewset, ColdRoomListViewSet, ColdRoomSearchViewSet
 
 router = DefaultRouter()
@@ -9,5 +12,21 @@ router.register(r'cold-rooms-list', ColdRoomListViewSet, basename='coldroom-list
 router.register(r'search', ColdRoomSearchViewSet, basename='coldroom-search')
 
 urlpatterns = [
+    # ahead of the router, whose detail route would take "export" for a pk
+    path('cold-rooms-list/export/', export_view, name='coldroom-export'),
+    path('tiles/<int:z>/<int:x>/<int:y>.pbf', tile_view, name='coldroom-tile'),
+]
+
+if settings.COLDROOM_ASYNC_READS:
+    # served by ASGI workers; matched before the router's sync routes
+    from . import async_views
+
+    urlpatterns += [
+        path('cold-rooms-list/', async_views.cold_room_list, name='coldroom-list-list'),
+        path('cold-rooms-list/<int:pk>/', async_views.cold_room_detail, name='coldroom-list-detail'),
+        path('search/', async_views.cold_room_search, name='coldroom-search-list'),
+    ]
+
+urlpatterns += [
     path('', include(router.urls))
-]
\ No newline at end of file
+]
@@ -1,10 +1,30 @@
+import math
+
+from django.conf import settings
 from django.contrib.gis.geos import Point
 from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.measure import D
-from rest_framework import viewsets, permissions, status
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import viewsets, permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
-from .serializers import ColdRoomSerializer, ColdRoomVerificationSerializer, ColdRoomsListSerializer
-from .models import ColdRoom, ColdRoomVerification
+from .serializers import (ColdRoomSerializer, ColdRoomVerificationSerializer, ColdRoomsListSerializer,
+                          BatchSearchSerializer, BulkColdRoomUpdateSerializer, BulkVerificationReviewSerializer,
+                          availability_slots)
+from .cache import CachedResponseMixin, bump_catalogue_version
+from .clusters import cluster_collection, parse_bbox, parse_zoom
+from .geo import KNNDistance, SphereDistanceKm, bounding_box
+from . import geojson
+from .models import AvailabilitySlot, ColdRoom, ColdRoomVerification
+from .pagination import DistanceCursorPagination
+from .renderers import FastJSONRenderer
+from . import ranking, search
 
 class IsColdRoomOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -21,46 +41,352 @@ class ColdRoomViewSet(viewsets.ModelViewSet):
         # Automatically create the verification entry
         cold_room = serializer.save()
         ColdRoomVerification.objects.create(cold_room=cold_room)
-    
+
+    def bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ["Expected a non-empty list of cold rooms."]})
+        max_items = settings.COLDROOM_BULK_MAX_ITEMS
+        if len(items) > max_items:
+            raise ValidationError({'non_field_errors': [f"At most {max_items} cold rooms are allowed per request."]})
+        return items
+
+    def validate_items(self, serializer, items):
+        """Validate every item with one serializer, returning ``(valid, errors)`` keyed by list index."""
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({'index': index, 'errors': {'non_field_errors': ["Expected an object."]}})
+                continue
+            try:
+                valid.append((index, serializer.run_validation(item)))
+            except ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+        return valid, errors
+
+    def bulk_response(self, key, results, errors, success_status):
+        """
+        Without ``?allow_partial=true`` any invalid item rejects the whole
+        request; with it the valid items are kept and the rest reported.
+        """
+        body = {key: len(results), 'failed': len(errors),
+                'results': sorted(results + errors, key=lambda item: item['index'])}
+        return Response(body, status=success_status if results else status.HTTP_400_BAD_REQUEST)
+
+    def allow_partial(self, request):
+        return request.query_params.get('allow_partial', '').lower() in ('1', 'true', 'yes')
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create many rooms, their verification entries and availability slots in one transaction."""
+        items = self.bulk_items(request)
+        serializer = self.get_serializer()
+        valid, errors = self.validate_items(serializer, items)
+        if not valid or errors and not self.allow_partial(request):
+            return self.bulk_response('created', [], errors, status.HTTP_201_CREATED)
+
+        rooms = [serializer.build_instance(data) for _, data in valid]
+        with transaction.atomic():
+            # PostgreSQL returns the new primary keys from the INSERT
+            ColdRoom.objects.bulk_create(rooms)
+            ColdRoomVerification.objects.bulk_create(
+                [ColdRoomVerification(cold_room=room) for room in rooms])
+            AvailabilitySlot.objects.bulk_create(
+                [slot for room in rooms for slot in availability_slots(room)])
+        # new rooms start unverified, so the public catalogue is unchanged
+
+        results = [{'index': index, 'id': room.pk} for (index, _), room in zip(valid, rooms)]
+        return self.bulk_response('created', results, errors, status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """Partially update capacity and temperature fields of many owned rooms at once."""
+        items = self.bulk_items(request)
+        valid, errors = self.validate_items(BulkColdRoomUpdateSerializer(), items)
+
+        rooms = self.get_queryset().in_bulk({data['id'] for _, data in valid})
+        changed, results, fields = {}, [], set()
+        for index, data in valid:
+            room = rooms.get(data['id'])
+            if room is None:
+                errors.append({'index': index, 'id': data['id'], 'errors': {'id': ["No cold room with this id."]}})
+                continue
+            temp_min = data.get('temp_min', room.temp_min)
+            temp_max = data.get('temp_max', room.temp_max)
+            if temp_min > temp_max:
+                errors.append({'index': index, 'id': room.pk,
+                               'errors': {'temp_max': ["Must not be lower than temp_min."]}})
+                continue
+            for field in BulkColdRoomUpdateSerializer.fields_to_update:
+                if field in data:
+                    setattr(room, field, data[field])
+                    fields.add(field)
+            changed[room.pk] = room
+            results.append({'index': index, 'id': room.pk})
+
+        if errors and not self.allow_partial(request):
+            return self.bulk_response('updated', [], errors, status.HTTP_200_OK)
+
+        if changed:
+            # bulk_update() skips auto_now and the post_save signals
+            now = timezone.now()
+            for room in changed.values():
+                room.updated_at = now
+            with transaction.atomic():
+                ColdRoom.objects.bulk_update(changed.values(), [*sorted(fields), 'updated_at'])
+                if any(room.is_verified for room in changed.values()):
+                    transaction.on_commit(bump_catalogue_version)
+        return self.bulk_response('updated', results, errors, status.HTTP_200_OK)
+
 class ColdRoomVerificationViewset(viewsets.ModelViewSet):
     serializer_class = ColdRoomVerificationSerializer
     permission_classes = [permissions.IsAdminUser]
+    # unpaginated unless ?limit= is given
+    pagination_class = LimitOffsetPagination
+    queue_filters = {'submitted_after': 'submitted_at__gte', 'submitted_before': 'submitted_at__lt'}
 
     def get_queryset(self):
-        return ColdRoomVerification.objects.select_related('cold_room', 'reviewed_by')
+        queryset = ColdRoomVerification.objects.select_related('cold_room', 'reviewed_by')
+        if self.action == 'list':
+            queryset = self.filter_queue(queryset)
+        return queryset
+
+    def filter_queue(self, queryset):
+        """Apply ``?status=`` and ``?submitted_after=``/``?submitted_before=``, oldest first."""
+        params = self.request.query_params
+        status_value = params.get('status')
+        if status_value:
+            if status_value not in ColdRoomVerification.ColdRoomVerificationStatus.values:
+                raise ValidationError({'status': [f"Invalid status: {status_value}."]})
+            queryset = queryset.filter(status=status_value)
+
+        field = serializers.DateTimeField()
+        for param, lookup in self.queue_filters.items():
+            if params.get(param):
+                try:
+                    queryset = queryset.filter(**{lookup: field.to_internal_value(params[param])})
+                except serializers.ValidationError as exc:
+                    raise ValidationError({param: exc.detail})
+        # (status, submitted_at) index serves both the filter and the ordering
+        return queryset.order_by('submitted_at', 'pk')
+
+    def perform_create(self, serializer):
+        self.save_review(serializer)
+
+    def perform_update(self, serializer):
+        self.save_review(serializer)
+
+    @transaction.atomic
+    def save_review(self, serializer):
+        if 'status' not in serializer.validated_data:
+            serializer.save()
+            return
+        now = timezone.now()
+        verification = serializer.save(reviewed_by=self.request.user, reviewed_at=now)
+        # the verification's post_save bumps the catalogue version on commit
+        ColdRoom.objects.filter(pk=verification.cold_room_id).update(
+            is_verified=verification.status == ColdRoomVerification.ColdRoomVerificationStatus.APPROVED,
+            updated_at=now)
+
+    @action(detail=False, methods=['post'])
+    def review(self, request):
+        """Set one status on many verifications and sync their rooms' ``is_verified``."""
+        serializer = BulkVerificationReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        reviewed = ColdRoomVerification.objects.filter(pk__in=data['ids']).review(
+            data['status'], request.user, notes=data.get('verification_notes'))
+        found = set(reviewed)
+        return Response({
+            'reviewed': len(reviewed),
+            'missing': [pk for pk in data['ids'] if pk not in found],
+        })
+
+class GeoJSONListMixin:
+    """Emit list responses through the tuple-based GeoJSON path instead of the serializer."""
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get_precision(self):
+        precision = self.request.query_params.get('precision')
+        try:
+            return max(0, min(int(precision), 15))
+        except (TypeError, ValueError):
+            return settings.COLDROOM_GEOJSON_PRECISION
+
+    def serialize_queryset(self, queryset):
+        if not settings.COLDROOM_FAST_GEOJSON:
+            return self.get_serializer(queryset, many=True).data
+        return geojson.feature_collection(geojson.feature_rows(queryset), self.get_precision())
+
+    async def aserialize_queryset(self, queryset):
+        if not settings.COLDROOM_FAST_GEOJSON:
+            return self.get_serializer([obj async for obj in queryset], many=True).data
+        rows = [row async for row in geojson.feature_rows(queryset)]
+        return geojson.feature_collection(rows, self.get_precision())
+
+class RoomRequirementsMixin:
+    """
+    ``?required_temp=`` and ``?min_capacity=`` filters.
+
+    ``required_temp`` is a temperature or a ``low,high`` range in Celsius the
+    room must be able to hold; it is matched against the generated
+    ``temp_min_c``/``temp_max_c`` columns so rooms stored in Fahrenheit are
+    filtered in SQL too.
+    """
+
+    def get_temperature(self, name):
+        """Parse ``?<name>=t`` or ``?<name>=low,high`` (Celsius) into ``(low, high)``."""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            bounds = [float(part) for part in value.split(',')]
+        except ValueError:
+            bounds = []
+        if len(bounds) not in (1, 2) or not all(math.isfinite(part) for part in bounds):
+            raise ValidationError({
+                'detail': f'{name} must be a temperature or a low,high range in Celsius'
+            })
+        return min(bounds), max(bounds)
+
+    def get_requirements(self):
+        params = self.request.query_params
+        filters = {}
+        required_temp = self.get_temperature('required_temp')
+        if required_temp:
+            filters['temp_min_c__lte'], filters['temp_max_c__gte'] = required_temp
+
+        min_capacity = params.get('min_capacity')
+        if min_capacity:
+            try:
+                filters['capacity__gte'] = int(min_capacity)
+            except ValueError:
+                raise ValidationError({'detail': 'min_capacity must be an integer'})
+        return filters
 
-class ColdRoomListViewSet(viewsets.ReadOnlyModelViewSet):
+    def filter_requirements(self, queryset):
+        filters = self.get_requirements()
+        return queryset.filter(**filters) if filters else queryset
+
+class ColdRoomListViewSet(CachedResponseMixin, GeoJSONListMixin, RoomRequirementsMixin,
+                          viewsets.ReadOnlyModelViewSet):
     serializer_class = ColdRoomsListSerializer
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
-        return ColdRoom.objects.filter(is_verified=True)
+        queryset = ColdRoom.objects.filter(is_verified=True)
+        if self.action in ('list', 'clusters'):
+            queryset = self.filter_requirements(queryset)
+        return queryset
+
+    def uncached_list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return Response(self.serialize_queryset(queryset))
+
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """Map clusters for ``?bbox=xmin,ymin,xmax,ymax&zoom=N``, see coldrooms.clusters."""
+        return self.cached(request, lambda: self.uncached_clusters(request))
+
+    def uncached_clusters(self, request):
+        extent = parse_bbox(request.query_params.get('bbox'))
+        zoom = parse_zoom(request.query_params.get('zoom'))
+        return Response(cluster_collection(self.get_queryset(), extent, zoom, self.get_precision()))
+
+    # native async path, see coldrooms.async_views
+    def async_capable(self):
+        return self.action == 'retrieve' or self.paginator is None
+
+    async def auncached_list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(await self.aserialize_queryset(queryset))
+
+    async def auncached_retrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).filter(pk=kwargs['pk'])
+        if settings.COLDROOM_FAST_GEOJSON:
+            row = await geojson.feature_rows(queryset).afirst()
+            data = geojson.feature(row) if row is not None else None
+        else:
+            room = await queryset.afirst()
+            data = self.get_serializer(room).data if room is not None else None
+        if data is None:
+            raise Http404(f"No {ColdRoom._meta.object_name} matches the given query.")
+        return Response(data)
     
 # search the cold room by radius km
-class ColdRoomSearchViewSet(viewsets.ReadOnlyModelViewSet):
+class ColdRoomSearchViewSet(CachedResponseMixin, GeoJSONListMixin, RoomRequirementsMixin,
+                            viewsets.ReadOnlyModelViewSet):
     serializer_class = ColdRoomsListSerializer
     permission_classes = [permissions.AllowAny]
-    http_method_names = ['get']
+    http_method_names = ['get', 'post']
 
-    def get_queryset(self):
-        queryset = ColdRoom.objects.filter(is_verified=True)
-
-        # extract and validate parameters
+    def get_search_params(self):
         lat = self.request.query_params.get('lat')
         lon = self.request.query_params.get('lon')
         radius = self.request.query_params.get('radius', 5) # Default 5 km
 
         if not (lat and lon):
-            return queryset.none()
-        
+            return None
 
         try:
-            lat = float(lat)
-            lon = float(lon)
-            radius = float(radius)
+            return float(lat), float(lon), float(radius)
         except (TypeError, ValueError):
+            return None
+
+    def get_availability_range(self):
+        available_from = self.request.query_params.get('available_from')
+        available_to = self.request.query_params.get('available_to')
+        if not (available_from or available_to):
+            return None
+        if not (available_from and available_to):
+            raise ValidationError({
+                'detail': 'available_from and available_to must be given together'
+            })
+
+        field = serializers.DateTimeField()
+        try:
+            start = field.to_internal_value(available_from)
+            end = field.to_internal_value(available_to)
+        except ValidationError as exc:
+            raise ValidationError({'detail': exc.detail})
+        if start >= end:
+            raise ValidationError({'detail': 'available_to must be after available_from'})
+        return DateTimeTZRange(start, end)
+
+    def filter_rooms(self, queryset):
+        """Apply the non-spatial search filters to a ColdRoom queryset."""
+        queryset = self.filter_requirements(queryset)
+        period = self.get_availability_range()
+        if period is not None:
+            # a room is free when one of its slots covers the whole range;
+            # the subquery is driven by the GiST index on period
+            queryset = queryset.filter(pk__in=AvailabilitySlot.objects.filter(
+                period__contains=period
+            ).values('cold_room'))
+        return queryset
+
+    def allowed_room_ids(self):
+        """Room ids passing filter_rooms(), or None when no filter is active."""
+        queryset = ColdRoom.objects.filter(is_verified=True)
+        filtered = self.filter_rooms(queryset)
+        if filtered is queryset:
+            return None
+        return set(filtered.values_list('pk', flat=True))
+
+    def get_queryset(self):
+        queryset = self.filter_rooms(ColdRoom.objects.filter(is_verified=True))
+
+        params = self.get_search_params()
+        if params is None:
             return queryset.none()
-        
+        lat, lon, radius = params
+
         # create point and filter within radius
         user_location = Point(lon, lat, srid=4326)
         return queryset.annotate(
@@ -68,34 +394,332 @@ class ColdRoomSearchViewSet(viewsets.ReadOnlyModelViewSet):
         ).filter(
             location__distance_lte=(user_location, D(km=radius))
         ).order_by('distance')
-    
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
 
-        if not queryset.exists():
-            radius = request.query_params.get('radius', 5)
-            return Response ({
-                'detail': f"No verified cold rooms found within {radius} km radius",
-                "suggestions": [
-                    "Try increasing the search radius",
-                    "Check your location parameters",
-                    'Verify cold room availability in neighbouring areas'
-                ]
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
+    def get_nearest_params(self):
+        nearest = self.request.query_params.get('nearest')
+        max_distance = self.request.query_params.get('max_distance')
+        if nearest is None:
+            return None
+
+        try:
+            limit = int(nearest)
+            max_km = float(max_distance) if max_distance else None
+        except ValueError:
+            raise ValidationError({
+                'detail': 'nearest must be an integer and max_distance a number of km'
+            })
+        if not 1 <= limit <= settings.COLDROOM_NEAREST_MAX:
+            raise ValidationError({
+                'detail': f"nearest must be between 1 and {settings.COLDROOM_NEAREST_MAX}"
+            })
+        return limit, max_km
+
+    def get_nearest_candidates(self, lat, lon, max_km=None):
+        candidates = self.filter_rooms(ColdRoom.objects.filter(is_verified=True))
+        if max_km is not None:
+            # bounding box keeps the KNN scan inside the index's reach
+            candidates = candidates.filter(location__contained=bounding_box(lat, lon, max_km))
+        return candidates
+
+    def get_nearest_probe(self, lat, lon, limit, max_km=None):
+        """
+        True distances of the first ``limit`` rooms in ``<->`` order.
+
+        ``<->`` ranks by planar degrees straight off the GiST index, which is
+        not the true order away from the equator. But these rooms are
+        ``limit`` rooms within the farthest of their true distances, so the
+        true nearest ``limit`` all lie within it too.
+        """
+        user_location = Point(lon, lat, srid=4326)
+        return self.get_nearest_candidates(lat, lon, max_km).order_by(
+            KNNDistance('location', user_location)
+        ).annotate(
+            distance_km=SphereDistanceKm('location', user_location)
+        ).values_list('distance_km', flat=True)[:limit]
+
+    def get_nearest_queryset(self, lat, lon, limit, bound_km, max_km=None):
+        user_location = Point(lon, lat, srid=4326)
+        if max_km is not None:
+            bound_km = min(bound_km, max_km)
+        return self.get_nearest_candidates(lat, lon, max_km).filter(
+            location__contained=bounding_box(lat, lon, bound_km)
+        ).annotate(
+            distance=Distance('location', user_location),
+            distance_km=SphereDistanceKm('location', user_location),
+        ).filter(distance_km__lte=bound_km).order_by('distance_km', 'pk')[:limit]
+
+    def get_rank_params(self):
+        params = self.request.query_params
+        rank = params.get('rank')
+        if rank is None:
+            return None
+
+        try:
+            limit = int(rank)
+            quantity = int(params['quantity']) if params.get('quantity') else None
+        except ValueError:
+            raise ValidationError({'detail': 'rank and quantity must be integers'})
+        if not 1 <= limit <= settings.COLDROOM_RANK_MAX:
+            raise ValidationError({
+                'detail': f"rank must be between 1 and {settings.COLDROOM_RANK_MAX}"
+            })
+        if quantity is not None and quantity < 1:
+            raise ValidationError({'detail': 'quantity must be a positive number of units'})
+        return limit, quantity, self.get_temperature('target_temp')
+
+    def ranked_list(self, request, limit, quantity, temperature):
+        """
+        ``?rank=K`` returns the K best rooms within the radius, see coldrooms.ranking.
+
+        ``quantity`` and ``target_temp`` only score rooms, ``min_capacity``
+        and ``required_temp`` still filter them out.
+        """
+        params = self.get_search_params()
+        if params is None:
+            return self.not_found_response()
+        lat, lon, radius = params
+
+        # remaining capacity is checked over the requested period, else today
+        period = self.get_availability_range()
+        if period is None:
+            days = (timezone.localdate(), timezone.localdate())
+        else:
+            days = (timezone.localdate(period.lower), timezone.localdate(period.upper))
+
+        candidates = self.filter_rooms(ColdRoom.objects.filter(is_verified=True))
+        precision = self.get_precision()
+        features = [
+            ranking.ranked_feature(row, precision)
+            for row in ranking.ranked_rooms(candidates, lat, lon, radius, limit, days, quantity, temperature)
+        ]
+        if not features:
+            return self.not_found_response()
         return Response({
-            'count': queryset.count(),
+            'count': len(features),
+            'results': {'type': 'FeatureCollection', 'features': features},
+            'search_parameters': {
+                'latitude': request.query_params.get('lat'),
+                'longitude': request.query_params.get('lon'),
+                'radius_km': radius,
+                'rank': limit,
+                'quantity': quantity,
+                'target_temp': temperature,
+                'unit': 'Kilometers'
+            }
+        })
+
+    def nearest_list(self, request, limit, max_km):
+        lat, lon, _ = self.get_search_params() or (None, None, None)
+        if lat is None:
+            return self.not_found_response()
+
+        if settings.COLDROOM_SEARCH_ENGINE == 'memory':
+            rooms = self.hydrate(search.get_index().nearest(
+                lat, lon, limit, max_km, allowed=self.allowed_room_ids()
+            ))
+        else:
+            distances = list(self.get_nearest_probe(lat, lon, limit, max_km))
+            rooms = list(self.get_nearest_queryset(lat, lon, limit, max(distances), max_km)) if distances else []
+        return self.nearest_response(rooms, limit, max_km)
+
+    async def anearest_list(self, request, limit, max_km):
+        params = self.get_search_params()
+        if params is None:
+            return self.not_found_response()
+        lat, lon, _ = params
+        distances = [distance async for distance in self.get_nearest_probe(lat, lon, limit, max_km)]
+        rooms = []
+        if distances:
+            queryset = self.get_nearest_queryset(lat, lon, limit, max(distances), max_km)
+            rooms = [room async for room in queryset]
+        return self.nearest_response(rooms, limit, max_km)
+
+    def nearest_response(self, rooms, limit, max_km):
+        request = self.request
+        if not rooms:
+            if max_km is None:
+                # no radius was applied, only the filters can have ruled rooms out
+                return self.not_found_response(detail="No verified cold rooms match the search filters")
+            return self.not_found_response(radius=max_km)
+
+        serializer = self.get_serializer(rooms, many=True)
+        return Response({
+            'count': len(rooms),
             'results': serializer.data,
+            'search_parameters': {
+                'latitude': request.query_params.get('lat'),
+                'longitude': request.query_params.get('lon'),
+                'nearest': limit,
+                'max_distance_km': max_km,
+                'unit': 'Kilometers'
+            }
+        })
+
+    def not_found_response(self, radius=None, detail=None):
+        if radius is None:
+            radius = self.request.query_params.get('radius', 5)
+        return Response ({
+            'detail': detail or f"No verified cold rooms found within {radius} km radius",
+            "suggestions": [
+                "Try increasing the search radius",
+                "Check your location parameters",
+                'Verify cold room availability in neighbouring areas'
+            ]
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    def search_response(self, results, count):
+        request = self.request
+        return Response({
+            'count': count,
+            'results': results,
             "search_parameters": {
                 'latitude': request.query_params.get('lat'),
                 'longitude': request.query_params.get('lon'),
                 'radius_km': float(request.query_params.get('radius', 5)),
                 'unit': 'Kilometers'
             }
-        })
\ No newline at end of file
+        })
+
+    @property
+    def paginator(self):
+        # ?cursor= / ?page_size= switch to keyset pages ordered by (distance, id)
+        if not hasattr(self, '_paginator'):
+            if DistanceCursorPagination.is_requested(self.request):
+                self._paginator = DistanceCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def cacheable(self, request):
+        # remaining capacity follows bookings, which leave the catalogue version alone
+        return super().cacheable(request) and 'rank' not in request.query_params
+
+    def uncached_list(self, request, *args, **kwargs):
+        nearest = self.get_nearest_params()
+        if nearest is not None:
+            return self.nearest_list(request, *nearest)
+
+        ranked = self.get_rank_params()
+        if ranked is not None:
+            return self.ranked_list(request, *ranked)
+
+        if settings.COLDROOM_SEARCH_ENGINE == 'memory':
+            return self.memory_list(request)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if isinstance(self.paginator, DistanceCursorPagination):
+            # one query per page, no separate exists()/count() scans
+            page = self.paginate_queryset(queryset)
+            if not page and self.paginator.position is None:
+                return self.not_found_response()
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        if self.paginator is not None:
+            if not queryset.exists():
+                return self.not_found_response()
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        # a single query for the nearest rooms: emptiness and count come from the fetched rows
+        data = self.serialize_queryset(queryset[:settings.COLDROOM_SEARCH_MAX_RESULTS])
+        if not data['features']:
+            return self.not_found_response()
+        return self.search_response(data, len(data['features']))
+
+    def async_capable(self):
+        # the grid index, ranked search and page-number pagination stay on the sync path
+        if settings.COLDROOM_SEARCH_ENGINE == 'memory' or 'rank' in self.request.query_params:
+            return False
+        return self.paginator is None or isinstance(self.paginator, DistanceCursorPagination)
+
+    async def auncached_list(self, request, *args, **kwargs):
+        nearest = self.get_nearest_params()
+        if nearest is not None:
+            return await self.anearest_list(request, *nearest)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if isinstance(self.paginator, DistanceCursorPagination):
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if not page and self.paginator.position is None:
+                return self.not_found_response()
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        # a single query for the nearest rooms: emptiness and count come from the fetched rows
+        data = await self.aserialize_queryset(queryset[:settings.COLDROOM_SEARCH_MAX_RESULTS])
+        if not data['features']:
+            return self.not_found_response()
+        return self.search_response(data, len(data['features']))
+
+    def memory_list(self, request):
+        # radius query is answered by the worker's grid index, the database
+        # only hydrates the rooms that end up in the response
+        params = self.get_search_params()
+        hits = search.get_index().radius(*params, allowed=self.allowed_room_ids()) if params else []
+
+        if isinstance(self.paginator, DistanceCursorPagination):
+            page = self.paginator.paginate_hits(hits, request)
+            if not page and self.paginator.position is None:
+                return self.not_found_response()
+            serializer = self.get_serializer(self.hydrate(page), many=True)
+            return self.get_paginated_response(serializer.data)
+
+        if not hits:
+            return self.not_found_response()
+
+        page = self.paginate_queryset(hits)
+        if page is None:
+            hits = hits[:settings.COLDROOM_SEARCH_MAX_RESULTS]
+        rooms = self.hydrate(page if page is not None else hits)
+        serializer = self.get_serializer(rooms, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return self.search_response(serializer.data, len(hits))
+
+    def hydrate(self, hits):
+        rooms = ColdRoom.objects.in_bulk([room_id for room_id, _ in hits])
+        results = []
+        for room_id, distance in hits:
+            room = rooms.get(room_id)
+            if room is not None:
+                room.distance = D(km=distance)
+                results.append(room)
+        return results
+
+    @action(detail=False, methods=['post'], serializer_class=BatchSearchSerializer)
+    def batch(self, request):
+        """Resolve many (lat, lon, radius) origins in a single database round-trip."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        origins = serializer.validated_data['origins']
+        limit = serializer.validated_data.get('limit', settings.COLDROOM_BATCH_SEARCH_MAX_RESULTS)
+
+        matches = search.batch_radius_search(
+            [(origin['lat'], origin['lon'], origin['radius']) for origin in origins], limit
+        )
+        results = []
+        for origin, rooms in zip(origins, matches):
+            results.append({
+                'origin': {
+                    'latitude': origin['lat'],
+                    'longitude': origin['lon'],
+                    'radius_km': origin['radius'],
+                },
+                'count': len(rooms),
+                'rooms': [{
+                    'id': pk,
+                    'name': name,
+                    'latitude': lat,
+                    'longitude': lon,
+                    'capacity': capacity,
+                    'temp_min': str(temp_min),
+                    'temp_max': str(temp_max),
+                    'temp_unit': temp_unit,
+                    'distance_km': round(distance, 3),
+                } for pk, name, lon, lat, capacity, temp_min, temp_max, temp_unit, distance in rooms],
+            })
+        return Response({'count': len(results), 'results': results})
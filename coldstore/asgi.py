@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coldstore.settings')
 
 application = get_asgi_application()
+if 'whitenoise.middleware.WhiteNoiseMiddleware' not in settings.MIDDLEWARE:
+    # the ASGI profile leaves WhiteNoise out (see ASGI_MIDDLEWARE); static
+    # files are answered here, before the request reaches the middleware
+    application = ASGIStaticFilesHandler(application)
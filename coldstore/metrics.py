@@ -0,0 +1,245 @@
+"""
+Per-endpoint request metrics in Prometheus text format.
+
+``MetricsMiddleware`` records, per resolved URL name, method and status:
+request count, a latency histogram, DB query count and time, and the time
+spent rendering the response. Each worker aggregates in memory and writes
+its cumulative totals to the shared cache every ``METRICS_FLUSH_INTERVAL``
+seconds under its own slot; ``metrics_view`` sums all live slots. A worker
+that exits stops refreshing its slot, which then expires; Prometheus reads
+the drop as a counter reset.
+"""
+import bisect
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+KEY_PREFIX = 'coldstore:metrics'
+WORKER_SEQ_KEY = f'{KEY_PREFIX}:worker-seq'
+# slots read per scrape; older ones belong to long gone workers
+MAX_WORKER_SLOTS = 1024
+
+# series value layout: count, latency sum, queries, db seconds, render seconds, buckets...
+_COUNT, _SUM, _QUERIES, _DB, _RENDER, _BUCKETS = range(6)
+
+_current = ContextVar('coldstore_request_metrics', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_seconds', 'render_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+def _install_query_hook(connection, **kwargs):
+    # contextvars follow sync_to_async, so queries made by async views from
+    # executor threads still land on the request that issued them
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._series = {}
+        self._slot = None
+        self._last_flush = time.monotonic()
+
+    def observe(self, labels, seconds, stats):
+        if self._pid != os.getpid():
+            # forked after import (gunicorn --preload): start a fresh slot
+            self._reset()
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0, 0.0, 0, 0.0, 0.0] + [0] * (len(BUCKETS) + 1)
+            series[_COUNT] += 1
+            series[_SUM] += seconds
+            series[_QUERIES] += stats.queries
+            series[_DB] += stats.db_seconds
+            series[_RENDER] += stats.render_seconds
+            series[_BUCKETS + bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def maybe_flush(self, force=False):
+        interval = settings.METRICS_FLUSH_INTERVAL
+        now = time.monotonic()
+        if not force and now - self._last_flush < interval:
+            return
+        self._last_flush = now
+        if self._slot is None:
+            cache.add(WORKER_SEQ_KEY, 0, timeout=None)
+            self._slot = cache.incr(WORKER_SEQ_KEY)
+        cache.set(f'{KEY_PREFIX}:worker:{self._slot}', self.snapshot(), timeout=interval * 6)
+
+
+registry = MetricsRegistry()
+
+
+def collect():
+    """Sum the series of every worker slot still present in the cache."""
+    registry.maybe_flush(force=True)
+    last = cache.get(WORKER_SEQ_KEY, 0)
+    keys = [f'{KEY_PREFIX}:worker:{slot}' for slot in range(max(1, last - MAX_WORKER_SLOTS + 1), last + 1)]
+    workers = cache.get_many(keys).values()
+
+    merged = {}
+    for snapshot in workers:
+        for labels, series in snapshot.items():
+            total = merged.get(labels)
+            if total is None:
+                merged[labels] = list(series)
+            else:
+                for i, value in enumerate(series):
+                    total[i] += value
+    return merged, len(workers)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def render_prometheus(series, workers):
+    lines = [
+        '# HELP coldstore_metrics_workers Workers that reported within the flush window.',
+        '# TYPE coldstore_metrics_workers gauge',
+        f'coldstore_metrics_workers {workers}',
+    ]
+    rows = sorted(series.items())
+    label_sets = [
+        (f'view="{_escape(view)}",method="{_escape(method)}",status="{_escape(status)}"', values)
+        for (view, method, status), values in rows
+    ]
+
+    lines += [
+        '# HELP coldstore_http_request_duration_seconds Time from middleware entry to response.',
+        '# TYPE coldstore_http_request_duration_seconds histogram',
+    ]
+    for labels, values in label_sets:
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), values[_BUCKETS:]):
+            cumulative += count
+            lines.append(f'coldstore_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'coldstore_http_request_duration_seconds_sum{{{labels}}} {values[_SUM]}')
+        lines.append(f'coldstore_http_request_duration_seconds_count{{{labels}}} {values[_COUNT]}')
+
+    for name, index, help_text in (
+        ('coldstore_http_requests_total', _COUNT, 'Requests served.'),
+        ('coldstore_http_db_queries_total', _QUERIES, 'Database queries issued while serving requests.'),
+        ('coldstore_http_db_duration_seconds_total', _DB, 'Time spent executing database queries.'),
+        ('coldstore_http_render_duration_seconds_total', _RENDER, 'Time spent serializing responses.'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        lines += [f'{name}{{{labels}}} {values[index]}' for labels, values in label_sets]
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    series, workers = collect()
+    return HttpResponse(render_prometheus(series, workers),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class MetricsMiddleware:
+    """Outermost middleware, so the latency covers the whole stack."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.METRICS_ENABLED
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        if self.enabled:
+            connection_created.connect(_install_query_hook, dispatch_uid='coldstore.metrics')
+            for connection in connections.all(initialized_only=True):
+                _install_query_hook(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+            self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+            self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; async views
+        # render inside the view and are not split out
+        stats = _current.get()
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.render_seconds += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def record(self, request, response, seconds, stats):
+        match = request.resolver_match
+        view = match.view_name if match is not None else '<unresolved>'
+        status = response.status_code if response is not None else 500
+        registry.observe((view, request.method, str(status)), seconds, stats)
+        registry.maybe_flush()
@@ -0,0 +1,63 @@
+"""
+Lean middleware path for token-authenticated API requests.
+
+Requests under ``LEAN_API_PREFIX`` that carry a Knox ``Authorization:
+Token ...`` header skip sessions, CSRF cookies, ``request.user``, message
+storage and the debug toolbar. The subclasses below are drop-in
+replacements in ``MIDDLEWARE`` (Django's and the toolbar's system checks
+accept subclasses). Auth, docs and browsable API requests keep the full stack.
+"""
+from debug_toolbar.middleware import DebugToolbarMiddleware as BaseDebugToolbarMiddleware
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import csrf
+from knox.settings import knox_settings
+
+
+def is_token_api_request(request):
+    try:
+        return request._token_api_request
+    except AttributeError:
+        request._token_api_request = _is_token_api_request(request)
+        return request._token_api_request
+
+
+def _is_token_api_request(request):
+    if not settings.LEAN_API_MIDDLEWARE:
+        return False
+    path = request.path_info
+    if not path.startswith(settings.LEAN_API_PREFIX) or path.startswith(settings.LEAN_API_EXCLUDE_PREFIXES):
+        return False
+    if not request.headers.get('Authorization', '').startswith(f'{knox_settings.AUTH_HEADER_PREFIX} '):
+        return False
+    # the browsable API needs the session for its login links and forms
+    return request.GET.get('format') != 'api' and 'text/html' not in request.headers.get('Accept', '')
+
+
+class LeanAPIMixin:
+    def __call__(self, request):
+        if is_token_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(LeanAPIMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(LeanAPIMixin, csrf.CsrfViewMiddleware):
+    pass
+
+
+class AuthenticationMiddleware(LeanAPIMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(LeanAPIMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class DebugToolbarMiddleware(LeanAPIMixin, BaseDebugToolbarMiddleware):
+    pass
@@ -58,24 +58,41 @@ INSTALLED_APPS = [
     'dj_rest_auth.registration',
     'phonenumber_field',
     'coldrooms',
+    'bookings',
+    'telemetry',
+    'benchmarks',
 ]
 
 
 SITE_ID = 1
 
+# The coldstore.middleware classes are the stock ones, except that they let
+# token-authenticated API requests straight through (LEAN_API_MIDDLEWARE)
 MIDDLEWARE = [
+    'coldstore.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'coldstore.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'coldstore.middleware.CsrfViewMiddleware',
+    'coldstore.middleware.AuthenticationMiddleware',
+    'coldstore.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    'coldstore.middleware.DebugToolbarMiddleware',
 ]
 
+# WhiteNoise only runs sync, and one sync middleware makes Django adapt the
+# whole chain, async views included, into a thread per request. The ASGI
+# profile (COLDROOM_ASYNC_READS) uses this list; coldstore.asgi then serves
+# static files in front of the middleware.
+ASGI_MIDDLEWARE = [name for name in MIDDLEWARE if name != 'whitenoise.middleware.WhiteNoiseMiddleware']
+
+LEAN_API_MIDDLEWARE = True
+LEAN_API_PREFIX = '/api/'
+# session based flows (dj-rest-auth, allauth, knox logout signals) and docs
+LEAN_API_EXCLUDE_PREFIXES = ('/api/v1/auth/', '/api/v1/docs/')
+
 ROOT_URLCONF = 'coldstore.urls'
 
 TEMPLATES = [
@@ -158,12 +175,13 @@ AUTHENTICATION_BACKENDS = (
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'knox.auth.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # Needed for allauth
     ],
+    # sliding-window counters in the default cache, shared by every worker when it is Redis
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'users.throttling.AnonRateThrottle',
+        'users.throttling.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
@@ -175,6 +193,16 @@ REST_FRAMEWORK = {
 
 AUTH_USER_MODEL = 'users.User'  
 
+# Knox token digest cache used by users.authentication.CachedTokenAuthentication
+AUTH_TOKEN_CACHE_TTL = 60 * 5  # seconds an entry lives in the shared cache
+# seconds a worker trusts its own LRU copy, 0 disables it; a token revoked on
+# another worker keeps being accepted here for up to that long
+AUTH_TOKEN_CACHE_LOCAL_TTL = 0
+AUTH_TOKEN_CACHE_SIZE = 10000  # entries per worker LRU
+
+# Concurrent password hashes per process for logins served under ASGI, None = CPU count
+LOGIN_HASH_WORKERS = None
+
 
 # dj-rest-auth settings
 REST_AUTH = {
@@ -192,4 +220,51 @@ REST_AUTH = {
 
 # Authentication Settings
 ACCOUNT_SIGNUP_FIELDS = ['email', 'password1', 'password2']
-ACCOUNT_USERNAME_REQUIRED = False  # Keep for backward compatibility
\ No newline at end of file
+ACCOUNT_USERNAME_REQUIRED = False  # Keep for backward compatibility
+
+# Cold room search
+# 'postgis' runs every search against the database, 'memory' answers radius
+# queries from a per-worker grid index kept in sync by model signals.
+COLDROOM_SEARCH_ENGINE = 'postgis'
+COLDROOM_SEARCH_GRID_SIZE = 0.05  # grid cell size in degrees (~5.5 km)
+COLDROOM_SEARCH_MAX_RESULTS = 200  # nearest rooms returned by an unpaginated radius search
+COLDROOM_NEAREST_MAX = 100  # upper bound for ?nearest=N
+COLDROOM_RANK_MAX = 50  # upper bound for ?rank=N
+COLDROOM_RANK_WEIGHTS = {'distance': 1.0, 'capacity': 2.0, 'temperature': 2.0}  # see coldrooms.ranking
+COLDROOM_RANK_TEMP_TOLERANCE = 5.0  # degrees C outside a room's range that count as no temperature fit
+# Anonymous catalogue/search responses are cached per catalogue version;
+# the timeout only bounds how long superseded versions linger. 0 disables.
+COLDROOM_RESPONSE_CACHE_TIMEOUT = 60 * 15
+# Large listings skip the model serializer and build GeoJSON from row tuples.
+COLDROOM_FAST_GEOJSON = True
+COLDROOM_GEOJSON_PRECISION = None  # decimal places for coordinates, ?precision= overrides
+COLDROOM_BATCH_SEARCH_MAX_ORIGINS = 200  # origins accepted by POST /api/v1/search/batch/
+COLDROOM_BATCH_SEARCH_MAX_RESULTS = 20  # rooms returned per origin
+COLDROOM_EXPORT_CHUNK_SIZE = 2000  # rows per server-side cursor fetch in catalogue exports
+COLDROOM_CLUSTER_CELL_PX = 64  # cluster grid cell size in screen pixels
+COLDROOM_CLUSTER_MAX_ZOOM = 15  # from this zoom single-room cells are returned as rooms
+COLDROOM_CLUSTER_MAX_CELLS = 4096  # largest grid (bbox / cell size) one cluster request may span
+COLDROOM_TILE_CACHE_TIMEOUT = 60 * 60 * 24  # vector tiles, keyed by catalogue version
+COLDROOM_TILE_STATIC_MAX_ZOOM = 6  # zooms served from COLDROOM_TILE_DIR once generate_tiles has run
+COLDROOM_TILE_DIR = BASE_DIR / 'tiles'
+COLDROOM_BULK_MAX_ITEMS = 500  # rooms accepted by POST/PATCH /api/v1/cold-rooms/bulk/
+COLDROOM_BULK_REVIEW_MAX_ITEMS = 5000  # ids accepted by POST /api/v1/verifications/review/
+# Route cold-rooms-list/, cold-rooms-list/<pk>/ and search/ to coldrooms.async_views.
+# Only worth it under an ASGI server, see "ASGI Deployment" in the README.
+COLDROOM_ASYNC_READS = False
+
+# Bookings
+BOOKING_MAX_DAYS = 366
+
+# Temperature telemetry (telemetry app)
+TELEMETRY_MAX_READINGS = 10000  # readings accepted by POST /api/v1/telemetry/readings/
+TELEMETRY_MAX_READING_AGE = 60 * 60 * 24 * 7  # seconds; older readings are rejected
+TELEMETRY_MAX_CLOCK_SKEW = 60 * 5  # seconds a sensor clock may run ahead
+TELEMETRY_EXCURSION_GAP = 60 * 5  # seconds between out-of-range readings of one excursion
+TELEMETRY_RETENTION_MONTHS = 3  # raw reading partitions kept by manage.py telemetry_partitions
+TELEMETRY_MAX_ROLLUP_POINTS = 5000  # buckets returned by GET /api/v1/telemetry/rollups/
+
+# Request metrics served at /api/v1/metrics/ (coldstore.metrics)
+METRICS_ENABLED = True
+METRICS_FLUSH_INTERVAL = 10  # seconds between each worker's writes to the shared cache
+METRICS_TOKEN = ''  # bearer token for scrapes; without one the endpoint is DEBUG-only
@@ -13,7 +13,9 @@ DATABASES = {
         'PASSWORD': config('DATABASE_PASSWORD'),
         'HOST': config('DATABASE_HOST'),
         'PORT': config('DATABASE_PORT'),
-        'CONN_MAX_AGE': 600,  # Keep the connection open for 10 minutes
+        # Keep the connection open for 10 minutes; set DATABASE_CONN_MAX_AGE=0
+        # under ASGI, where connections are opened per request
+        'CONN_MAX_AGE': config('DATABASE_CONN_MAX_AGE', default=600, cast=int),
         'OPTIONS': {
             'sslmode': 'require',  #
             'options': '-c search_path=public,postgis',
@@ -21,6 +23,25 @@ DATABASES = {
     }
 }
 
+# Shared cache for throttles, catalogue versions and cached responses.
+# Falls back to Django's per-process LocMem cache when REDIS_URL is unset.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Async read endpoints for ASGI (uvicorn) deployments
+COLDROOM_ASYNC_READS = config('COLDROOM_ASYNC_READS', default=False, cast=bool)
+if COLDROOM_ASYNC_READS:
+    MIDDLEWARE = ASGI_MIDDLEWARE
+
+# Bearer token Prometheus sends when scraping /api/v1/metrics/
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 # Security settings
 SECURE_SSL_REDIRECT = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -0,0 +1,107 @@
+from asgiref.sync import SyncToAsync, iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from . import metrics
+from .middleware import SessionMiddleware, is_token_api_request
+
+
+class MetricsTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry._reset()
+
+    def call(self, path, response):
+        request = self.factory.get(path)
+        request.resolver_match = resolve(path)
+
+        def view(request):
+            # a query issued while the request is in flight
+            metrics._record_query(lambda *args: None, 'SELECT 1', None, False, {})
+            return response
+
+        middleware = metrics.MetricsMiddleware(view)
+        response = middleware(request)
+        if hasattr(response, 'render'):
+            response = middleware.process_template_response(request, response).render()
+        return response
+
+    def test_records_and_renders_series(self):
+        drf = Response({'ok': True})
+        drf.accepted_renderer, drf.accepted_media_type = JSONRenderer(), 'application/json'
+        drf.renderer_context = {}
+        self.call('/api/v1/cold-rooms-list/', drf)
+        self.call('/api/v1/cold-rooms-list/', HttpResponse(status=404))
+
+        series, workers = metrics.collect()
+        self.assertEqual(workers, 1)
+        ok = series[('coldroom-list-list', 'GET', '200')]
+        self.assertEqual((ok[0], ok[2]), (1, 1))
+
+        text = metrics.render_prometheus(series, workers)
+        labels = 'view="coldroom-list-list",method="GET",status="404"'
+        self.assertIn(f'coldstore_http_requests_total{{{labels}}} 1', text)
+        self.assertIn(f'coldstore_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', text)
+        self.assertIn(f'coldstore_http_db_queries_total{{{labels}}} 1', text)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_endpoint_requires_token(self):
+        self.assertEqual(metrics.metrics_view(self.factory.get('/api/v1/metrics/')).status_code, 403)
+        response = metrics.metrics_view(
+            self.factory.get('/api/v1/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'coldstore_metrics_workers 1', response.content)
+
+
+class LeanAPIMiddlewareTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def test_only_token_api_requests_take_the_lean_path(self):
+        token = {'HTTP_AUTHORIZATION': 'Token abc'}
+        cases = [
+            (self.factory.get('/api/v1/cold-rooms/', **token), True),
+            (self.factory.get('/api/v1/cold-rooms/'), False),
+            (self.factory.get('/api/v1/cold-rooms/', HTTP_ACCEPT='text/html', **token), False),
+            (self.factory.get('/api/v1/cold-rooms/?format=api', **token), False),
+            (self.factory.post('/api/v1/auth/logout/', **token), False),
+            (self.factory.get('/admin/', **token), False),
+        ]
+        for request, expected in cases:
+            self.assertEqual(is_token_api_request(request), expected, request.get_full_path())
+        with override_settings(LEAN_API_MIDDLEWARE=False):
+            self.assertFalse(is_token_api_request(self.factory.get('/api/v1/cold-rooms/', **token)))
+
+    def test_lean_requests_skip_the_session(self):
+        middleware = SessionMiddleware(lambda request: HttpResponse())
+        lean = self.factory.get('/api/v1/cold-rooms/', HTTP_AUTHORIZATION='Token abc')
+        full = self.factory.get('/api/v1/cold-rooms/')
+        middleware(lean)
+        middleware(full)
+        self.assertFalse(hasattr(lean, 'session'))
+        self.assertTrue(hasattr(full, 'session'))
+
+
+class ASGIMiddlewareTests(SimpleTestCase):
+    # Django only logs middleware adaptation when DEBUG is on
+    @override_settings(MIDDLEWARE=settings.ASGI_MIDDLEWARE, DEBUG=True)
+    def test_asgi_profile_keeps_the_chain_async(self):
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            handler = ASGIHandler()
+        self.assertTrue(iscoroutinefunction(handler._middleware_chain))
+        self.assertNotIsInstance(handler._middleware_chain, SyncToAsync)
+
+    @override_settings(DEBUG=True)
+    def test_whitenoise_adapts_the_chain_to_sync(self):
+        with self.assertLogs('django.request', 'DEBUG') as logs:
+            handler = ASGIHandler()
+        self.assertIn('WhiteNoiseMiddleware', logs.output[0])
+        self.assertIsInstance(handler._middleware_chain, SyncToAsync)
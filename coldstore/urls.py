@@ -6,6 +6,8 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 
+from .metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="ColdStore API",
@@ -21,6 +23,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='api-docs'),
     path('api/v1/health/', include('health_check.urls')),
+    path('api/v1/metrics/', metrics_view, name='metrics'),
     path('', include(('users.urls', 'users'), namespace='auth')),
     path('api/v1/auth/drf/', include('rest_framework.urls', namespace='rest_framework')),
     
@@ -30,7 +33,9 @@ urlpatterns = [
     path('api/v1/auth/social/', include('allauth.socialaccount.urls')),
 
     # cold room urls
-    path('api/v1/', include('coldrooms.urls'))
+    path('api/v1/', include('coldrooms.urls')),
+    path('api/v1/', include('bookings.urls')),
+    path('api/v1/', include('telemetry.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import TemperatureExcursion, TemperatureRollup
+
+# raw readings are not registered: the table is only ever appended to by telemetry.ingest
+
+@admin.register(TemperatureRollup)
+class TemperatureRollupAdmin(admin.ModelAdmin):
+    list_display = ('cold_room', 'resolution', 'bucket', 'readings', 'minimum', 'maximum', 'excursions')
+    list_filter = ('resolution',)
+    readonly_fields = ('cold_room', 'resolution', 'bucket', 'readings', 'total', 'minimum', 'maximum',
+                       'excursions')
+
+@admin.register(TemperatureExcursion)
+class TemperatureExcursionAdmin(admin.ModelAdmin):
+    list_display = ('cold_room', 'started_at', 'ended_at', 'minimum', 'maximum', 'readings')
+    search_fields = ('cold_room__name',)
+    readonly_fields = ('cold_room', 'started_at', 'ended_at', 'minimum', 'maximum', 'readings')
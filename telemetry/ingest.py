@@ -0,0 +1,207 @@
+"""
+Batched ingestion of sensor readings.
+
+A batch is COPYed into a temporary table, appended to the partitioned
+readings table with one INSERT ... SELECT and folded into the rollups and
+excursions from there, all in one transaction. Out-of-range readings are
+judged against the room's Celsius-normalized ``temp_min_c``/``temp_max_c``
+and split into excursions wherever consecutive ones are more than
+``TELEMETRY_EXCURSION_GAP`` seconds apart.
+"""
+import io
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from coldrooms.models import ColdRoom
+
+from .models import TemperatureExcursion, TemperatureReading, TemperatureRollup
+from .partitions import ensure_partitions
+
+BATCH_TABLE = 'telemetry_batch'
+
+CREATE_BATCH_SQL = f"""
+    CREATE TEMPORARY TABLE {BATCH_TABLE} (
+        cold_room_id bigint NOT NULL,
+        recorded_at timestamptz NOT NULL,
+        temperature real NOT NULL
+    ) ON COMMIT DROP
+"""
+
+COPY_BATCH_SQL = f"COPY {BATCH_TABLE} (cold_room_id, recorded_at, temperature) FROM STDIN"
+
+INSERT_READINGS_SQL = """
+    INSERT INTO {readings} (cold_room_id, recorded_at, temperature)
+    SELECT cold_room_id, recorded_at, temperature FROM {batch}
+"""
+
+OUT_OF_RANGE = "(b.temperature < c.temp_min_c OR b.temperature > c.temp_max_c)"
+
+# ORDER BY keeps the row lock order stable between concurrent batches
+ROLLUP_SQL = """
+    INSERT INTO {rollups} AS r (cold_room_id, resolution, bucket, readings, total,
+                                minimum, maximum, excursions)
+    SELECT b.cold_room_id, %(resolution)s,
+           to_timestamp(floor(extract(epoch FROM b.recorded_at) / %(resolution)s) * %(resolution)s) AS bucket,
+           count(*), sum(b.temperature::float8), min(b.temperature), max(b.temperature),
+           count(*) FILTER (WHERE {out_of_range})
+    FROM {batch} b
+    JOIN {rooms} c ON c.id = b.cold_room_id
+    GROUP BY b.cold_room_id, bucket
+    ORDER BY b.cold_room_id, bucket
+    ON CONFLICT (cold_room_id, resolution, bucket) DO UPDATE SET
+        readings = r.readings + EXCLUDED.readings,
+        total = r.total + EXCLUDED.total,
+        minimum = LEAST(r.minimum, EXCLUDED.minimum),
+        maximum = GREATEST(r.maximum, EXCLUDED.maximum),
+        excursions = r.excursions + EXCLUDED.excursions
+"""
+
+# a batch's out-of-range readings of one room are split into spans wherever
+# consecutive ones are more than the excursion gap apart
+EXCURSION_SUMMARY_SQL = """
+    WITH out_of_range AS (
+        SELECT b.cold_room_id, b.recorded_at, b.temperature,
+               CASE WHEN b.recorded_at - lag(b.recorded_at) OVER readings > %(gap)s THEN 1 ELSE 0 END AS breaks
+        FROM {batch} b
+        JOIN {rooms} c ON c.id = b.cold_room_id
+        WHERE {out_of_range}
+        WINDOW readings AS (PARTITION BY b.cold_room_id ORDER BY b.recorded_at)
+    ), spans AS (
+        SELECT *, sum(breaks) OVER (PARTITION BY cold_room_id ORDER BY recorded_at) AS span
+        FROM out_of_range
+    )
+    SELECT cold_room_id, min(recorded_at), max(recorded_at),
+           min(temperature), max(temperature), count(*)
+    FROM spans
+    GROUP BY cold_room_id, span
+    ORDER BY cold_room_id, span
+"""
+
+
+def parse_readings(items):
+    """
+    Turn ``[{"cold_room": 1, "recorded_at": "...", "temperature": 3.5}, ...]``
+    into ``(cold_room_id, recorded_at, temperature)`` tuples.
+
+    Returns ``(readings, errors)``: ``readings`` pairs each tuple with its
+    list index, ``errors`` holds ``{"index": ..., "errors": ...}`` entries.
+    Plain Python instead of a serializer per item, since batches hold
+    thousands of readings.
+    """
+    now = timezone.now()
+    oldest = now - timedelta(seconds=settings.TELEMETRY_MAX_READING_AGE)
+    newest = now + timedelta(seconds=settings.TELEMETRY_MAX_CLOCK_SKEW)
+    readings, errors = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'errors': ["Expected an object."]})
+            continue
+        problems = {}
+        cold_room = item.get('cold_room')
+        if isinstance(cold_room, bool) or not isinstance(cold_room, int):
+            problems['cold_room'] = ["A cold room id is required."]
+
+        temperature = item.get('temperature')
+        if isinstance(temperature, bool) or not isinstance(temperature, (int, float)) \
+                or not math.isfinite(temperature):
+            problems['temperature'] = ["A temperature in Celsius is required."]
+
+        recorded_at = item.get('recorded_at')
+        try:
+            recorded_at = parse_datetime(recorded_at) if isinstance(recorded_at, str) else None
+        except ValueError:
+            recorded_at = None
+        if recorded_at is None:
+            problems['recorded_at'] = ["An ISO 8601 timestamp is required."]
+        else:
+            if timezone.is_naive(recorded_at):
+                recorded_at = timezone.make_aware(recorded_at)
+            if not oldest <= recorded_at <= newest:
+                problems['recorded_at'] = ["Timestamp is too old or in the future."]
+
+        if problems:
+            errors.append({'index': index, 'errors': problems})
+        else:
+            readings.append((index, (cold_room, recorded_at, float(temperature))))
+    return readings, errors
+
+
+def _copy_buffer(rows):
+    buffer = io.StringIO()
+    for cold_room, recorded_at, temperature in rows:
+        buffer.write(f"{cold_room}\t{recorded_at.isoformat()}\t{temperature!r}\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _merge_excursions(summary):
+    """
+    Fold the batch's spans into excursions; rooms are row-locked first.
+
+    A span within the gap of the room's latest excursion extends it, any
+    other span opens a new excursion.
+    """
+    room_ids = [row[0] for row in summary]
+    # serializes excursion merging per room between concurrent batches
+    list(ColdRoom.objects.select_for_update().filter(pk__in=room_ids).order_by('pk').values_list('pk'))
+    latest = {
+        excursion.cold_room_id: excursion
+        for excursion in TemperatureExcursion.objects.filter(cold_room_id__in=room_ids)
+        .order_by('cold_room_id', '-ended_at').distinct('cold_room_id')
+    }
+    gap = timedelta(seconds=settings.TELEMETRY_EXCURSION_GAP)
+    created, updated = [], {}
+    for room_id, started_at, ended_at, minimum, maximum, readings in summary:
+        excursion = latest.get(room_id)
+        if excursion is not None and started_at <= excursion.ended_at + gap \
+                and ended_at >= excursion.started_at - gap:
+            excursion.started_at = min(excursion.started_at, started_at)
+            excursion.ended_at = max(excursion.ended_at, ended_at)
+            excursion.minimum = min(excursion.minimum, minimum)
+            excursion.maximum = max(excursion.maximum, maximum)
+            excursion.readings += readings
+            updated[excursion.pk] = excursion
+        else:
+            created.append(TemperatureExcursion(
+                cold_room_id=room_id, started_at=started_at, ended_at=ended_at,
+                minimum=minimum, maximum=maximum, readings=readings,
+            ))
+    TemperatureExcursion.objects.bulk_update(
+        updated.values(), ['started_at', 'ended_at', 'minimum', 'maximum', 'readings'])
+    TemperatureExcursion.objects.bulk_create(created)
+    return len(created) + len(updated)
+
+
+def ingest(rows):
+    """
+    Store ``(cold_room_id, recorded_at, temperature)`` rows and update rollups and excursions.
+
+    Room ids must exist; callers check ownership. Returns the number of
+    excursions opened or extended by the batch.
+    """
+    if not rows:
+        return 0
+    times = [recorded_at for _, recorded_at, _ in rows]
+    ensure_partitions(min(times), max(times))
+
+    names = {
+        'batch': BATCH_TABLE,
+        'readings': connection.ops.quote_name(TemperatureReading._meta.db_table),
+        'rollups': connection.ops.quote_name(TemperatureRollup._meta.db_table),
+        'rooms': connection.ops.quote_name(ColdRoom._meta.db_table),
+        'out_of_range': OUT_OF_RANGE,
+    }
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(CREATE_BATCH_SQL)
+        cursor.copy_expert(COPY_BATCH_SQL, _copy_buffer(rows))
+        cursor.execute(INSERT_READINGS_SQL.format(**names))
+        for resolution in TemperatureRollup.Resolution:
+            cursor.execute(ROLLUP_SQL.format(**names), {'resolution': int(resolution)})
+        cursor.execute(EXCURSION_SUMMARY_SQL.format(**names),
+                       {'gap': timedelta(seconds=settings.TELEMETRY_EXCURSION_GAP)})
+        summary = cursor.fetchall()
+        return _merge_excursions(summary) if summary else 0
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from telemetry.partitions import (drop_partitions_before, ensure_partitions, month_start, next_month,
+                                  previous_month)
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly partitions for temperature readings and drop expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=2, help='Months to create after the current one')
+        parser.add_argument('--retention', type=int, default=None,
+                            help='Months of raw readings to keep (default: TELEMETRY_RETENTION_MONTHS)')
+        parser.add_argument('--no-drop', action='store_true', help='Only create partitions')
+
+    def handle(self, *args, **options):
+        current = month_start(timezone.now())
+        last = current
+        for _ in range(options['ahead']):
+            last = next_month(last)
+        ensure_partitions(current, last)
+        self.stdout.write(f"Partitions exist from {current:%Y-%m} to {last:%Y-%m}")
+
+        if options['no_drop']:
+            return
+        retention = options['retention'] or settings.TELEMETRY_RETENTION_MONTHS
+        if retention < 2:
+            # late readings (TELEMETRY_MAX_READING_AGE) may still land in last month
+            raise CommandError('Keep at least 2 months of readings.')
+        cutoff = current
+        for _ in range(retention - 1):
+            cutoff = previous_month(cutoff)
+        for name in drop_partitions_before(cutoff):
+            self.stdout.write(f"Dropped {name}")
@@ -0,0 +1,93 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:59
+
+import django.db.models.deletion
+import telemetry.models
+from django.db import migrations, models
+
+PARTITIONED_READINGS_SQL = [
+    """
+    CREATE TABLE "telemetry_temperaturereading" (
+        "id" bigint GENERATED BY DEFAULT AS IDENTITY,
+        "cold_room_id" bigint NOT NULL
+            REFERENCES "coldrooms_coldroom" ("id") DEFERRABLE INITIALLY DEFERRED,
+        "recorded_at" timestamp with time zone NOT NULL,
+        "temperature" real NOT NULL,
+        PRIMARY KEY ("id", "recorded_at")
+    ) PARTITION BY RANGE ("recorded_at")
+    """,
+    'CREATE INDEX "telemetry_reading_room_idx" ON "telemetry_temperaturereading" ("cold_room_id", "recorded_at")',
+]
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('coldrooms', '0005_coldroom_celsius_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TemperatureExcursion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(verbose_name='Started At')),
+                ('ended_at', models.DateTimeField(verbose_name='Last Reading At')),
+                ('minimum', telemetry.models.RealField(verbose_name='Minimum (°C)')),
+                ('maximum', telemetry.models.RealField(verbose_name='Maximum (°C)')),
+                ('readings', models.PositiveIntegerField(verbose_name='Readings Out of Range')),
+                ('cold_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='temperature_excursions', to='coldrooms.coldroom')),
+            ],
+            options={
+                'verbose_name': 'Temperature Excursion',
+                'verbose_name_plural': 'Temperature Excursions',
+                'indexes': [models.Index(fields=['cold_room', '-ended_at'], name='telemetry_excursion_room_idx')],
+            },
+        ),
+        # Django has no partitioned tables, so the readings table is created by
+        # hand: range-partitioned by month, partitions come from telemetry.partitions
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='TemperatureReading',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('recorded_at', models.DateTimeField(verbose_name='Recorded At')),
+                        ('temperature', telemetry.models.RealField(verbose_name='Temperature (°C)')),
+                        ('cold_room', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='temperature_readings', to='coldrooms.coldroom')),
+                    ],
+                    options={
+                        'verbose_name': 'Temperature Reading',
+                        'verbose_name_plural': 'Temperature Readings',
+                        'indexes': [models.Index(fields=['cold_room', 'recorded_at'], name='telemetry_reading_room_idx')],
+                    },
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql=PARTITIONED_READINGS_SQL,
+                    reverse_sql='DROP TABLE "telemetry_temperaturereading"',
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TemperatureRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField(choices=[(60, '1 minute'), (3600, '1 hour')], verbose_name='Resolution (seconds)')),
+                ('bucket', models.DateTimeField(verbose_name='Bucket Start')),
+                ('readings', models.PositiveIntegerField(verbose_name='Readings')),
+                ('total', models.FloatField(verbose_name='Sum of Readings')),
+                ('minimum', telemetry.models.RealField(verbose_name='Minimum (°C)')),
+                ('maximum', telemetry.models.RealField(verbose_name='Maximum (°C)')),
+                ('excursions', models.PositiveIntegerField(default=0, verbose_name='Readings Out of Range')),
+                ('cold_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='temperature_rollups', to='coldrooms.coldroom')),
+            ],
+            options={
+                'verbose_name': 'Temperature Rollup',
+                'verbose_name_plural': 'Temperature Rollups',
+                'constraints': [models.UniqueConstraint(fields=('cold_room', 'resolution', 'bucket'), name='telemetry_rollup_bucket_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from coldrooms.models import ColdRoom
+
+
+class RealField(models.FloatField):
+    """Single-precision float column; sensors are not that accurate anyway."""
+
+    def db_type(self, connection):
+        return 'real'
+
+
+class TemperatureReading(models.Model):
+    """
+    One sensor reading, in Celsius.
+
+    Append-only and range-partitioned by month on ``recorded_at`` (see
+    ``telemetry.partitions``), so the database primary key is
+    ``(id, recorded_at)``. Rows are written by ``telemetry.ingest`` only;
+    dashboards read ``TemperatureRollup`` instead.
+    """
+    id = models.BigAutoField(primary_key=True)
+    cold_room = models.ForeignKey(ColdRoom, on_delete=models.CASCADE, related_name='temperature_readings',
+                                  db_index=False)
+    recorded_at = models.DateTimeField(_('Recorded At'))
+    temperature = RealField(_('Temperature (°C)'))
+
+    class Meta:
+        verbose_name = _('Temperature Reading')
+        verbose_name_plural = _('Temperature Readings')
+        indexes = [
+            models.Index(fields=['cold_room', 'recorded_at'], name='telemetry_reading_room_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cold_room_id} at {self.recorded_at}: {self.temperature} °C"
+
+
+class TemperatureRollup(models.Model):
+    """Per-room aggregate of the readings in one time bucket, updated by every ingest batch."""
+    class Resolution(models.IntegerChoices):
+        MINUTE = 60, _('1 minute')
+        HOUR = 3600, _('1 hour')
+
+    cold_room = models.ForeignKey(ColdRoom, on_delete=models.CASCADE, related_name='temperature_rollups')
+    resolution = models.PositiveIntegerField(_('Resolution (seconds)'), choices=Resolution.choices)
+    bucket = models.DateTimeField(_('Bucket Start'))
+    readings = models.PositiveIntegerField(_('Readings'))
+    # sum of the readings, so batches can be added without re-reading raw rows
+    total = models.FloatField(_('Sum of Readings'))
+    minimum = RealField(_('Minimum (°C)'))
+    maximum = RealField(_('Maximum (°C)'))
+    excursions = models.PositiveIntegerField(_('Readings Out of Range'), default=0)
+
+    class Meta:
+        verbose_name = _('Temperature Rollup')
+        verbose_name_plural = _('Temperature Rollups')
+        constraints = [
+            models.UniqueConstraint(fields=['cold_room', 'resolution', 'bucket'],
+                                    name='telemetry_rollup_bucket_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.cold_room_id} {self.get_resolution_display()} from {self.bucket}"
+
+    @property
+    def average(self):
+        return self.total / self.readings if self.readings else None
+
+
+class TemperatureExcursion(models.Model):
+    """
+    A stretch of readings outside the room's ``temp_min``/``temp_max``.
+
+    Out-of-range readings less than ``TELEMETRY_EXCURSION_GAP`` seconds
+    after the end of the room's latest excursion extend it.
+    """
+    cold_room = models.ForeignKey(ColdRoom, on_delete=models.CASCADE, related_name='temperature_excursions')
+    started_at = models.DateTimeField(_('Started At'))
+    ended_at = models.DateTimeField(_('Last Reading At'))
+    minimum = RealField(_('Minimum (°C)'))
+    maximum = RealField(_('Maximum (°C)'))
+    readings = models.PositiveIntegerField(_('Readings Out of Range'))
+
+    class Meta:
+        verbose_name = _('Temperature Excursion')
+        verbose_name_plural = _('Temperature Excursions')
+        indexes = [
+            models.Index(fields=['cold_room', '-ended_at'], name='telemetry_excursion_room_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cold_room_id}: {self.started_at} - {self.ended_at}"
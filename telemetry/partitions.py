@@ -0,0 +1,95 @@
+"""
+Monthly partitions of the raw readings table.
+
+``ensure_partitions()`` runs before every ingest batch and only issues DDL
+for months this worker has not seen yet; ``manage.py telemetry_partitions``
+creates upcoming months ahead of time and drops expired ones.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+from .models import TemperatureReading
+
+PARENT_TABLE = TemperatureReading._meta.db_table
+
+CREATE_PARTITION_SQL = """
+    CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent}
+    FOR VALUES FROM (%s) TO (%s)
+"""
+
+_known = set()
+
+
+def month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(month):
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+def previous_month(month):
+    return month.replace(year=month.year - (month.month == 1), month=(month.month - 2) % 12 + 1)
+
+
+def months_between(start, end):
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = next_month(month)
+
+
+def partition_name(month):
+    return f"{PARENT_TABLE}_{month:%Y%m}"
+
+
+def ensure_partitions(start, end):
+    """Create the partitions covering ``[start, end]`` that this worker has not seen yet."""
+    missing = [month for month in months_between(start, end) if month not in _known]
+    if not missing:
+        return
+    with connection.cursor() as cursor:
+        for month in missing:
+            cursor.execute(
+                CREATE_PARTITION_SQL.format(name=connection.ops.quote_name(partition_name(month)),
+                                            parent=connection.ops.quote_name(PARENT_TABLE)),
+                [month, next_month(month)],
+            )
+    # a rolled back CREATE TABLE must not be remembered
+    transaction.on_commit(lambda: _known.update(missing))
+
+
+def existing_partitions():
+    """Return ``{partition name: month}`` for the partitions attached to the readings table."""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+        """, [PARENT_TABLE])
+        names = [name for name, in cursor.fetchall()]
+    prefix = f"{PARENT_TABLE}_"
+    partitions = {}
+    for name in names:
+        try:
+            partitions[name] = datetime.strptime(name.removeprefix(prefix), '%Y%m').replace(
+                tzinfo=dt_timezone.utc)
+        except ValueError:
+            continue
+    return partitions
+
+
+def drop_partitions_before(month):
+    """Drop whole months of raw readings older than ``month``; rollups are kept."""
+    dropped = []
+    with connection.cursor() as cursor:
+        for name, start in sorted(existing_partitions().items(), key=lambda item: item[1]):
+            if start < month:
+                cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
+                _known.discard(start)
+                dropped.append(name)
+    return dropped
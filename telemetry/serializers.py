@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from coldrooms.models import ColdRoom
+from .models import TemperatureExcursion, TemperatureRollup
+
+
+class TemperatureRollupSerializer(serializers.ModelSerializer):
+    average = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = TemperatureRollup
+        fields = ['bucket', 'readings', 'minimum', 'maximum', 'average', 'excursions']
+
+
+class RollupQuerySerializer(serializers.Serializer):
+    RESOLUTIONS = {'1m': TemperatureRollup.Resolution.MINUTE, '1h': TemperatureRollup.Resolution.HOUR}
+
+    # the view narrows the queryset to the rooms the user may see
+    cold_room = serializers.PrimaryKeyRelatedField(queryset=ColdRoom.objects.all())
+    resolution = serializers.ChoiceField(choices=list(RESOLUTIONS), default='1m')
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        attrs['resolution'] = self.RESOLUTIONS[attrs['resolution']]
+        attrs.setdefault('end', timezone.now())
+        attrs.setdefault('start', attrs['end'] - timedelta(days=1))
+        if attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError({'end': 'End must be after the start.'})
+        buckets = (attrs['end'] - attrs['start']).total_seconds() / attrs['resolution']
+        if buckets > settings.TELEMETRY_MAX_ROLLUP_POINTS:
+            raise serializers.ValidationError(
+                f"At most {settings.TELEMETRY_MAX_ROLLUP_POINTS} buckets per request; "
+                f"use a shorter period or a coarser resolution."
+            )
+        return attrs
+
+
+class TemperatureExcursionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TemperatureExcursion
+        fields = ['id', 'cold_room', 'started_at', 'ended_at', 'minimum', 'maximum', 'readings']
@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from coldrooms.models import ColdRoom
+from users.models import User
+
+from .ingest import ingest, parse_readings
+from .models import TemperatureExcursion, TemperatureReading, TemperatureRollup
+from .partitions import months_between, partition_name
+from .views import visible_rooms
+
+
+class ParseReadingsTests(SimpleTestCase):
+    def test_valid_readings_keep_their_index(self):
+        now = timezone.now()
+        readings, errors = parse_readings([
+            {'cold_room': 1, 'recorded_at': now.isoformat(), 'temperature': 3.5},
+            {'cold_room': 2, 'recorded_at': now.isoformat(), 'temperature': -18},
+        ])
+        self.assertEqual(errors, [])
+        self.assertEqual(readings, [(0, (1, now, 3.5)), (1, (2, now, -18.0))])
+
+    @override_settings(TELEMETRY_MAX_READING_AGE=60, TELEMETRY_MAX_CLOCK_SKEW=60)
+    def test_reports_every_problem_by_index(self):
+        now = timezone.now()
+        readings, errors = parse_readings([
+            {'cold_room': 1, 'recorded_at': now.isoformat(), 'temperature': 4},
+            {'cold_room': '1', 'recorded_at': 'noon', 'temperature': float('nan')},
+            {'cold_room': 1, 'recorded_at': (now - timedelta(hours=1)).isoformat(), 'temperature': 4},
+            {'cold_room': 1, 'recorded_at': (now + timedelta(hours=1)).isoformat(), 'temperature': True},
+            [1, now.isoformat(), 4],
+        ])
+        self.assertEqual([index for index, _ in readings], [0])
+        self.assertEqual([error['index'] for error in errors], [1, 2, 3, 4])
+        self.assertEqual(set(errors[0]['errors']), {'cold_room', 'recorded_at', 'temperature'})
+        self.assertEqual(set(errors[2]['errors']), {'recorded_at', 'temperature'})
+
+
+class PartitionTests(SimpleTestCase):
+    def test_months_cover_the_range_across_years(self):
+        start = datetime(2025, 11, 30, 23, tzinfo=dt_timezone.utc)
+        end = datetime(2026, 1, 1, 0, 30, tzinfo=dt_timezone(timedelta(hours=3)))
+        self.assertEqual([partition_name(month) for month in months_between(start, end)],
+                         ['telemetry_temperaturereading_202511', 'telemetry_temperaturereading_202512'])
+
+
+def create_room(owner, name, temp_min='2.00', temp_max='8.00', temp_unit='C'):
+    return ColdRoom.objects.create(owner=owner, name=name, location=Point(36.82, -1.29, srid=4326),
+                                   capacity=100, temp_min=Decimal(temp_min), temp_max=Decimal(temp_max),
+                                   temp_unit=temp_unit, is_verified=True)
+
+
+@override_settings(TELEMETRY_EXCURSION_GAP=300)
+class IngestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(email='sensors@example.com', password='Secret123!',
+                                         phone='+254700000030', user_type=User.UserType.COLD_ROOM_OWNER)
+        cls.room = create_room(owner, 'Celsius')
+        # 35.6-46.4 F is the same 2-8 C range
+        cls.fahrenheit_room = create_room(owner, 'Fahrenheit', '35.60', '46.40', 'F')
+
+    def setUp(self):
+        self.base = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+
+    def at(self, seconds):
+        return self.base + timedelta(seconds=seconds)
+
+    def rollups(self, resolution):
+        return list(TemperatureRollup.objects.filter(cold_room=self.room, resolution=resolution)
+                    .order_by('bucket')
+                    .values_list('bucket', 'readings', 'total', 'minimum', 'maximum', 'excursions'))
+
+    def excursions(self, room=None):
+        return list(TemperatureExcursion.objects.filter(cold_room=room or self.room).order_by('started_at')
+                    .values_list('started_at', 'ended_at', 'minimum', 'maximum', 'readings'))
+
+    def test_readings_are_stored_and_rolled_up(self):
+        ingest([(self.room.pk, self.at(0), 4.0), (self.room.pk, self.at(30), 10.0),
+                (self.room.pk, self.at(90), 6.0)])
+        self.assertEqual(TemperatureReading.objects.filter(cold_room=self.room).count(), 3)
+        self.assertEqual(self.rollups(TemperatureRollup.Resolution.MINUTE), [
+            (self.at(0), 2, 14.0, 4.0, 10.0, 1),
+            (self.at(60), 1, 6.0, 6.0, 6.0, 0),
+        ])
+        self.assertEqual(self.rollups(TemperatureRollup.Resolution.HOUR), [(self.at(0), 3, 20.0, 4.0, 10.0, 1)])
+
+        # a later batch is added to the existing buckets
+        ingest([(self.room.pk, self.at(45), 2.0), (self.room.pk, self.at(3600), 1.5)])
+        self.assertEqual(self.rollups(TemperatureRollup.Resolution.MINUTE), [
+            (self.at(0), 3, 16.0, 2.0, 10.0, 1),
+            (self.at(60), 1, 6.0, 6.0, 6.0, 0),
+            (self.at(3600), 1, 1.5, 1.5, 1.5, 1),
+        ])
+        hour = TemperatureRollup.objects.get(cold_room=self.room, resolution=TemperatureRollup.Resolution.HOUR,
+                                             bucket=self.at(0))
+        self.assertEqual((hour.readings, hour.average), (4, 5.5))
+
+    def test_ranges_are_compared_in_celsius(self):
+        ingest([(self.fahrenheit_room.pk, self.at(0), 5.0), (self.fahrenheit_room.pk, self.at(10), 9.0)])
+        self.assertEqual(self.excursions(self.fahrenheit_room), [(self.at(10), self.at(10), 9.0, 9.0, 1)])
+
+    def test_batch_is_split_into_excursions_by_gap(self):
+        opened = ingest([
+            (self.room.pk, self.at(0), 10.0), (self.room.pk, self.at(60), 12.0),
+            (self.room.pk, self.at(120), 5.0),
+            (self.room.pk, self.at(600), -1.0), (self.room.pk, self.at(660), 11.0),
+        ])
+        self.assertEqual(opened, 2)
+        self.assertEqual(self.excursions(), [
+            (self.at(0), self.at(60), 10.0, 12.0, 2),
+            (self.at(600), self.at(660), -1.0, 11.0, 2),
+        ])
+
+        # within the gap of the latest excursion: extended, not opened
+        self.assertEqual(ingest([(self.room.pk, self.at(900), 9.0)]), 1)
+        self.assertEqual(self.excursions()[-1], (self.at(600), self.at(900), -1.0, 11.0, 3))
+
+        self.assertEqual(ingest([(self.room.pk, self.at(1500), 9.0)]), 1)
+        self.assertEqual(len(self.excursions()), 3)
+
+    def test_spans_on_both_sides_extend_the_same_excursion(self):
+        ingest([(self.room.pk, self.at(300), 9.0), (self.room.pk, self.at(400), 9.5)])
+        # late readings just before and after it, more than the gap apart from each other
+        self.assertEqual(ingest([(self.room.pk, self.at(100), 12.0), (self.room.pk, self.at(650), 0.0)]), 1)
+        self.assertEqual(self.excursions(), [(self.at(100), self.at(650), 0.0, 12.0, 4)])
+
+    def test_in_range_batch_opens_nothing(self):
+        self.assertEqual(ingest([(self.room.pk, self.at(0), 2.0), (self.room.pk, self.at(60), 8.0)]), 0)
+        self.assertEqual(self.excursions(), [])
+        self.assertEqual(ingest([]), 0)
+
+
+class TelemetryAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email='owner-a@example.com', password='Secret123!',
+                                             phone='+254700000031', user_type=User.UserType.COLD_ROOM_OWNER)
+        cls.other = User.objects.create_user(email='owner-b@example.com', password='Secret123!',
+                                             phone='+254700000032', user_type=User.UserType.COLD_ROOM_OWNER)
+        cls.staff = User.objects.create_user(email='staff@example.com', password='Secret123!',
+                                             phone='+254700000033', is_staff=True)
+        cls.room = create_room(cls.owner, 'Mine')
+        cls.other_room = create_room(cls.other, 'Theirs')
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def post(self, user, rooms, query=''):
+        recorded_at = timezone.now().isoformat()
+        return self.client_for(user).post(
+            f'/api/v1/telemetry/readings/{query}',
+            [{'cold_room': room.pk, 'recorded_at': recorded_at, 'temperature': 4.0} for room in rooms],
+            format='json',
+        )
+
+    def test_visible_rooms(self):
+        self.assertEqual(set(visible_rooms(self.owner)), {self.room})
+        self.assertEqual(set(visible_rooms(self.staff)), {self.room, self.other_room})
+
+    def test_owners_report_for_their_own_rooms_only(self):
+        response = self.post(self.owner, [self.room])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['accepted'], 1)
+
+        response = self.post(self.owner, [self.room, self.other_room])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'], [{'index': 1, 'errors': {'cold_room': ['Unknown cold room.']}}])
+
+        response = self.post(self.owner, [self.room, self.other_room], '?allow_partial=true')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['accepted'], response.data['failed']), (1, 1))
+        self.assertEqual(TemperatureReading.objects.filter(cold_room=self.other_room).count(), 0)
+
+    def test_staff_report_for_any_room(self):
+        response = self.post(self.staff, [self.room, self.other_room])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['accepted'], 2)
+
+    def test_anonymous_requests_are_refused(self):
+        response = APIClient().post('/api/v1/telemetry/readings/', [], format='json')
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_rollups_and_excursions_of_other_owners_are_hidden(self):
+        self.post(self.staff, [self.room, self.other_room])
+        response = self.client_for(self.owner).get('/api/v1/telemetry/rollups/', {'cold_room': self.other_room.pk})
+        self.assertEqual(response.status_code, 400)
+        response = self.client_for(self.owner).get('/api/v1/telemetry/rollups/', {'cold_room': self.room.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+        TemperatureExcursion.objects.create(cold_room=self.other_room, started_at=timezone.now(),
+                                            ended_at=timezone.now(), minimum=9.0, maximum=9.0, readings=1)
+        self.assertEqual(self.client_for(self.owner).get('/api/v1/telemetry/excursions/').data, [])
+        self.assertEqual(len(self.client_for(self.staff).get('/api/v1/telemetry/excursions/').data), 1)
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ReadingViewSet, TemperatureExcursionViewSet, TemperatureRollupViewSet
+
+router = DefaultRouter()
+router.register(r'telemetry/readings', ReadingViewSet, basename='telemetry-reading')
+router.register(r'telemetry/rollups', TemperatureRollupViewSet, basename='telemetry-rollup')
+router.register(r'telemetry/excursions', TemperatureExcursionViewSet, basename='telemetry-excursion')
+
+urlpatterns = [
+    path('', include(router.urls))
+]
@@ -0,0 +1,86 @@
+from django.conf import settings
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from coldrooms.models import ColdRoom
+from .ingest import ingest, parse_readings
+from .models import TemperatureExcursion, TemperatureRollup
+from .serializers import RollupQuerySerializer, TemperatureExcursionSerializer, TemperatureRollupSerializer
+
+
+def visible_rooms(user):
+    # owners report and read telemetry for their own rooms, staff for all of them
+    if user.is_staff:
+        return ColdRoom.objects.all()
+    return ColdRoom.objects.filter(owner=user)
+
+
+class ReadingViewSet(viewsets.ViewSet):
+    """POST a list of ``{cold_room, recorded_at, temperature}`` readings (Celsius)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ["Expected a non-empty list of readings."]})
+        max_readings = settings.TELEMETRY_MAX_READINGS
+        if len(items) > max_readings:
+            raise ValidationError({'non_field_errors': [f"At most {max_readings} readings are allowed per request."]})
+
+        readings, errors = parse_readings(items)
+        allowed = set(visible_rooms(request.user).filter(
+            pk__in={row[0] for _, row in readings}
+        ).values_list('pk', flat=True))
+        rows = []
+        for index, row in readings:
+            if row[0] in allowed:
+                rows.append(row)
+            else:
+                errors.append({'index': index, 'errors': {'cold_room': ["Unknown cold room."]}})
+
+        # same contract as the bulk cold room endpoint: all or nothing unless ?allow_partial=true
+        allow_partial = request.query_params.get('allow_partial', '').lower() in ('1', 'true', 'yes')
+        if not rows or errors and not allow_partial:
+            return Response({'accepted': 0, 'failed': len(errors),
+                             'errors': sorted(errors, key=lambda error: error['index'])},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        excursions = ingest(rows)
+        return Response({'accepted': len(rows), 'failed': len(errors), 'excursions': excursions,
+                         'errors': sorted(errors, key=lambda error: error['index'])},
+                        status=status.HTTP_201_CREATED)
+
+
+class TemperatureRollupViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Rollups for one room, e.g. ?cold_room=1&resolution=1h&start=...&end=..."""
+    serializer_class = TemperatureRollupSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        query = RollupQuerySerializer(data=self.request.query_params)
+        query.fields['cold_room'].queryset = visible_rooms(self.request.user)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        return TemperatureRollup.objects.filter(
+            cold_room=params['cold_room'], resolution=params['resolution'],
+            bucket__gte=params['start'], bucket__lt=params['end'],
+        ).order_by('bucket')
+
+
+class TemperatureExcursionViewSet(viewsets.ReadOnlyModelViewSet):
+    """Excursions on the user's rooms, newest first; ?cold_room= narrows to one room."""
+    serializer_class = TemperatureExcursionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # unpaginated unless ?limit= is given
+    pagination_class = LimitOffsetPagination
+
+    def get_queryset(self):
+        queryset = TemperatureExcursion.objects.filter(cold_room__in=visible_rooms(self.request.user))
+        cold_room = self.request.query_params.get('cold_room')
+        if cold_room:
+            try:
+                queryset = queryset.filter(cold_room=int(cold_room))
+            except ValueError:
+                raise ValidationError({'cold_room': ["A cold room id is required."]})
+        return queryset.order_by('-ended_at', '-pk')
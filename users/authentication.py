@@ -0,0 +1,188 @@
+import binascii
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from knox.auth import TokenAuthentication
+from knox.crypto import hash_token
+from knox.models import get_token_model
+from knox.settings import knox_settings
+from rest_framework import exceptions
+
+from .models import User
+
+
+class TokenCache:
+    """
+    Validated Knox token digests -> ``(token_pk, token_key, user_id, expiry)``.
+
+    The shared cache is authoritative and entries are deleted from it as soon
+    as the token row goes away. An optional per-process LRU can sit in front
+    of it, saving the cache round trip: it is off unless
+    ``AUTH_TOKEN_CACHE_LOCAL_TTL`` is set, because its entries are not
+    evicted by logouts on other workers and a revoked token stays valid in
+    this process for up to that many seconds.
+    """
+    key_prefix = 'users:knox-digest:'
+
+    def __init__(self):
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, digest):
+        return self.key_prefix + digest
+
+    def get(self, digest):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._local.get(digest)
+            if hit is not None:
+                entry, stored_at = hit
+                if now - stored_at < settings.AUTH_TOKEN_CACHE_LOCAL_TTL:
+                    self._local.move_to_end(digest)
+                    return entry
+                del self._local[digest]
+
+        entry = cache.get(self._key(digest))
+        if entry is not None:
+            self._remember(digest, entry)
+        return entry
+
+    def set(self, auth_token):
+        entry = (auth_token.pk, auth_token.token_key, auth_token.user_id, auth_token.expiry)
+        timeout = settings.AUTH_TOKEN_CACHE_TTL
+        if auth_token.expiry is not None:
+            timeout = min(timeout, (auth_token.expiry - timezone.now()).total_seconds())
+        if timeout > 0:
+            cache.set(self._key(auth_token.digest), entry, timeout)
+            self._remember(auth_token.digest, entry)
+
+    def evict(self, digest):
+        cache.delete(self._key(digest))
+        with self._lock:
+            self._local.pop(digest, None)
+
+    def _remember(self, digest, entry):
+        if not settings.AUTH_TOKEN_CACHE_LOCAL_TTL:
+            return
+        with self._lock:
+            self._local[digest] = (entry, time.monotonic())
+            self._local.move_to_end(digest)
+            while len(self._local) > settings.AUTH_TOKEN_CACHE_SIZE:
+                self._local.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Knox token authentication that skips the token lookup for known digests.
+
+    A cache hit costs one SHA-512 of the presented token and a primary key
+    lookup of the user, instead of Knox's token scan, per-user token cleanup
+    and digest comparison.
+    """
+
+    def authenticate_credentials(self, token):
+        if knox_settings.AUTO_REFRESH:
+            # renewal has to write the new expiry on every request anyway
+            return super().authenticate_credentials(token)
+
+        try:
+            digest = hash_token(token.decode('utf-8'))
+        except (TypeError, binascii.Error, UnicodeDecodeError):
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        entry = token_cache.get(digest)
+        if entry is None:
+            user, auth_token = super().authenticate_credentials(token)
+            token_cache.set(auth_token)
+            return user, auth_token
+
+        token_pk, token_key, user_id, expiry = entry
+        if expiry is not None and expiry < timezone.now():
+            # let Knox delete the expired row and reject the request
+            token_cache.evict(digest)
+            return super().authenticate_credentials(token)
+
+        try:
+            user = User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            token_cache.evict(digest)
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        auth_token = get_token_model()(pk=token_pk, digest=digest, token_key=token_key,
+                                       user=user, expiry=expiry)
+        return self.validate_user(auth_token)
+
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+def _hash_executor():
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                workers = settings.LOGIN_HASH_WORKERS or os.cpu_count() or 1
+                _hash_pool = ThreadPoolExecutor(max_workers=workers,
+                                                thread_name_prefix='login-hash')
+    return _hash_pool
+
+
+def _check_password(password, encoded):
+    """
+    Return ``(valid, needs_rehash)`` for ``password`` against the ``encoded`` hash.
+
+    Only hashes, so it is safe to run in a pool thread: saving an upgraded
+    hash there would open a database connection that thread never closes.
+    ``encoded=None`` hashes the password anyway and fails.
+    """
+    if encoded is None:
+        make_password(password)
+        return False, False
+    rehash = []
+    valid = check_password(password, encoded, setter=rehash.append)
+    return valid, bool(rehash)
+
+
+def authenticate_email(email, password, request=None):
+    """
+    Return the active user owning ``email`` and ``password``, or ``None``.
+
+    One case-insensitive lookup (served by ``users_email_upper_idx``) and
+    exactly one password hash whatever the outcome: unknown emails hash
+    against a throwaway user so they take as long as a wrong password.
+
+    Under ASGI every sync request already runs in its own thread; hashes
+    are additionally funnelled through a pool of ``LOGIN_HASH_WORKERS`` so a
+    credential-stuffing burst cannot run more of them at once than there
+    are cores.
+    """
+    user = User.objects.filter(email__iexact=email).first()
+    encoded = user.password if user is not None else None
+
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        valid, rehash = _hash_executor().submit(_check_password, password, encoded).result()
+    else:
+        valid, rehash = _check_password(password, encoded)
+
+    if valid and rehash:
+        # what User.check_password() would do, but in the request's own thread
+        user.set_password(password)
+        user.save(update_fields=['password'])
+    if user is not None and valid and user.is_active:
+        return user
+    user_login_failed.send(sender=__name__, credentials={'email': email}, request=request)
+    return None
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.authentication import authenticate_email
+from users.models import User
+
+PASSWORD = 'Bench-login-1!'
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput of a single worker (runs in a rolled back transaction)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50,
+                            help='Logins per scenario')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        with transaction.atomic():
+            user = User.objects.create_user(email='bench.login@example.invalid', password=PASSWORD,
+                                            phone='+254799999999',
+                                            user_type=User.UserType.FARMER)
+            scenarios = [
+                ('valid credentials', user.email.upper(), PASSWORD),
+                ('wrong password', user.email, PASSWORD + 'x'),
+                ('unknown email', 'nobody@example.invalid', PASSWORD),
+            ]
+            for label, email, password in scenarios:
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    authenticate_email(email, password)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{label:<18} {iterations / elapsed:8.1f} logins/s  "
+                                  f"{elapsed / iterations * 1000:7.1f} ms/login")
+            transaction.set_rollback(True)
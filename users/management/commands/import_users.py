@@ -0,0 +1,142 @@
+import csv
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from phonenumber_field.phonenumber import to_python as to_phone_number
+
+from users.models import User, username_base
+
+# bulk inserts retried after a concurrent sign-up took one of their usernames
+INSERT_ATTEMPTS = 3
+
+
+def _init_worker():
+    # spawned (non-forked) workers start without an app registry
+    django.setup()
+
+
+def _hash_password(raw_password):
+    # None gives an unusable password, so the user has to reset it first
+    return make_password(raw_password or None)
+
+
+class Command(BaseCommand):
+    help = 'Stream users from a CSV or NDJSON file and insert them in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header) or NDJSON file, "-" for stdin')
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help='Input format, guessed from the file extension by default')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Password hashing processes (default: CPU count)')
+        parser.add_argument('--user-type', choices=User.UserType.values, default=User.UserType.FARMER,
+                            help='Used for rows without a user_type column')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+        self.verbosity = options['verbosity']
+        self.default_user_type = options['user_type']
+        self.seen_emails, self.seen_phones = set(), set()
+        self.created = self.skipped = 0
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            rows = csv.DictReader(stream) if fmt == 'csv' else self.read_ndjson(stream)
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+                while batch := list(islice(rows, options['batch_size'])):
+                    self.import_batch(batch, pool)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Created {self.created} users, skipped {self.skipped}."))
+
+    def read_ndjson(self, stream):
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise CommandError(f"Line {line_number} is not valid JSON.")
+
+    def clean_batch(self, batch):
+        users = []
+        for row in batch:
+            email = User.objects.normalize_email((row.get('email') or '').strip()).lower()
+            phone = to_phone_number(str(row.get('phone') or ''))
+            user_type = row.get('user_type') or self.default_user_type
+            if not email or not phone or not phone.is_valid() or user_type not in User.UserType.values:
+                self.skip(row, 'missing email, invalid phone or unknown user_type')
+                continue
+            if email in self.seen_emails or phone.as_e164 in self.seen_phones:
+                self.skip(row, 'duplicate email or phone in file')
+                continue
+            self.seen_emails.add(email)
+            self.seen_phones.add(phone.as_e164)
+            users.append((User(
+                email=email, phone=phone, user_type=user_type,
+                first_name=row.get('first_name') or '', last_name=row.get('last_name') or '',
+            ), row.get('password')))
+        return users
+
+    def unregistered(self, users):
+        """Skip the users whose email or phone is already in the database, in one query each."""
+        existing_emails = set(User.objects.filter(
+            email__in=[user.email for user, _ in users]).values_list('email', flat=True))
+        existing_phones = {phone.as_e164 for phone in User.objects.filter(
+            phone__in=[user.phone for user, _ in users]).values_list('phone', flat=True)}
+        fresh = []
+        for user, password in users:
+            if user.email in existing_emails or user.phone.as_e164 in existing_phones:
+                self.skip({'email': user.email}, 'already registered')
+            else:
+                fresh.append((user, password))
+        return fresh
+
+    def allocate_usernames(self, users):
+        return User.objects.allocate_usernames([username_base(user.email) for user in users])
+
+    def import_batch(self, batch, pool):
+        users = self.clean_batch(batch)
+        fresh = self.unregistered(users) if users else []
+        if not fresh:
+            return
+
+        hashes = pool.map(_hash_password, [password for _, password in fresh],
+                          chunksize=max(1, len(fresh) // 64))
+        for (user, _), password_hash in zip(fresh, hashes):
+            user.password = password_hash
+
+        users = [user for user, _ in fresh]
+        for attempt in range(1, INSERT_ATTEMPTS + 1):
+            for user, username in zip(users, self.allocate_usernames(users)):
+                user.username = username
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create(users)
+                break
+            except IntegrityError:
+                # someone registered between allocation and insert: their
+                # username is taken now, and maybe one of our emails or phones
+                if attempt == INSERT_ATTEMPTS:
+                    raise CommandError(f"Could not insert a batch after {INSERT_ATTEMPTS} attempts.")
+                users = [user for user, _ in self.unregistered([(user, None) for user in users])]
+                if not users:
+                    return
+        self.created += len(users)
+        self.stdout.write(f"... {self.created} created")
+
+    def skip(self, row, reason):
+        self.skipped += 1
+        if self.verbosity > 1:
+            self.stderr.write(f"Skipped {row.get('email') or row}: {reason}")
+
@@ -1,13 +1,52 @@
+import re
+
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from phonenumber_field.modelfields import PhoneNumberField
 
 
+def username_base(email):
+    return slugify(email.split('@')[0].replace('.', '_')) or 'user'
+
+
 class UserManager(BaseUserManager):
     use_in_migrations = True
 
+    def taken_usernames(self, bases):
+        """
+        Return the existing usernames among ``base`` and ``base_<n>`` for the given bases.
+
+        Matches the scheme exactly rather than by prefix, so a common base
+        such as ``info`` does not load every ``information_*`` username.
+        """
+        if not bases:
+            return set()
+        pattern = rf"^({'|'.join(re.escape(base) for base in sorted(set(bases)))})(_[0-9]+)?$"
+        return set(self.filter(username__regex=pattern).values_list('username', flat=True))
+
+    def allocate_usernames(self, bases):
+        """
+        Return a free username for every base, in order, using a single query.
+
+        Follows the ``base``, ``base_1``, ``base_2``... scheme and also keeps
+        the returned names unique among themselves.
+        """
+        taken = self.taken_usernames(bases)
+        usernames = []
+        next_counter = {}
+        for base in bases:
+            username, counter = base, next_counter.get(base, 1)
+            while username in taken:
+                username = f"{base}_{counter}"
+                counter += 1
+            next_counter[base] = counter
+            taken.add(username)
+            usernames.append(username)
+        return usernames
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email must be set')
@@ -15,13 +54,7 @@ class UserManager(BaseUserManager):
 
         # Auto-generate username if not provided
         if not extra_fields.get('username'):
-            base_username = email.split('@')[0]
-            username = slugify(base_username.replace('.', '_'))
-            counter = 1
-            while self.model.objects.filter(username=username).exists():
-                username = f"{slugify(base_username.replace('.', '_'))}_{counter}"
-                counter += 1
-            extra_fields['username'] = username
+            extra_fields['username'] = self.allocate_usernames([username_base(email)])[0]
 
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
@@ -76,18 +109,18 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # matches the UPPER(email) = UPPER(...) that email__iexact compiles to
+            models.Index(Upper('email'), name='users_email_upper_idx'),
+        ]
+
     def _generate_username(self):
-        base_username = self.email.split('@')[0]
-        return slugify(base_username.replace('.', '_'))
+        return username_base(self.email)
 
     def save(self, *args, **kwargs):
         if not self.username:
-            base = self._generate_username()
-            self.username = base
-            counter = 1
-            while User.objects.filter(username=self.username).exists():
-                self.username = f"{base}_{counter}"
-                counter += 1
+            self.username = User.objects.allocate_usernames([self._generate_username()])[0]
         super().save(*args, **kwargs)
 
     def get_full_name(self):
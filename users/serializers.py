@@ -1,7 +1,7 @@
 from django.contrib.auth.hashers import make_password
-from django.contrib.auth import authenticate
 from rest_framework import serializers, validators
 
+from .authentication import authenticate_email
 from .models import User
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -43,21 +43,8 @@ class UserLoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if email and password:
-            # Try both email and username authentication
-            user = authenticate(
-                request=self.context.get('request'),
-                username=email,  # Try email as username first
-                password=password
-            )
-            
-            # If that fails, try getting by email directly
-            if not user:
-                try:
-                    user = User.objects.get(email__iexact=email)
-                    if not user.check_password(password):
-                        user = None
-                except User.DoesNotExist:
-                    user = None
+            # Single lookup and a single hash, even for unknown emails
+            user = authenticate_email(email, password, request=self.context.get('request'))
 
             if not user:
                 raise serializers.ValidationError({
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from knox.models import get_token_model
+
+from .authentication import token_cache
+
+
+# covers /auth/logout/, /auth/logout-all/, expiry cleanup and user deletion
+@receiver(post_delete, sender=get_token_model())
+def token_deleted(sender, instance, **kwargs):
+    token_cache.evict(instance.digest)
@@ -1,3 +1,242 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+from io import StringIO
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models.signals import pre_save
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from knox.models import AuthToken
+from rest_framework.test import APIClient
+
+from .authentication import TokenCache, authenticate_email, token_cache
+from .management.commands.import_users import Command as ImportUsersCommand
+from .models import User
+from .throttling import UserRateThrottle
+
+
+class UsernameAllocationTests(TestCase):
+    def make_user(self, email, phone):
+        return User.objects.create_user(email=email, password='Secret123!', phone=phone,
+                                        user_type=User.UserType.FARMER)
+
+    def test_allocates_suffixes_in_one_query(self):
+        self.make_user('info@coop-a.example', '+254700000001')
+        self.make_user('info@coop-b.example', '+254700000002')
+        self.make_user('info_desk@coop-c.example', '+254700000003')
+
+        with self.assertNumQueries(1):
+            usernames = User.objects.allocate_usernames(['info', 'info', 'admin', 'info_desk'])
+        self.assertEqual(usernames, ['info_2', 'info_3', 'admin', 'info_desk_1'])
+
+    def test_only_loads_the_suffix_scheme(self):
+        for index, email in enumerate(('info@a.example', 'information@a.example', 'info_desk@a.example',
+                                       'info_2b@a.example', 'info.x@a.example')):
+            self.make_user(email, f'+25470000001{index}')
+        User.objects.filter(username='info_x').update(username='info_12')
+
+        self.assertEqual(User.objects.taken_usernames(['info', 'info']), {'info', 'info_12'})
+        self.assertEqual(User.objects.taken_usernames(['info', 'info_2b']), {'info', 'info_12', 'info_2b'})
+        self.assertEqual(User.objects.taken_usernames([]), set())
+
+    def test_create_user_uses_next_free_suffix(self):
+        first = self.make_user('j.doe@example.com', '+254700000004')
+        second = self.make_user('j.doe@example.org', '+254700000005')
+        self.assertEqual((first.username, second.username), ('j_doe', 'j_doe_1'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='owner@example.com', password='Secret123!',
+                                             phone='+254700000010',
+                                             user_type=User.UserType.COLD_ROOM_OWNER)
+        self.instance, self.token = AuthToken.objects.create(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def test_cached_token_skips_token_lookup(self):
+        self.assertEqual(self.client.get('/api/v1/cold-rooms/').status_code, 200)
+        self.assertIsNotNone(token_cache.get(self.instance.digest))
+        with self.assertNumQueries(2):  # the user row and the owner's rooms
+            self.client.get('/api/v1/cold-rooms/')
+
+    def test_logout_evicts_digest(self):
+        self.client.get('/api/v1/cold-rooms/')
+        self.assertEqual(self.client.post('/api/v1/auth/logout/').status_code, 204)
+        self.assertIsNone(token_cache.get(self.instance.digest))
+        self.assertEqual(self.client.get('/api/v1/cold-rooms/').status_code, 401)
+
+    def test_logout_all_evicts_every_digest(self):
+        other, other_token = AuthToken.objects.create(self.user)
+        self.client.get('/api/v1/cold-rooms/')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {other_token}')
+        self.client.get('/api/v1/cold-rooms/')
+        self.assertEqual(self.client.post('/api/v1/auth/logout-all/').status_code, 204)
+        self.assertIsNone(token_cache.get(self.instance.digest))
+        self.assertIsNone(token_cache.get(other.digest))
+
+
+class TokenCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        # two workers sharing the cache
+        self.worker, self.other = TokenCache(), TokenCache()
+        self.worker.set(SimpleNamespace(pk=1, digest='digest', token_key='abcd1234', user_id=7, expiry=None))
+
+    def test_revocation_on_another_worker_applies_at_once(self):
+        self.assertIsNotNone(self.worker.get('digest'))
+        self.other.evict('digest')
+        self.assertIsNone(self.worker.get('digest'))
+
+    @override_settings(AUTH_TOKEN_CACHE_LOCAL_TTL=60)
+    def test_local_copies_outlive_revocation_elsewhere(self):
+        self.worker.set(SimpleNamespace(pk=1, digest='digest', token_key='abcd1234', user_id=7, expiry=None))
+        self.other.evict('digest')
+        self.assertEqual(self.worker.get('digest'), (1, 'abcd1234', 7, None))
+
+
+class LoginPipelineTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='Grower@Example.com', password='Secret123!',
+                                             phone='+254700000020',
+                                             user_type=User.UserType.FARMER)
+
+    def test_case_insensitive_login(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(authenticate_email('grower@example.com', 'Secret123!'), self.user)
+
+    def test_failures_cost_one_query(self):
+        for email, password in [('grower@example.com', 'wrong'), ('nobody@example.com', 'Secret123!')]:
+            with self.assertNumQueries(1):
+                self.assertIsNone(authenticate_email(email, password))
+
+    def test_inactive_user_rejected(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(authenticate_email('grower@example.com', 'Secret123!'))
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+                                         'django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_outdated_hash_is_upgraded_in_the_request_thread(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('Secret123!', hasher='md5'))
+        saved_in = []
+
+        def record_thread(sender, **kwargs):
+            saved_in.append(threading.current_thread())
+        pre_save.connect(record_thread, sender=User)
+        self.addCleanup(pre_save.disconnect, record_thread, sender=User)
+
+        request = AsyncRequestFactory().post('/api/v1/auth/login/')
+        self.assertEqual(authenticate_email('grower@example.com', 'Secret123!', request), self.user)
+        self.assertEqual(saved_in, [threading.current_thread()])
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha1$'))
+
+
+class RacingImportCommand(ImportUsersCommand):
+    """Registers a user under the first allocated username before the batch is inserted."""
+    raced = False
+
+    def allocate_usernames(self, users):
+        usernames = super().allocate_usernames(users)
+        if not self.raced:
+            self.raced = True
+            User.objects.create_user(email='racer@example.com', password='Secret123!', phone='+254711000099',
+                                     user_type=User.UserType.FARMER, username=usernames[0])
+        return usernames
+
+
+class ImportUsersCommandTests(TestCase):
+    CSV = (
+        'email,phone,first_name,password,user_type\n'
+        'J.Doe@Example.com,+254711000001,Jane,Secret123!,\n'
+        'j.doe@example.org,+254711000002,John,,COLD_ROOM_OWNER\n'
+        'j.doe@example.com,+254711000003,Again,Secret123!,\n'
+        'taken@example.com,+254711000004,Taken,Secret123!,\n'
+        'nophone@example.com,12,,Secret123!,\n'
+    )
+
+    def setUp(self):
+        User.objects.create_user(email='j.doe@example.net', password='Secret123!', phone='+254711000010',
+                                 user_type=User.UserType.FARMER)
+        User.objects.create_user(email='taken@example.com', password='Secret123!', phone='+254711000011',
+                                 user_type=User.UserType.FARMER)
+        handle, self.path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, self.path)
+        with os.fdopen(handle, 'w') as stream:
+            stream.write(self.CSV)
+
+    def test_imports_with_hashed_passwords_and_generated_usernames(self):
+        out = StringIO()
+        call_command('import_users', self.path, workers=1, stdout=out)
+        self.assertIn('Created 2 users, skipped 3.', out.getvalue())
+
+        jane = User.objects.get(email='j.doe@example.com')
+        self.assertEqual((jane.username, jane.first_name, jane.user_type), ('j_doe_1', 'Jane', User.UserType.FARMER))
+        self.assertNotEqual(jane.password, 'Secret123!')
+        self.assertTrue(jane.check_password('Secret123!'))
+
+        john = User.objects.get(email='j.doe@example.org')
+        self.assertEqual((john.username, john.user_type), ('j_doe_2', User.UserType.COLD_ROOM_OWNER))
+        self.assertFalse(john.has_usable_password())
+
+    def test_rerun_skips_registered_users(self):
+        call_command('import_users', self.path, workers=1, stdout=StringIO())
+        out = StringIO()
+        call_command('import_users', self.path, workers=1, stdout=out)
+        self.assertIn('Created 0 users, skipped 5.', out.getvalue())
+        self.assertEqual(User.objects.count(), 4)
+
+    def test_batch_is_retried_when_a_username_is_taken_meanwhile(self):
+        out = StringIO()
+        call_command(RacingImportCommand(), self.path, workers=1, stdout=out)
+        self.assertIn('Created 2 users, skipped 3.', out.getvalue())
+        self.assertEqual(User.objects.get(email='racer@example.com').username, 'j_doe_1')
+        self.assertEqual(sorted(User.objects.filter(email__startswith='j.doe@example.')
+                                .values_list('username', flat=True)), ['j_doe', 'j_doe_2', 'j_doe_3'])
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = SimpleNamespace(user=User(pk=7), META={})
+        self.now = 600.0
+
+    def worker(self):
+        throttle = UserRateThrottle()
+        throttle.rate, (throttle.num_requests, throttle.duration) = '10/min', (10, 60)
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def allowed(self, throttle, count):
+        return sum(throttle.allow_request(self.request, None) for _ in range(count))
+
+    def test_limit_is_shared_between_workers(self):
+        first, second = self.worker(), self.worker()
+        self.assertEqual(self.allowed(first, 6) + self.allowed(second, 6), 10)
+        self.assertEqual(self.allowed(first, 1), 0)
+
+    def test_previous_window_fades_out(self):
+        throttle = self.worker()
+        self.assertEqual(self.allowed(throttle, 10), 10)
+        # half way into the next window the previous one still counts for 5
+        self.now += 90
+        self.assertEqual(self.allowed(throttle, 10), 5)
+        self.assertFalse(throttle.allow_request(self.request, None))
+        # refused requests are not counted: 6 s later another 10% of it has faded
+        self.assertAlmostEqual(throttle.wait(), 6)
+        self.now += 6
+        self.assertEqual(self.allowed(throttle, 10), 1)
+
+    def test_wait_until_previous_window_weighs_less(self):
+        throttle = self.worker()
+        self.allowed(throttle, 10)
+        self.now += 60
+        self.assertFalse(throttle.allow_request(self.request, None))
+        # the next request fits once 1 of the previous window's 10 has faded
+        self.assertAlmostEqual(throttle.wait(), 6)
+        self.now += 6
+        self.assertTrue(throttle.allow_request(self.request, None))
@@ -0,0 +1,135 @@
+"""
+Sliding-window rate throttles backed by shared atomic counters.
+
+DRF's ``SimpleRateThrottle`` keeps a list of request timestamps per client
+and writes it back on every request: the payload grows with the rate, and
+two workers reading the same list both append and one write wins. Here a
+client costs two integer counters per scope, the current and the previous
+window, and the request count of the last ``duration`` seconds is
+estimated as ``previous * (share of the window still overlapping) +
+current``. Counters are bumped with atomic increments, so every worker
+sharing the cache enforces the same limit.
+
+With Redis as the default cache the increment, expiry and read of the
+previous window go out in one pipelined round trip. Other backends (LocMem
+in tests and development) go through the cache API, whose ``incr`` is
+atomic within their own scope.
+"""
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class CacheCounter:
+    """Window counters through the Django cache API."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, current, previous, timeout):
+        """Count a request in ``current``; return it and the count of ``previous``."""
+        self.cache.add(current, 0, timeout)
+        try:
+            count = self.cache.incr(current)
+        except ValueError:
+            # expired between add() and incr()
+            self.cache.add(current, 1, timeout)
+            count = 1
+        return count, self.cache.get(previous, 0)
+
+    def undo(self, current):
+        try:
+            self.cache.decr(current)
+        except ValueError:
+            pass
+
+
+class RedisCounter(CacheCounter):
+    """Window counters as raw Redis integers, one round trip per request."""
+
+    def _client(self, key):
+        return self.cache._cache.get_client(key, write=True)
+
+    def hit(self, current, previous, timeout):
+        current = self.cache.make_and_validate_key(current)
+        previous = self.cache.make_and_validate_key(previous)
+        pipeline = self._client(current).pipeline(transaction=False)
+        pipeline.incr(current)
+        pipeline.expire(current, timeout)
+        pipeline.get(previous)
+        count, _, before = pipeline.execute()
+        return count, int(before or 0)
+
+    def undo(self, current):
+        current = self.cache.make_and_validate_key(current)
+        self._client(current).decr(current)
+
+
+def get_counter(alias='default'):
+    cache = caches[alias]
+    return RedisCounter(cache) if isinstance(cache, RedisCache) else CacheCounter(cache)
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """``SimpleRateThrottle`` with the per-client history list replaced by two counters."""
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+    timer = time.time
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window, offset = divmod(now, self.duration)
+        elapsed = offset / self.duration
+        current = f'{self.key}:{int(window)}'
+        counter = get_counter()
+        count, before = counter.hit(current, f'{self.key}:{int(window) - 1}', self.duration * 2)
+        if before * (1 - elapsed) + count <= self.num_requests:
+            return True
+
+        # like DRF, refused requests do not use up the quota
+        counter.undo(current)
+        room = self.num_requests - count
+        if before and room >= 0:
+            # the previous window's weight fades until this request would fit
+            self.wait_seconds = (1 - room / before - elapsed) * self.duration
+        else:
+            self.wait_seconds = (1 - elapsed) * self.duration
+        return False
+
+    def wait(self):
+        return max(self.wait_seconds, 0)
+
+
+class AnonRateThrottle(SlidingWindowRateThrottle):
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UserRateThrottle(SlidingWindowRateThrottle):
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class BurstRateThrottle(UserRateThrottle):
+    scope = 'burst'
+
+
+class SustainedRateThrottle(UserRateThrottle):
+    scope = 'sustained'
@@ -1,15 +1,8 @@
 from django.urls import path
 from knox import views as knox_views
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+from .throttling import AnonRateThrottle, BurstRateThrottle, SustainedRateThrottle, UserRateThrottle
 from .views import RegisterAPI, LoginAPI, FacebookLogin, GoogleLogin
 
-# Custom throttling classes
-class BurstRateThrottle(UserRateThrottle):
-    scope = 'burst'
-
-class SustainedRateThrottle(UserRateThrottle):
-    scope = 'sustained'
-
 urlpatterns = [
     # Authentication endpoints
     path('api/v1/auth/register/', 